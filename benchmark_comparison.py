@@ -0,0 +1,123 @@
+"""
+Benchmark usporedbi proizvoda i kategorija (tab Usporedbe).
+
+Uspoređuje stari pristup (kopija cijelog DataFrame-a, to_period i kategorizacija
+red po red) sa ProductComparisonAnalytics nad kockom prodaje (mjesečni ključevi,
+bez kopiranja stavki). Mjeri vrijeme i vršnu alokaciju memorije (tracemalloc).
+
+Pokretanje:
+    python benchmark_comparison.py [data_folder] [--scale N]
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.utils.auto_data_loader import AutoDataLoader
+from src.analysis.advanced_analytics import ProductComparisonAnalytics
+from src.analysis.product_classifier import ProductClassifier
+from src.analysis.sales_cube import SalesCube
+
+
+class LegacyComparison:
+    """Usporedbe kao prije kocke - svaka metoda kopira cijeli DataFrame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        classifier = ProductClassifier()
+        self.product_categories = classifier.group(df['Artikl'].dropna().unique())
+
+    def get_product_category(self, product):
+        for category, products in self.product_categories.items():
+            if product in products:
+                return category
+        return 'Ostalo'
+
+    def compare_products_monthly(self, top_n=10):
+        df = self.df.copy()
+        products = df.groupby('Artikl', observed=True)['Ukupno'].sum().nlargest(top_n).index.tolist()
+        df_filtered = df[df['Artikl'].isin(products)].copy()
+        monthly = df_filtered.groupby([df_filtered['Datum i vrijeme'].dt.to_period('M'), 'Artikl'],
+                                      observed=True).agg({'Ukupno': 'sum', 'Količina': 'sum'}).reset_index()
+        monthly.columns = ['Mjesec', 'Artikl', 'Promet', 'Količina']
+        return monthly.pivot(index='Mjesec', columns='Artikl', values='Promet').fillna(0).pct_change()
+
+    def compare_categories_monthly(self):
+        df = self.df.copy()
+        df['Kategorija'] = df['Artikl'].apply(self.get_product_category)
+        monthly = df.groupby([df['Datum i vrijeme'].dt.to_period('M'), 'Kategorija'],
+                             observed=True).agg({'Ukupno': 'sum', 'Količina': 'sum'}).reset_index()
+        monthly.columns = ['Mjesec', 'Kategorija', 'Promet', 'Količina']
+        return monthly.pivot(index='Mjesec', columns='Kategorija', values='Promet').fillna(0).pct_change()
+
+    def year_over_year_comparison(self, month):
+        df = self.df.copy()
+        df['Kategorija'] = df['Artikl'].apply(self.get_product_category)
+        df_month = df[df['Mjesec'] == month].copy()
+        yearly = df_month.groupby(['Godina', 'Kategorija'], observed=True).agg(
+            {'Ukupno': 'sum', 'Količina': 'sum'}).reset_index()
+        return yearly.pivot(index='Kategorija', columns='Godina', values='Ukupno').fillna(0)
+
+    def top_growers_and_decliners(self, period='M'):
+        df = self.df.copy()
+        periodic = df.groupby([df['Datum i vrijeme'].dt.to_period(period), 'Artikl'],
+                              observed=True)['Ukupno'].sum().reset_index()
+        periodic.columns = ['Period', 'Artikl', 'Promet']
+        return periodic.pivot(index='Artikl', columns='Period', values='Promet').fillna(0)
+
+
+def measure(func, repeat: int = 3):
+    """Najbolje vrijeme (s) i vršna alokacija (MB) poziva."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('data_folder', nargs='?', default='data')
+    parser.add_argument('--scale', type=int, default=1, help='Umnoži dataset N puta (simulacija većeg prometa)')
+    args = parser.parse_args()
+
+    loader = AutoDataLoader(args.data_folder)
+    df = loader.load_all_racuni()
+    if args.scale > 1:
+        df = pd.concat([df] * args.scale, ignore_index=True)
+    print(f"\n📊 {len(df):,} redova, {df.memory_usage(deep=True).sum() / 1e6:,.1f} MB")
+
+    start = time.perf_counter()
+    cube = SalesCube.from_frame(df)
+    print(f"🧊 Kocka: {time.perf_counter() - start:.3f}s, {len(cube):,} ćelija, {cube.nbytes / 1e6:,.1f} MB (jednom po datasetu)")
+
+    month = int(df['Mjesec'].mode().iloc[0])
+    legacy = LegacyComparison(df)
+    current = ProductComparisonAnalytics(df, cube)
+    methods = [
+        ('compare_products_monthly', lambda a: a.compare_products_monthly(top_n=10)),
+        ('compare_categories_monthly', lambda a: a.compare_categories_monthly()),
+        ('year_over_year_comparison', lambda a: a.year_over_year_comparison(month)),
+        ('top_growers_and_decliners', lambda a: a.top_growers_and_decliners('M')),
+    ]
+
+    print(f"\n{'Metoda':<28} {'staro s':>9} {'staro MB':>9} {'kocka s':>9} {'kocka MB':>9} {'ubrzanje':>9}")
+    totals = np.zeros(4)
+    for name, call in methods:
+        old_time, old_mem = measure(lambda: call(legacy))
+        new_time, new_mem = measure(lambda: call(current))
+        totals += [old_time, old_mem, new_time, new_mem]
+        print(f"{name:<28} {old_time:>9.3f} {old_mem:>9.1f} {new_time:>9.3f} {new_mem:>9.1f} {old_time / new_time:>8.1f}x")
+    print(f"{'UKUPNO':<28} {totals[0]:>9.3f} {totals[1]:>9.1f} {totals[2]:>9.3f} {totals[3]:>9.1f} "
+          f"{totals[0] / totals[2]:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
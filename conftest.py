@@ -0,0 +1,74 @@
+"""
+Zajednički podaci za pytest testove - mali sintetički dataset bez Excel fajlova iz data/
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.auto_data_loader import AutoDataLoader
+
+# Skripte koje trebaju lokalne Excel fajlove (pokreću se ručno)
+collect_ignore = ['test_comparison.py', 'test_excel_datetime.py', 'test_loader_2024.py',
+                  'test_multi_file.py']
+
+ARTICLES = [
+    ('ESPRESSO', 'Kava', 1.5),
+    ('CAPPUCCINO', 'Kava', 2.2),
+    ('TURKISH COFFEE', 'Kava', 1.8),
+    ('Kroasan', 'Hrana', 2.5),
+    ('WRAP PILETINA', 'Hrana', 6.0),
+    ('VODA 0.5', 'Pića', 1.6),
+    ('LEMONADE', 'Pića', 3.2),
+]
+
+
+def make_raw_lines(years=(2024, 2025), invoices_per_year: int = 400, seed: int = 7) -> pd.DataFrame:
+    """
+    Sirove stavke računa kao u Excel exportu.
+
+    Fiskalni brojevi kreću od 1 svake godine (isti broj se ponavlja u
+    različitim godinama), a račun ima 1-3 stavke istog vremena i lokala.
+    """
+    rng = np.random.default_rng(seed)
+    records = []
+    for year in years:
+        days = pd.date_range(f'{year}-01-01', f'{year}-12-31', freq='D')
+        for number in range(1, invoices_per_year + 1):
+            day = days[rng.integers(len(days))]
+            timestamp = day + pd.Timedelta(hours=int(rng.integers(7, 23)),
+                                           minutes=int(rng.integers(60)))
+            lokal = ['Quahwa Centar', 'Quahwa Tresnjevka'][rng.integers(2)]
+            header = {
+                'Lokal': lokal,
+                'Blagajna': f'B{rng.integers(1, 3)}',
+                'Datum i vrijeme': timestamp,
+                'Način plaćanja': ['Gotovina', 'Kartica'][rng.integers(2)],
+                'Fiskalni broj računa': f'{number}/P1/1',
+                'Izdao': ['Ana', 'Iva', 'Marko'][rng.integers(3)],
+            }
+            for index in rng.choice(len(ARTICLES), size=int(rng.integers(1, 4)), replace=False):
+                artikl, grupa, cijena = ARTICLES[index]
+                kolicina = int(rng.integers(1, 4))
+                records.append({**header, 'Artikl': artikl, 'Prodajna grupa': grupa,
+                                'Količina': kolicina, 'Cijena': cijena,
+                                'Ukupno': round(kolicina * cijena, 2)})
+    return pd.DataFrame(records)
+
+
+def process_lines(raw: pd.DataFrame, source_file: str = 'Računi.xlsx') -> pd.DataFrame:
+    """Obrada kao kod AutoDataLoadera (tipovi, kalendarske kolone, Racun_id)."""
+    df = raw.copy()
+    df['_source_file'] = source_file
+    df = AutoDataLoader(use_cache=False)._process_frame(df)
+    AutoDataLoader._assign_invoice_ids(df)
+    return df
+
+
+@pytest.fixture
+def raw_lines() -> pd.DataFrame:
+    return make_raw_lines()
+
+
+@pytest.fixture
+def lines(raw_lines) -> pd.DataFrame:
+    return process_lines(raw_lines)
@@ -7,6 +7,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import os
 import sys
 from pathlib import Path
 
@@ -15,10 +16,19 @@ src_path = Path(__file__).parent.parent / 'src'
 sys.path.insert(0, str(src_path))
 
 from utils.auto_data_loader import AutoDataLoader
+from utils.shared_dataset import SharedDataset
 from analysis.advanced_analytics import (
     FinancialAnalytics, SalesAnalytics, TimeAnalytics,
     LocationAnalytics, CustomerAnalytics, ProductComparisonAnalytics
 )
+from analysis.invoice_table import build_invoice_table, select_invoices
+from analysis.sales_cube import SalesCube
+from analysis.result_cache import CachedAnalytics, ResultCache, filter_signature
+from analysis.product_classifier import ProductClassifier, set_classifier
+from analysis.forecasting import ForecastAnalytics
+from analysis.market_basket import BasketAnalytics
+from analysis.throughput import ThroughputAnalytics
+from analysis.sketches import QUANTILES, SketchIndex
 
 # Konfiguracija stranice
 st.set_page_config(
@@ -47,27 +57,37 @@ st.markdown("""
         border-radius: 10px;
         border-left: 4px solid #1f77b4;
     }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        padding: 10px 20px;
-        background-color: #f0f2f6;
-        border-radius: 5px 5px 0 0;
-    }
     </style>
 """, unsafe_allow_html=True)
 
 # Inicijalizacija session state
-@st.cache_data
-def load_data_from_folder():
+# cache_resource - sve sesije dijele isti dataset (cache_data bi kopirao DataFrame
+# za svakog pozivatelja na svakom rerunu)
+@st.cache_resource
+def load_data_from_folder() -> SharedDataset:
     """Učitava sve podatke sa cachingom iz data/ foldera."""
     # Pronađi data folder relativno od ovog fajla
     data_path = Path(__file__).parent.parent / 'data'
-    loader = AutoDataLoader(str(data_path))
+    loader = AutoDataLoader(str(data_path), workers=os.cpu_count() or 1, streaming=True)
     df = loader.load_all_racuni()
-    summary = loader.get_summary()
-    return df, summary
+    # Kategorije proizvoda - tablica artikl → kategorija se čuva u cache folderu,
+    # pa se klasificiraju samo novi artikli
+    classifier = ProductClassifier.from_file(mapping_path=str(data_path / '.cache' / 'product_categories.json'))
+    set_classifier(classifier)
+    df['Kategorija'] = classifier.categorize(df['Artikl'])
+    try:
+        classifier.flush()
+    except OSError as e:
+        print(f"⚠️ Tablica kategorija nije spremljena: {str(e)}")
+    # Tablica računa, kocka i sketchevi se grade jednom po datasetu, filteri ih samo sužavaju
+    invoices = build_invoice_table(df)
+    return SharedDataset.from_loader(loader, invoices=invoices, cube=SalesCube.from_frame(df),
+                                     classifier=classifier, sketches=SketchIndex.from_frame(df))
+
+@st.cache_resource
+def get_result_cache():
+    """Zajednički cache rezultata analitike (LRU, najviše 256 MB) za sve sesije."""
+    return ResultCache(max_bytes=256 * 1024 * 1024)
 
 def load_data_from_upload(uploaded_files):
     """Učitava podatke iz upload-ovanih fajlova."""
@@ -100,7 +120,9 @@ st.markdown('<div class="main-header">☕ QUAHWA ANALYTICS DASHBOARD</div>', uns
 # Učitavanje podataka - uvijek pokušaj učitati iz data/ foldera
 with st.spinner('📂 Učitavam podatke...'):
     try:
-        df, data_summary = load_data_from_folder()
+        dataset = load_data_from_folder()
+        df, data_summary = dataset.df, dataset.summary
+        invoices, cube = dataset.derived['invoices'], dataset.derived['cube']
         data_loaded = True
     except Exception as e:
         st.error(f"❌ Greška pri učitavanju: {str(e)}")
@@ -170,8 +192,8 @@ if data_loaded:
             selected_years = available_years
             comparison_mode = False
         
-        # Filtriraj podatke po godinama
-        df_filtered = df[df['Godina'].isin(selected_years)]
+        # Filteri se skupljaju i primjenjuju odjednom (jedan filtrirani pogled po sesiji)
+        cube_filters = {'Godina': selected_years}
         
         st.divider()
         
@@ -187,32 +209,56 @@ if data_loaded:
                                        'Srpanj', 'Kolovoz', 'Rujan', 'Listopad', 'Studeni', 'Prosinac'][x-1]
             )
             if selected_months:
-                df_filtered = df_filtered[df_filtered['Mjesec'].isin(selected_months)]
+                cube_filters['Mjesec'] = selected_months
         
         # Lokal filter (opciono)
-        if 'Lokal' in df_filtered.columns and df_filtered['Lokal'].nunique() > 1:
+        available_locations = dataset.unique('Lokal', cube_filters) if 'Lokal' in df.columns else []
+        if len(available_locations) > 1:
             if st.checkbox("Filtriraj po lokalu", value=False):
                 selected_locations = st.multiselect(
                     "Odaberi lokale:",
-                    df_filtered['Lokal'].unique()
+                    available_locations
                 )
                 if selected_locations:
-                    df_filtered = df_filtered[df_filtered['Lokal'].isin(selected_locations)]
+                    cube_filters['Lokal'] = selected_locations
+        
+        df_filtered = dataset.select(cube_filters)
         
         st.divider()
         st.caption(f"📊 Prikazano: **{len(df_filtered):,}** redova")
         st.caption(f"🗓️ Godine: **{', '.join(map(str, selected_years))}**")
+        
+        # Približni brojevi iz sketcheva (po danu i lokalu) - odmah, prije točnih analiza
+        use_sketches = st.toggle("⚡ Približni brojevi (sketch)", value=True, key='use_sketches',
+                                 help="HyperLogLog i log-histogram po danu i lokalu - greška ~2%")
+        if use_sketches:
+            approx = dataset.derived['sketches'].summary(cube_filters)
+            st.caption(f"🧾 ≈ **{approx['broj_računa']:,}** računa | ≈ **{approx['broj_artikala']:,}** artikala")
     
     # Inicijalizacija analytics objekata
-    fin_analytics = FinancialAnalytics(df_filtered)
-    sales_analytics = SalesAnalytics(df_filtered)
-    time_analytics = TimeAnalytics(df_filtered)
-    loc_analytics = LocationAnalytics(df_filtered)
-    cust_analytics = CustomerAnalytics(df_filtered)
-    comp_analytics = ProductComparisonAnalytics(df_filtered)
+    # Rezultati se spremaju po verziji dataseta i odabranim filterima - isti odabir
+    # (i u drugoj sesiji) ne računa se ponovo
+    invoices_filtered = select_invoices(invoices, df_filtered)
+    cube_filtered = cube.filter(cube_filters)
+    result_cache = get_result_cache()
+    cache_key = (dataset.version, dataset.derived['classifier'].version,
+                 filter_signature(selected_years, cube_filters.get('Mjesec'), cube_filters.get('Lokal')))
+    fin_analytics = CachedAnalytics(FinancialAnalytics, result_cache, cache_key,
+                                    df_filtered, invoices_filtered, cube_filtered)
+    sales_analytics = CachedAnalytics(SalesAnalytics, result_cache, cache_key,
+                                      df_filtered, invoices_filtered, cube_filtered)
+    time_analytics = CachedAnalytics(TimeAnalytics, result_cache, cache_key, df_filtered, cube_filtered)
+    loc_analytics = CachedAnalytics(LocationAnalytics, result_cache, cache_key, df_filtered)
+    cust_analytics = CachedAnalytics(CustomerAnalytics, result_cache, cache_key, df_filtered, invoices_filtered)
+    comp_analytics = CachedAnalytics(ProductComparisonAnalytics, result_cache, cache_key,
+                                     df_filtered, cube_filtered)
+    forecast_analytics = CachedAnalytics(ForecastAnalytics, result_cache, cache_key, df_filtered, cube_filtered)
+    basket_analytics = CachedAnalytics(BasketAnalytics, result_cache, cache_key, df_filtered)
+    throughput_analytics = CachedAnalytics(ThroughputAnalytics, result_cache, cache_key, df_filtered)
     
-    # TABS
-    tabs = st.tabs([
+    # NAVIGACIJA - st.tabs izvršava sve tabove na svakom rerunu, pa se
+    # odabire jedna sekcija i računa samo ona
+    tab_names = [
         "📊 Executive",
         "💰 Financije",
         "🛒 Prodaja",
@@ -223,38 +269,42 @@ if data_loaded:
         "📈 Trendovi",
         "📋 ABC Analiza",
         "📄 Izvještaji"
-    ])
+    ]
+    active_tab = st.radio("Sekcija:", tab_names, horizontal=True, key='active_tab',
+                          label_visibility='collapsed')
     
     # TAB 1: EXECUTIVE DASHBOARD
-    with tabs[0]:
+    if active_tab == tab_names[0]:
         st.header("📊 Executive Dashboard")
         
         # Ako je odabrana više godina, prikaži usporedbu
         if len(selected_years) > 1 and comparison_mode:
             st.subheader("📊 Usporedba Godina - Ključni Pokazatelji")
             
-            # KPI usporedba po godinama
-            yearly_kpis = []
-            for year in selected_years:
-                df_year = df_filtered[df_filtered['Godina'] == year]
-                year_analytics = FinancialAnalytics(df_year)
-                year_kpis = year_analytics.get_kpi_metrics()
-                year_kpis['Godina'] = year
-                yearly_kpis.append(year_kpis)
+            # KPI usporedba po godinama - sve godine odjednom, promjene u odnosu na prvu godinu
+            yearly_kpis = fin_analytics.compare_periods(sorted(selected_years))
+            
+            def delta(value):
+                return f"{value:+.1f}%" if pd.notna(value) else None
             
             # Prikaz u kolonama
-            cols = st.columns(len(selected_years))
-            for idx, year_data in enumerate(yearly_kpis):
+            cols = st.columns(len(yearly_kpis))
+            for idx, (year, year_data) in enumerate(yearly_kpis.iterrows()):
                 with cols[idx]:
-                    st.markdown(f"### {year_data['Godina']}")
-                    st.metric("💰 Promet", f"{year_data['ukupan_promet']:,.0f} EUR")
-                    st.metric("🧾 Računi", f"{year_data['broj_računa']:,}")
-                    st.metric("💵 Pros. Račun", f"{year_data['prosječan_račun']:.2f} EUR")
-                    st.metric("📦 Količina", f"{year_data['ukupna_količina']:,.0f}")
+                    st.markdown(f"### {year}")
+                    show_delta = idx > 0
+                    st.metric("💰 Promet", f"{year_data['ukupan_promet']:,.0f} EUR",
+                             delta=delta(year_data['ukupan_promet_promjena%']) if show_delta else None)
+                    st.metric("🧾 Računi", f"{year_data['broj_računa']:,}",
+                             delta=delta(year_data['broj_računa_promjena%']) if show_delta else None)
+                    st.metric("💵 Pros. Račun", f"{year_data['prosječan_račun']:.2f} EUR",
+                             delta=delta(year_data['prosječan_račun_promjena%']) if show_delta else None)
+                    st.metric("📦 Količina", f"{year_data['ukupna_količina']:,.0f}",
+                             delta=delta(year_data['ukupna_količina_promjena%']) if show_delta else None)
             
             # Grafikon usporedbe prometa po godinama
             st.divider()
-            yearly_revenue = df_filtered.groupby('Godina')['Ukupno'].sum().reset_index()
+            yearly_revenue = cube_filtered.rollup('Godina', ['Ukupno'])
             yearly_revenue.columns = ['Godina', 'Promet']
             yearly_revenue = yearly_revenue.sort_values('Godina')
             
@@ -285,7 +335,7 @@ if data_loaded:
             
             # Mjesečni trend kroz godine
             st.subheader("📈 Mjesečni Trend - Usporedba Godina")
-            monthly_data = df_filtered.groupby(['Godina', 'Mjesec'])['Ukupno'].sum().reset_index()
+            monthly_data = cube_filtered.rollup(['Godina', 'Mjesec'], ['Ukupno'])
             
             # Dodaj statistiku
             mjesec_names = {1:'Siječanj', 2:'Veljača', 3:'Ožujak', 4:'Travanj', 5:'Svibanj', 6:'Lipanj',
@@ -384,7 +434,7 @@ if data_loaded:
                 top5 = sales_analytics.get_top_products(5)
                 
                 total_top5 = top5['Promet'].sum()
-                total_all_prod = df_filtered['Ukupno'].sum()
+                total_all_prod = cube_filtered.total('Ukupno')
                 top5_share = (total_top5 / total_all_prod * 100) if total_all_prod > 0 else 0
                 
                 fig = go.Figure(data=[
@@ -413,7 +463,7 @@ if data_loaded:
 
     
     # TAB 2: FINANCIJSKA ANALIZA
-    with tabs[1]:
+    if active_tab == tab_names[1]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"💰 Financijska Analiza - {year_text}")
         
@@ -523,16 +573,34 @@ if data_loaded:
             hide_index=True,
             use_container_width=True
         )
+        
+        # Distribucija vrijednosti računa i cijena stavki
+        st.subheader("📦 Distribucija Vrijednosti Računa")
+        if use_sketches:
+            sketches = dataset.derived['sketches']
+            distribution = pd.DataFrame({
+                'Iznos računa (EUR)': sketches.quantiles('iznos_računa', QUANTILES, cube_filters),
+                'Cijena stavke (EUR)': sketches.quantiles('cijena_stavke', QUANTILES, cube_filters),
+            })
+            st.caption("≈ Približno (sketch, relativna greška ~1%)")
+        else:
+            labels = [f'P{q * 100:g}' for q in QUANTILES]
+            distribution = pd.DataFrame({
+                'Iznos računa (EUR)': invoices_filtered['Ukupno'].quantile(QUANTILES).set_axis(labels),
+                'Cijena stavke (EUR)': (df_filtered['Cijena'].quantile(QUANTILES).set_axis(labels)
+                                        if 'Cijena' in df_filtered.columns else None),
+            })
+        st.dataframe(distribution.T.round(2), width='stretch')
     
     # TAB 3: ANALIZA PRODAJE
-    with tabs[2]:
+    if active_tab == tab_names[2]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"🛒 Analiza Prodaje - {year_text}")
         
         # Basket metrics
         basket = sales_analytics.get_basket_analysis()
         
-        n_racuna = df_filtered['Fiskalni broj računa'].nunique()
+        n_racuna = len(invoices_filtered)
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -554,7 +622,7 @@ if data_loaded:
             top20 = sales_analytics.get_top_products(20)
             
             total_top20 = top20['Promet'].sum()
-            total_promet = df_filtered['Ukupno'].sum()
+            total_promet = cube_filtered.total('Ukupno')
             share_top20 = (total_top20 / total_promet * 100) if total_promet > 0 else 0
             
             fig = px.bar(top20, y='Artikl', x='Promet', orientation='h',
@@ -585,9 +653,38 @@ if data_loaded:
             width='stretch',
             height=400
         )
+        
+        st.divider()
+        
+        # Analiza korpe - artikli koji se prodaju zajedno
+        st.subheader("🧺 Artikli koji se Prodaju Zajedno")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            min_support = st.slider("Min. podrška (% računa)", 0.1, 10.0, 1.0, 0.1) / 100
+        with col2:
+            min_confidence = st.slider("Min. pouzdanost (%)", 0, 100, 10, 5) / 100
+        
+        rules = basket_analytics.get_rules(min_support=min_support, min_confidence=min_confidence)
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            st.markdown("**Pravila (ako je na računu A, tu je i B)**")
+            if len(rules) > 0:
+                st.dataframe(rules.head(50).round(2), hide_index=True, width='stretch', height=400,
+                             column_config={'Lift': st.column_config.NumberColumn(
+                                 help="Lift > 1: artikli se kupuju zajedno češće nego slučajno")})
+            else:
+                st.info("Nema pravila za odabrane pragove")
+        with col2:
+            st.markdown("**Česti skupovi artikala (FP-growth)**")
+            itemsets = basket_analytics.get_frequent_itemsets(min_support=min_support)
+            if len(itemsets) > 0:
+                st.dataframe(itemsets.head(50).round(2), hide_index=True, width='stretch', height=400)
+            else:
+                st.info("Nema skupova za odabrani prag podrške")
     
     # TAB 4: VREMENSKA ANALIZA
-    with tabs[3]:
+    if active_tab == tab_names[3]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"⏰ Vremenska Analiza - {year_text}")
         
@@ -625,7 +722,18 @@ if data_loaded:
         
         # Heatmap
         st.subheader("🔥 Heatmap - Dan × Sat (Promet u EUR)")
-        heatmap_data = time_analytics.get_heatmap_data()
+        
+        # Heatmap jednog lokala ili artikla - izrez iz istih nizova, bez novog prolaza
+        col1, col2 = st.columns(2)
+        with col1:
+            heatmap_level = st.selectbox("Heatmap za", ["Ukupno", "Lokal", "Artikl"], key='heatmap_level')
+        heatmap_value = None
+        if heatmap_level != "Ukupno":
+            with col2:
+                heatmap_value = st.selectbox(heatmap_level, sorted(dataset.unique(heatmap_level, cube_filters)),
+                                             key='heatmap_value')
+        heatmap_data = time_analytics.get_heatmap_data(
+            None if heatmap_level == "Ukupno" else heatmap_level, heatmap_value)
         
         day_names = ['Pon', 'Uto', 'Sri', 'Čet', 'Pet', 'Sub', 'Ned']
         
@@ -634,7 +742,7 @@ if data_loaded:
         fig = go.Figure(data=go.Heatmap(
             z=heatmap_data.values,
             x=heatmap_data.columns,
-            y=day_names,
+            y=[day_names[d] for d in heatmap_data.index],
             colorscale='Blues',
             text=heatmap_data.values.round(0),
             texttemplate='%{text} EUR',
@@ -648,183 +756,240 @@ if data_loaded:
             yaxis_title='Dan u Tjednu'
         )
         st.plotly_chart(fig, use_container_width=True)
+        
+        # Kalendar - mjesec × dan u mjesecu
+        st.subheader("📆 Heatmap - Mjesec × Dan u Mjesecu (Promet u EUR)")
+        calendar_data = time_analytics.get_calendar_heatmap(
+            None if heatmap_level == "Ukupno" else heatmap_level, heatmap_value)
+        month_names = ['Sij', 'Velj', 'Ožu', 'Tra', 'Svi', 'Lip', 'Srp', 'Kol', 'Ruj', 'Lis', 'Stu', 'Pro']
+        
+        fig = go.Figure(data=go.Heatmap(
+            z=calendar_data.values,
+            x=calendar_data.columns,
+            y=[month_names[m - 1] for m in calendar_data.index],
+            colorscale='Blues',
+            colorbar=dict(title="Promet (EUR)")
+        ))
+        fig.update_layout(height=450, xaxis_title='Dan u Mjesecu', yaxis_title='Mjesec')
+        st.plotly_chart(fig, use_container_width=True)
 
     
     # TAB 5: USPOREDBE PROIZVODA I KATEGORIJA
-    with tabs[4]:
+    if active_tab == tab_names[4]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"📅 Usporedbe Prodaje - {year_text}")
         
         st.markdown("### 📊 Usporedba po Kategorijama Proizvoda")
-        
-        # Usporedba kategorija mjesečno
-        cat_comparison = comp_analytics.compare_categories_monthly()
-        
-        # Prikaži promet po kategorijama
-        st.subheader("Mjesečni Promet po Kategorijama")
-        revenue_df = cat_comparison['mjesecni_promet']
-        
-        # Graf - sve kategorije kroz vrijeme
-        n_cat = len(revenue_df.columns)
-        
-        fig = go.Figure()
-        for col in revenue_df.columns:
-            fig.add_trace(go.Scatter(
-                x=revenue_df.index,
-                y=revenue_df[col],
-                name=col,
-                mode='lines+markers'
-            ))
-        fig.update_layout(
-            title=f'Trend Prodaje po Kategorijama | n={n_cat} kategorija',
-            xaxis_title='Mjesec (Period)',
-            yaxis_title='Promet (EUR)',
-            height=500,
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Tablica sa % promjenama
-        st.subheader("% Promjena Prometa Mjesec-na-Mjesec (MoM%)")
-        st.caption("Pozitivne vrijednosti (zeleno) = rast, negativne (crveno) = pad prometa u odnosu na prethodni mjesec")
-        pct_change_df = cat_comparison['promjena_promet_%']
-        
-        # Formatiraj za prikaz
-        styled_df = pct_change_df.style.format("{:.1f}%")\
-            .background_gradient(cmap='RdYlGn', axis=None, vmin=-50, vmax=50)
-        st.dataframe(styled_df, use_container_width=True, height=400)
-        
-        st.markdown("---")
-        st.markdown("### 🎯 Usporedba Specifičnih Proizvoda")
-        
-        # Odabir proizvoda za usporedbu
-        all_products = sorted(df_filtered['Artikl'].unique())
-        
-        # Prikaz top proizvoda kao preporučenih
-        top_products_list = df_filtered.groupby('Artikl')['Ukupno'].sum().nlargest(15).index.tolist()
-        
-        st.write("**Top 15 proizvoda:**", ", ".join(top_products_list[:10]) + "...")
-        
-        selected_products = st.multiselect(
-            "Odaberi proizvode za usporedbu:",
-            options=all_products,
-            default=top_products_list[:5]
-        )
-        
-        if selected_products:
-            prod_comparison = comp_analytics.compare_products_monthly(products=selected_products)
+        if st.toggle("Prikaži usporedbu kategorija", value=True, key='cmp_categories'):
+            # Usporedba kategorija mjesečno
+            cat_comparison = comp_analytics.compare_categories_monthly()
             
-            # Graf prometa odabranih proizvoda
-            st.subheader(f"Mjesečni Promet - Odabrani Proizvodi (n={len(selected_products)})")
-            prod_revenue = prod_comparison['mjesecni_promet']
+            # Prikaži promet po kategorijama
+            st.subheader("Mjesečni Promet po Kategorijama")
+            revenue_df = cat_comparison['mjesecni_promet']
             
-            total_selected = prod_revenue.sum().sum()
+            # Graf - sve kategorije kroz vrijeme
+            n_cat = len(revenue_df.columns)
             
             fig = go.Figure()
-            for col in prod_revenue.columns:
+            for col in revenue_df.columns:
                 fig.add_trace(go.Scatter(
-                    x=prod_revenue.index,
-                    y=prod_revenue[col],
+                    x=revenue_df.index,
+                    y=revenue_df[col],
                     name=col,
                     mode='lines+markers'
                 ))
             fig.update_layout(
-                title=f'Mjesečni Trend | Ukupno={total_selected:,.0f} EUR',
-                xaxis_title='Period (Godina-Mjesec)',
+                title=f'Trend Prodaje po Kategorijama | n={n_cat} kategorija',
+                xaxis_title='Mjesec (Period)',
                 yaxis_title='Promet (EUR)',
                 height=500,
                 hovermode='x unified'
             )
             st.plotly_chart(fig, use_container_width=True)
             
-            # % promjene MoM
-            st.subheader("% Promjena MoM (Mjesec vs Prethodni Mjesec)")
-            prod_pct_change = prod_comparison['promjena_promet_%']
+            # Tablica sa % promjenama
+            st.subheader("% Promjena Prometa Mjesec-na-Mjesec (MoM%)")
+            st.caption("Pozitivne vrijednosti (zeleno) = rast, negativne (crveno) = pad prometa u odnosu na prethodni mjesec")
+            pct_change_df = cat_comparison['promjena_promet_%']
             
-            styled_prod = prod_pct_change.style.format("{:.1f}%")\
+            # Formatiraj za prikaz
+            styled_df = pct_change_df.style.format("{:.1f}%")\
                 .background_gradient(cmap='RdYlGn', axis=None, vmin=-50, vmax=50)
-            st.dataframe(styled_prod, use_container_width=True, height=400)
+            st.dataframe(styled_df, use_container_width=True, height=400)
         
         st.markdown("---")
-        st.markdown("### 🚀 Proizvodi s Najvećim Rastom i Padom")
-        
-        growers_decliners = comp_analytics.top_growers_and_decliners(period='M')
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("📈 TOP 10 - Najveći Rast (MoM%)")
-            st.caption("Proizvodi s najvećim postotnim rastom mjesec-na-mjesec")
-            if not growers_decliners['najveci_rast'].empty:
-                growth_df = growers_decliners['najveci_rast']
-                # Formatiranje
-                styled_growth = growth_df.style.format({
-                    'Promjena_%': '{:.1f}%',
-                    growth_df.columns[1]: '{:,.0f} EUR',
-                    growth_df.columns[2]: '{:,.0f} EUR'
-                }).background_gradient(subset=['Promjena_%'], cmap='Greens')
-                st.dataframe(styled_growth, use_container_width=True, height=400)
+        st.markdown("### 🎯 Usporedba Specifičnih Proizvoda")
+        if st.toggle("Prikaži usporedbu proizvoda", value=False, key='cmp_products'):
+            # Odabir proizvoda za usporedbu
+            all_products = sorted(df_filtered['Artikl'].unique())
+            
+            # Prikaz top proizvoda kao preporučenih
+            product_revenue = cube_filtered.rollup('Artikl', ['Ukupno']).set_index('Artikl')['Ukupno']
+            top_products_list = product_revenue.nlargest(15).index.tolist()
+            
+            st.write("**Top 15 proizvoda:**", ", ".join(top_products_list[:10]) + "...")
+            
+            selected_products = st.multiselect(
+                "Odaberi proizvode za usporedbu:",
+                options=all_products,
+                default=top_products_list[:5]
+            )
+            
+            if selected_products:
+                prod_comparison = comp_analytics.compare_products_monthly(products=selected_products)
+                
+                # Graf prometa odabranih proizvoda
+                st.subheader(f"Mjesečni Promet - Odabrani Proizvodi (n={len(selected_products)})")
+                prod_revenue = prod_comparison['mjesecni_promet']
+                
+                total_selected = prod_revenue.sum().sum()
+                
+                fig = go.Figure()
+                for col in prod_revenue.columns:
+                    fig.add_trace(go.Scatter(
+                        x=prod_revenue.index,
+                        y=prod_revenue[col],
+                        name=col,
+                        mode='lines+markers'
+                    ))
+                fig.update_layout(
+                    title=f'Mjesečni Trend | Ukupno={total_selected:,.0f} EUR',
+                    xaxis_title='Period (Godina-Mjesec)',
+                    yaxis_title='Promet (EUR)',
+                    height=500,
+                    hovermode='x unified'
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # % promjene MoM
+                st.subheader("% Promjena MoM (Mjesec vs Prethodni Mjesec)")
+                prod_pct_change = prod_comparison['promjena_promet_%']
+                
+                styled_prod = prod_pct_change.style.format("{:.1f}%")\
+                    .background_gradient(cmap='RdYlGn', axis=None, vmin=-50, vmax=50)
+                st.dataframe(styled_prod, use_container_width=True, height=400)
         
-        with col2:
-            st.subheader("📉 TOP 10 - Najveći Pad (MoM%)")
-            st.caption("Proizvodi s najvećim postotnim padom mjesec-na-mjesec")
-            if not growers_decliners['najveci_pad'].empty:
-                decline_df = growers_decliners['najveci_pad']
-                styled_decline = decline_df.style.format({
-                    'Promjena_%': '{:.1f}%',
-                    decline_df.columns[1]: '{:,.0f} EUR',
-                    decline_df.columns[2]: '{:,.0f} EUR'
-                }).background_gradient(subset=['Promjena_%'], cmap='Reds_r')
-                st.dataframe(styled_decline, use_container_width=True, height=400)
+        st.markdown("---")
+        st.markdown("### 🚀 Proizvodi s Najvećim Rastom i Padom")
+        if st.toggle("Prikaži rast i pad proizvoda", value=False, key='cmp_growers'):
+            growers_decliners = comp_analytics.top_growers_and_decliners(period='M')
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("📈 TOP 10 - Najveći Rast (MoM%)")
+                st.caption("Proizvodi s najvećim postotnim rastom mjesec-na-mjesec")
+                if not growers_decliners['najveci_rast'].empty:
+                    growth_df = growers_decliners['najveci_rast']
+                    # Formatiranje
+                    styled_growth = growth_df.style.format({
+                        'Promjena_%': '{:.1f}%',
+                        growth_df.columns[1]: '{:,.0f} EUR',
+                        growth_df.columns[2]: '{:,.0f} EUR'
+                    }).background_gradient(subset=['Promjena_%'], cmap='Greens')
+                    st.dataframe(styled_growth, use_container_width=True, height=400)
+            
+            with col2:
+                st.subheader("📉 TOP 10 - Najveći Pad (MoM%)")
+                st.caption("Proizvodi s najvećim postotnim padom mjesec-na-mjesec")
+                if not growers_decliners['najveci_pad'].empty:
+                    decline_df = growers_decliners['najveci_pad']
+                    styled_decline = decline_df.style.format({
+                        'Promjena_%': '{:.1f}%',
+                        decline_df.columns[1]: '{:,.0f} EUR',
+                        decline_df.columns[2]: '{:,.0f} EUR'
+                    }).background_gradient(subset=['Promjena_%'], cmap='Reds_r')
+                    st.dataframe(styled_decline, use_container_width=True, height=400)
         
         st.markdown("---")
         st.markdown("### 📆 Usporedba Godina (Year-over-Year - isti mjesec)")
-        st.caption("Usporedit ćemo isti mjesec kroz različite godine da vidimo YoY promjene")
-        
-        # Odabir mjeseca za year-over-year usporedbu
-        month_names = ['Siječanj', 'Veljača', 'Ožujak', 'Travanj', 'Svibanj', 'Lipanj',
-                      'Srpanj', 'Kolovoz', 'Rujan', 'Listopad', 'Studeni', 'Prosinac']
-        
-        selected_month_name = st.selectbox("Odaberi mjesec za usporedbu:", month_names, index=0)
-        selected_month_num = month_names.index(selected_month_name) + 1
-        
-        yoy_comparison = comp_analytics.year_over_year_comparison(selected_month_num)
-        
-        if not yoy_comparison['promet_po_godinama'].empty:
-            st.subheader(f"Promet po Kategorijama - {selected_month_name} (svih godina)")
-            yoy_revenue = yoy_comparison['promet_po_godinama']
+        if st.toggle("Prikaži usporedbu godina", value=False, key='cmp_yoy'):
+            st.caption("Usporedit ćemo isti mjesec kroz različite godine da vidimo YoY promjene")
             
-            n_years_yoy = len(yoy_revenue.columns)
+            # Odabir mjeseca za year-over-year usporedbu
+            month_names = ['Siječanj', 'Veljača', 'Ožujak', 'Travanj', 'Svibanj', 'Lipanj',
+                          'Srpanj', 'Kolovoz', 'Rujan', 'Listopad', 'Studeni', 'Prosinac']
             
-            # Bar chart usporedbe
-            fig = go.Figure()
-            for col in [c for c in yoy_revenue.columns if c != 'Promjena_%']:
-                fig.add_trace(go.Bar(
-                    name=str(col),
-                    x=yoy_revenue.index,
-                    y=yoy_revenue[col]
-                ))
-            fig.update_layout(
-                barmode='group',
-                title=f'Usporedba {selected_month_name} kroz n={n_years_yoy} godina',
-                xaxis_title='Kategorija',
-                yaxis_title='Promet (EUR)',
-                height=400
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            selected_month_name = st.selectbox("Odaberi mjesec za usporedbu:", month_names, index=0)
+            selected_month_num = month_names.index(selected_month_name) + 1
+            
+            yoy_comparison = comp_analytics.year_over_year_comparison(selected_month_num)
+            
+            if not yoy_comparison['promet_po_godinama'].empty:
+                st.subheader(f"Promet po Kategorijama - {selected_month_name} (svih godina)")
+                yoy_revenue = yoy_comparison['promet_po_godinama']
+                
+                n_years_yoy = len(yoy_revenue.columns)
+                
+                # Bar chart usporedbe
+                fig = go.Figure()
+                for col in [c for c in yoy_revenue.columns if c != 'Promjena_%']:
+                    fig.add_trace(go.Bar(
+                        name=str(col),
+                        x=yoy_revenue.index,
+                        y=yoy_revenue[col]
+                    ))
+                fig.update_layout(
+                    barmode='group',
+                    title=f'Usporedba {selected_month_name} kroz n={n_years_yoy} godina',
+                    xaxis_title='Kategorija',
+                    yaxis_title='Promet (EUR)',
+                    height=400
+                )
+                st.plotly_chart(fig, use_container_width=True)
+                
+                # Tablica s promjenama
+                if 'Promjena_%' in yoy_revenue.columns:
+                    st.subheader("% Promjena YoY (Year-over-Year)")
+                    st.caption("Promjena između najnovije i prethodne godine za isti mjesec")
+                    styled_yoy = yoy_revenue.style.format({
+                        col: '{:,.0f} EUR' for col in yoy_revenue.columns if col != 'Promjena_%'
+                    } | {'Promjena_%': '{:.1f}%'})\
+                        .background_gradient(subset=['Promjena_%'], cmap='RdYlGn', vmin=-50, vmax=50)
+                    st.dataframe(styled_yoy, use_container_width=True)
+        
+        st.markdown("---")
+        st.markdown("### 🗓️ Usporedba Dva Perioda")
+        if st.toggle("Prikaži usporedbu perioda", value=False, key='cmp_periods'):
+            st.caption("Proizvoljni rasponi datuma - računa se iz dnevnih kumulativnih suma (trenutno i na više godina)")
             
-            # Tablica s promjenama
-            if 'Promjena_%' in yoy_revenue.columns:
-                st.subheader("% Promjena YoY (Year-over-Year)")
-                st.caption("Promjena između najnovije i prethodne godine za isti mjesec")
-                styled_yoy = yoy_revenue.style.format({
-                    col: '{:,.0f} EUR' for col in yoy_revenue.columns if col != 'Promjena_%'
-                } | {'Promjena_%': '{:.1f}%'})\
-                    .background_gradient(subset=['Promjena_%'], cmap='RdYlGn', vmin=-50, vmax=50)
-                st.dataframe(styled_yoy, use_container_width=True)
+            days = cube_filtered.level_for(['Datum'])['Datum'].dropna()
+            if not days.empty:
+                first_day, last_day = days.min().date(), days.max().date()
+                default_end = last_day
+                default_start = max(first_day, last_day - pd.Timedelta(days=29))
+                default_prev_end = max(first_day, default_start - pd.Timedelta(days=1))
+                default_prev_start = max(first_day, default_prev_end - pd.Timedelta(days=29))
+                
+                col1, col2 = st.columns(2)
+                with col1:
+                    range1 = st.date_input("Period 1:", value=(default_prev_start, default_prev_end),
+                                           min_value=first_day, max_value=last_day, key='period1')
+                with col2:
+                    range2 = st.date_input("Period 2:", value=(default_start, default_end),
+                                           min_value=first_day, max_value=last_day, key='period2')
+                
+                if len(range1) == 2 and len(range2) == 2:
+                    period_cmp = time_analytics.get_period_comparison(tuple(range1), tuple(range2))
+                    p1, p2, growth = period_cmp['period1'], period_cmp['period2'], period_cmp['growth']
+                    
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("💰 Promet (Period 2)", f"{p2['promet']:,.2f} EUR",
+                                 delta=f"{growth['promet_%']:.1f}%",
+                                 help=f"Period 1: {p1['promet']:,.2f} EUR")
+                    with col2:
+                        st.metric("🧾 Računi (Period 2)", f"{p2['računi']:,}",
+                                 delta=f"{growth['računi_%']:.1f}%",
+                                 help=f"Period 1: {p1['računi']:,}")
+                    with col3:
+                        st.metric("📦 Količina (Period 2)", f"{p2['količina']:,.0f}",
+                                 delta=f"{growth['količina_%']:.1f}%",
+                                 help=f"Period 1: {p1['količina']:,.0f}")
     
     # TAB 6: LOKACIJE
-    with tabs[5]:
+    if active_tab == tab_names[5]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"🏪 Analiza po Lokalu - {year_text}")
         
@@ -852,9 +1017,60 @@ if data_loaded:
         if not staff_perf.empty:
             st.subheader("👤 Performanse Osoblja")
             st.dataframe(staff_perf.head(20).round(2), hide_index=True, width='stretch', height=400)
+        
+        st.divider()
+        
+        # Opterećenje i potrebno osoblje (računi po slotu, Littleov zakon)
+        st.subheader("⏱️ Opterećenje i Potrebno Osoblje")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            slot_minutes = st.radio("Slot", [5, 15], index=1, format_func=lambda m: f"{m} min",
+                                    horizontal=True, key='slot_minutes')
+        with col2:
+            service_minutes = st.slider("Vrijeme usluge (min)", 0.5, 10.0, 3.0, 0.5,
+                                        help="Prosječno vrijeme pripreme i naplate jednog računa")
+        with col3:
+            load_percentile = st.select_slider("Percentil opterećenja", [50, 75, 90, 95], value=90)
+        with col4:
+            staffing_by = st.selectbox("Po", ["Lokal", "Blagajna"], key='staffing_by')
+        
+        staffing = throughput_analytics.get_staffing(slot_minutes, staffing_by, service_minutes, load_percentile)
+        if staffing.empty:
+            st.info("Nema računa za odabrane filtere")
+        else:
+            staffing_value = st.selectbox(staffing_by, list(staffing[staffing_by].unique()), key='staffing_value')
+            selected = staffing[staffing[staffing_by] == staffing_value]
+            grid = selected.pivot(index='Dan_u_tjednu_broj', columns='Slot', values='Potrebno_osoblje')
+            
+            day_names = ['Pon', 'Uto', 'Sri', 'Čet', 'Pet', 'Sub', 'Ned']
+            fig = go.Figure(data=go.Heatmap(
+                z=grid.values,
+                x=grid.columns,
+                y=[day_names[d] for d in grid.index],
+                colorscale='Oranges',
+                colorbar=dict(title="Osoblje")
+            ))
+            fig.update_layout(
+                title=f'Potrebno osoblje | P{load_percentile} računa po slotu × {service_minutes:g} min usluge',
+                height=400, xaxis_title='Početak slota', yaxis_title='Dan u Tjednu'
+            )
+            st.plotly_chart(fig, use_container_width=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Vršno opterećenje (računa u 60 min)**")
+                peaks = throughput_analytics.get_peak_percentiles(5, 60, staffing_by)
+                peaks = peaks[peaks[staffing_by] == staffing_value].drop(columns=[staffing_by, 'Dan_u_tjednu_broj'])
+                st.dataframe(peaks, hide_index=True, width='stretch')
+            with col2:
+                st.markdown("**Špice (prosjek ≥ 1.5× prosječnog slota)**")
+                rush = throughput_analytics.get_rush_hours(slot_minutes, staffing_by)
+                rush = rush[rush[staffing_by] == staffing_value].drop(columns=[staffing_by, 'Dan_u_tjednu_broj'])
+                st.dataframe(rush.round(2), hide_index=True, width='stretch', height=300)
     
     # TAB 7: KUPCI
-    with tabs[6]:
+    if active_tab == tab_names[6]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"👥 Analiza Kupaca - {year_text}")
         
@@ -893,7 +1109,7 @@ if data_loaded:
             st.dataframe(top_customers.round(2), hide_index=True, width='stretch')
     
     # TAB 8: TRENDOVI
-    with tabs[7]:
+    if active_tab == tab_names[7]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"📈 Trendovi i Prognoze - {year_text}")
         
@@ -915,6 +1131,59 @@ if data_loaded:
         fig.update_layout(height=400, hovermode='x unified')
         st.plotly_chart(fig, use_container_width=True)
         
+        # Prognoza (Holt-Winters sa tjednom i godišnjom sezonalnošću)
+        # Modeli se prilagođavaju jednom po datasetu i filteru (result cache)
+        st.subheader("🔮 Prognoza Prometa")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            horizon = st.radio("Horizont", [30, 90], format_func=lambda h: f"{h} dana", horizontal=True)
+        with col2:
+            forecast_level = st.selectbox("Razina", ["Ukupno", "Prodajna grupa", "Artikl"])
+        with col3:
+            forecast_top = st.slider("Top serija (po prometu)", 5, 500, 100, disabled=forecast_level == "Ukupno")
+        
+        dimension = None if forecast_level == "Ukupno" else forecast_level
+        model = forecast_analytics.fit(dimension, None if dimension is None else forecast_top)
+        
+        if model is None:
+            st.info("Nema podataka za prognozu")
+        else:
+            selected_series = model.keys[0]
+            if dimension is not None:
+                selected_series = st.selectbox(f"{forecast_level} za graf", model.keys)
+            forecast = model.forecast(horizon)
+            if dimension is not None:
+                forecast = forecast[forecast[dimension] == selected_series]
+                history = cube_filtered.rollup(['Datum', dimension], ['Ukupno'])
+                history = history[history[dimension] == selected_series]
+            else:
+                history = cube_filtered.rollup('Datum', ['Ukupno'])
+            history = history[history['Datum'] >= model.first_day + pd.Timedelta(days=model.n_days - 180)]
+            
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(x=history['Datum'], y=history['Ukupno'],
+                                    mode='lines', name='Stvarni promet',
+                                    line=dict(color='lightblue', width=1)))
+            fig.add_trace(go.Scatter(x=forecast['Datum'], y=forecast['Gornja_granica'],
+                                    mode='lines', line=dict(width=0), showlegend=False))
+            fig.add_trace(go.Scatter(x=forecast['Datum'], y=forecast['Donja_granica'],
+                                    mode='lines', line=dict(width=0), fill='tonexty',
+                                    fillcolor='rgba(255,127,14,0.2)', name='95% interval'))
+            fig.add_trace(go.Scatter(x=forecast['Datum'], y=forecast['Prognoza'],
+                                    mode='lines', name='Prognoza',
+                                    line=dict(color='darkorange', width=2)))
+            fig.update_layout(height=400, hovermode='x unified',
+                              title=f"{selected_series} - prognoza {horizon} dana")
+            st.plotly_chart(fig, use_container_width=True)
+            
+            if dimension is not None:
+                summary = model.summary(horizon).rename(columns={'Prognoza': f'Prognoza {horizon} dana (€)'})
+                st.dataframe(summary.round(2), hide_index=True, width='stretch')
+            else:
+                st.metric(f"Prognoza prometa - {horizon} dana",
+                          f"{model.summary(horizon)['Prognoza'].iloc[0]:,.2f} €")
+        
         # Growth metrics
         st.subheader("📊 Growth Metrics")
         monthly = fin_analytics.get_monthly_metrics()
@@ -940,14 +1209,14 @@ if data_loaded:
 
     
     # TAB 9: ABC ANALIZA
-    with tabs[8]:
+    if active_tab == tab_names[8]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"📋 ABC/Pareto Analiza - {year_text}")
         
         abc_data = sales_analytics.get_abc_analysis()
         
         # Sažetak
-        abc_summary = abc_data.groupby('ABC').agg({
+        abc_summary = abc_data.groupby('ABC', observed=True).agg({
             'Artikl': 'count',
             'Promet': 'sum',
             'Udio%': 'sum'
@@ -1017,13 +1286,14 @@ if data_loaded:
         )
     
     # TAB 10: IZVJEŠTAJI
-    with tabs[9]:
+    if active_tab == tab_names[9]:
         year_text = ', '.join(map(str, selected_years)) if len(selected_years) <= 3 else f"{len(selected_years)} godina"
         st.header(f"📄 Izvještaji i Export - {year_text}")
         
         st.subheader("📊 Sažeti Izvještaj")
         
         # Generiraj sažetak
+        kpis = fin_analytics.get_kpi_metrics()
         summary_data = {
             'Metrika': [
                 'Ukupan Promet',
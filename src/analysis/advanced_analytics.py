@@ -6,27 +6,68 @@ import numpy as np
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 
+from .query_engine import query_engine
+from .invoice_table import build_invoice_table
+from .sales_cube import SalesCube
+from .product_classifier import ProductClassifier, get_classifier
+from .daily_index import DailyIndex, period_bounds
+from .time_patterns import TimePatternKernel
+
+# Cjelobrojni ključevi perioda u kocki (godina + mjesec/kvartal)
+PERIOD_KEYS = {'M': ['Godina', 'Mjesec'], 'Q': ['Godina', 'Kvartal']}
+
 
 class FinancialAnalytics:
     """Financijske analize."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, invoices: Optional[pd.DataFrame] = None,
+                 cube: Optional[SalesCube] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            invoices: Tablica računa (build_invoice_table) - ako nije zadana, gradi se iz df
+            cube: Kocka prodaje (SalesCube) - ako nije zadana, gradi se iz df
+        """
         self.df = df
+        self._invoices = invoices
+        self._cube = cube
+        self._kpi_index = None
+    
+    @property
+    def invoices(self) -> pd.DataFrame:
+        """Tablica računa (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._invoices is None:
+            self._invoices = build_invoice_table(self.df)
+        return self._invoices
+    
+    @property
+    def cube(self) -> SalesCube:
+        """Kocka prodaje (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._cube is None:
+            self._cube = SalesCube.from_frame(self.df)
+        return self._cube
+    
+    @property
+    def kpi_index(self) -> DailyIndex:
+        """Dnevni indeks KPI mjera (gradi se pri prvom korištenju)."""
+        if self._kpi_index is None:
+            self._kpi_index = DailyIndex.for_kpis(self.df)
+        return self._kpi_index
     
     def get_kpi_metrics(self) -> Dict:
         """Ključni KPI pokazatelji."""
         df = self.df
         
         total_revenue = df['Ukupno'].sum()
-        total_invoices = df['Fiskalni broj računa'].nunique()
-        avg_invoice = df.groupby('Fiskalni broj računa')['Ukupno'].sum().mean()
+        total_invoices = len(self.invoices)
+        avg_invoice = self.invoices['Ukupno'].mean()
         total_items = df['Količina'].sum()
         
         # PDV analiza
         total_pdv = df['PDV'].sum() if 'PDV' in df.columns else 0
         
         # Analiza po načinu plaćanja
-        payment_split = df.groupby('Način plaćanja')['Ukupno'].sum() if 'Način plaćanja' in df.columns else {}
+        payment_split = df.groupby('Način plaćanja', observed=True)['Ukupno'].sum() if 'Način plaćanja' in df.columns else {}
         
         return {
             'ukupan_promet': total_revenue,
@@ -38,15 +79,54 @@ class FinancialAnalytics:
             'načini_plaćanja': payment_split
         }
     
+    def compare_periods(self, periods: List, baseline: Optional[int] = 0) -> pd.DataFrame:
+        """
+        KPI pokazatelji za više perioda odjednom (iz dnevnog indeksa, O(1) po periodu).
+        
+        Args:
+            periods: Lista perioda - godine (2025), mjeseci ('2025-03'), ISO tjedni
+                ('2025-W05'), pd.Period ili rasponi (od, do)
+            baseline: Redni broj perioda s kojim se uspoređuje (None = bez promjena)
+        
+        Returns:
+            DataFrame sa jednim redom po periodu (indeks 'Period'): Od, Do, KPI kolone
+            kao u get_kpi_metrics, 'Plaćanje: <način>' i '<kpi>_promjena%' u odnosu na
+            bazni period
+        """
+        bounds = [period_bounds(period) for period in periods]
+        totals = self.kpi_index.totals([(start, end) for _, start, end in bounds])
+        
+        racuni = totals['Racuni']
+        result = pd.DataFrame({
+            'Od': [start.date() for _, start, _ in bounds],
+            'Do': [end.date() for _, _, end in bounds],
+            'ukupan_promet': totals['Ukupno'],
+            'broj_računa': racuni,
+            'prosječan_račun': (totals['Iznos_računa'] / racuni).where(racuni > 0),
+            'ukupna_količina': totals['Količina'] if 'Količina' in totals.columns else 0,
+            'ukupan_pdv': totals['PDV'] if 'PDV' in totals.columns else 0,
+            'stavki_po_računu': (totals['Stavke'] / racuni).where(racuni > 0, 0),
+        })
+        for column in totals.columns:
+            if column.startswith('Plaćanje: '):
+                result[column] = totals[column]
+        result.index = pd.Index([label for label, _, _ in bounds], name='Period')
+        
+        if baseline is not None and len(result) > 0:
+            kpis = ['ukupan_promet', 'broj_računa', 'prosječan_račun', 'ukupna_količina', 'stavki_po_računu']
+            base = result[kpis].iloc[baseline]
+            for kpi in kpis:
+                change = (result[kpi] - base[kpi]) / base[kpi] * 100
+                result[f'{kpi}_promjena%'] = change if base[kpi] > 0 else np.nan
+        
+        return result
+    
     def get_daily_metrics(self) -> pd.DataFrame:
         """Dnevne metrike."""
-        daily = self.df.groupby('Datum').agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        daily = self.cube.rollup('Datum', ['Ukupno', 'Racuni', 'Količina'])
         
         daily.columns = ['Datum', 'Promet', 'Broj_računa', 'Količina']
+        daily['Datum'] = daily['Datum'].dt.date
         
         # Dodaj moving average
         daily['Promet_MA7'] = daily['Promet'].rolling(window=7, min_periods=1).mean()
@@ -56,21 +136,17 @@ class FinancialAnalytics:
     
     def get_monthly_metrics(self) -> pd.DataFrame:
         """Mjesečne metrike."""
-        monthly = self.df.groupby(['Godina', 'Mjesec']).agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        monthly = self.cube.rollup(['Godina', 'Mjesec'], ['Ukupno', 'Racuni', 'Količina'])
         
         monthly.columns = ['Godina', 'Mjesec', 'Promet', 'Broj_računa', 'Količina']
         monthly['Period'] = monthly['Godina'].astype(str) + '-' + monthly['Mjesec'].astype(str).str.zfill(2)
         
         # Growth rates s jasnim opisima
         monthly['Promjena_MoM%'] = monthly['Promet'].pct_change() * 100  # Mjesec vs prethodni mjesec
-        monthly['Promjena_YoY%'] = monthly.groupby('Mjesec')['Promet'].pct_change() * 100  # Godina vs prethodna godina (isti mjesec)
+        monthly['Promjena_YoY%'] = monthly.groupby('Mjesec', observed=True)['Promet'].pct_change() * 100  # Godina vs prethodna godina (isti mjesec)
         
         # Dodaj broj transakcija za statistiku
-        monthly['n_transakcija'] = self.df.groupby(['Godina', 'Mjesec'])['Fiskalni broj računa'].nunique().values
+        monthly['n_transakcija'] = monthly['Broj_računa'].values
         
         return monthly
     
@@ -98,45 +174,57 @@ class FinancialAnalytics:
 class SalesAnalytics:
     """Prodajne analize."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, invoices: Optional[pd.DataFrame] = None,
+                 cube: Optional[SalesCube] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            invoices: Tablica računa (build_invoice_table) - ako nije zadana, gradi se iz df
+            cube: Kocka prodaje (SalesCube) - ako nije zadana, gradi se iz df
+        """
         self.df = df
+        self._invoices = invoices
+        self._cube = cube
+    
+    @property
+    def invoices(self) -> pd.DataFrame:
+        """Tablica računa (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._invoices is None:
+            self._invoices = build_invoice_table(self.df)
+        return self._invoices
+    
+    @property
+    def cube(self) -> SalesCube:
+        """Kocka prodaje (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._cube is None:
+            self._cube = SalesCube.from_frame(self.df)
+        return self._cube
     
     def get_top_products(self, n: int = 20) -> pd.DataFrame:
         """Top N proizvoda."""
-        top = self.df.groupby('Artikl').agg({
-            'Ukupno': 'sum',
-            'Količina': 'sum',
-            'Fiskalni broj računa': 'nunique'
-        }).reset_index()
+        top = self.cube.rollup('Artikl', ['Ukupno', 'Količina', 'Racuni'])
         
         top.columns = ['Artikl', 'Promet', 'Količina', 'Broj_računa']
         top = top.sort_values('Promet', ascending=False).head(n)
-        top['Udio_u_prometu%'] = (top['Promet'] / self.df['Ukupno'].sum() * 100)
+        top['Udio_u_prometu%'] = (top['Promet'] / self.cube.total('Ukupno') * 100)
         
         return top
     
     def get_product_categories(self) -> pd.DataFrame:
         """Analiza po prodajnim grupama."""
-        categories = self.df.groupby('Prodajna grupa').agg({
-            'Ukupno': 'sum',
-            'Količina': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'nunique'
-        }).reset_index()
+        categories = self.cube.rollup('Prodajna grupa', ['Ukupno', 'Količina', 'Racuni'])
+        categories['Broj_artikala'] = self.cube.distinct('Artikl', 'Prodajna grupa').values
         
         categories.columns = ['Prodajna_grupa', 'Promet', 'Količina', 'Broj_računa', 'Broj_artikala']
         categories = categories.sort_values('Promet', ascending=False)
-        categories['Udio_u_prometu%'] = (categories['Promet'] / self.df['Ukupno'].sum() * 100)
+        categories['Udio_u_prometu%'] = (categories['Promet'] / self.cube.total('Ukupno') * 100)
         
         return categories
     
     def get_abc_analysis(self) -> pd.DataFrame:
         """ABC analiza proizvoda."""
         # Promet po proizvodu
-        products = self.df.groupby('Artikl').agg({
-            'Ukupno': 'sum',
-            'Količina': 'sum'
-        }).reset_index()
+        products = self.cube.rollup('Artikl', ['Ukupno', 'Količina'])
         
         products.columns = ['Artikl', 'Promet', 'Količina']
         products = products.sort_values('Promet', ascending=False)
@@ -155,72 +243,101 @@ class SalesAnalytics:
     
     def get_basket_analysis(self) -> Dict:
         """Analiza korpe (basket analysis)."""
-        basket = self.df.groupby('Fiskalni broj računa').agg({
-            'Artikl': 'count',  # Broj stavki
-            'Ukupno': 'sum',
-            'Količina': 'sum'
-        })
+        basket = self.invoices
         
         return {
-            'prosječan_broj_stavki': basket['Artikl'].mean(),
+            'prosječan_broj_stavki': basket['Broj_stavki'].mean(),
             'prosječna_vrijednost': basket['Ukupno'].mean(),
             'prosječna_količina': basket['Količina'].mean(),
-            'max_stavki_po_računu': basket['Artikl'].max(),
-            'min_stavki_po_računu': basket['Artikl'].min()
+            'max_stavki_po_računu': basket['Broj_stavki'].max(),
+            'min_stavki_po_računu': basket['Broj_stavki'].min()
         }
 
 
 class TimeAnalytics:
     """Vremenske analize."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cube: Optional[SalesCube] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            cube: Kocka prodaje (SalesCube) - ako nije zadana, gradi se iz df
+        """
         self.df = df
+        self._cube = cube
+        self._daily_index = None
+        self._pattern_kernels = {}
+    
+    @property
+    def cube(self) -> SalesCube:
+        """Kocka prodaje (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._cube is None:
+            self._cube = SalesCube.from_frame(self.df)
+        return self._cube
+    
+    @property
+    def daily_index(self) -> DailyIndex:
+        """Dnevni indeks sa kumulativnim sumama (gradi se iz kocke pri prvom korištenju)."""
+        if self._daily_index is None:
+            self._daily_index = DailyIndex.from_cube(self.cube)
+        return self._daily_index
+    
+    def pattern_kernel(self, dimension: Optional[str] = None) -> TimePatternKernel:
+        """
+        Vremenski obrasci u gustim nizovima (dan u tjednu × sat, mjesec × dan).
+        
+        Args:
+            dimension: None (ukupno) ili dimenzija kocke (npr. 'Lokal', 'Artikl') -
+                nizovi imaju red po vrijednosti dimenzije
+        """
+        if dimension not in self._pattern_kernels:
+            self._pattern_kernels[dimension] = TimePatternKernel.from_cube(self.cube, dimension)
+        return self._pattern_kernels[dimension]
     
     def get_hourly_pattern(self) -> pd.DataFrame:
         """Promet po satima."""
-        hourly = self.df.groupby('Sat').agg({
-            'Ukupno': ['sum', 'mean', 'count'],
-            'Fiskalni broj računa': 'nunique'
-        }).reset_index()
+        hourly = self.pattern_kernel().hourly()[['Sat', 'Ukupno', 'Stavke', 'Racuni']]
         
-        hourly.columns = ['Sat', 'Ukupan_promet', 'Prosječan_promet', 'Broj_transakcija', 'Broj_računa']
+        hourly.columns = ['Sat', 'Ukupan_promet', 'Broj_transakcija', 'Broj_računa']
+        hourly.insert(2, 'Prosječan_promet', hourly['Ukupan_promet'] / hourly['Broj_transakcija'])
         return hourly
     
     def get_daily_pattern(self) -> pd.DataFrame:
         """Promet po danima u tjednu."""
-        daily = self.df.groupby(['Dan_u_tjednu_broj', 'Dan_u_tjednu']).agg({
-            'Ukupno': ['sum', 'mean'],
-            'Fiskalni broj računa': 'nunique'
-        }).reset_index()
+        daily = self.pattern_kernel().weekly()[['Dan_u_tjednu_broj', 'Dan_u_tjednu', 'Ukupno', 'Stavke', 'Racuni']]
+        daily['Stavke'] = daily['Ukupno'] / daily['Stavke']
         
         daily.columns = ['Dan_broj', 'Dan', 'Ukupan_promet', 'Prosječan_promet', 'Broj_računa']
-        daily = daily.sort_values('Dan_broj')
-        
         return daily
     
-    def get_heatmap_data(self) -> pd.DataFrame:
-        """Podaci za heatmap - dan × sat."""
-        heatmap = self.df.groupby(['Dan_u_tjednu_broj', 'Sat'])['Ukupno'].sum().reset_index()
-        heatmap_pivot = heatmap.pivot(index='Dan_u_tjednu_broj', columns='Sat', values='Ukupno').fillna(0)
+    def get_heatmap_data(self, dimension: Optional[str] = None, value=None) -> pd.DataFrame:
+        """
+        Podaci za heatmap - dan × sat.
         
-        return heatmap_pivot
+        Args:
+            dimension: Dimenzija za heatmap jedne vrijednosti (npr. 'Lokal', 'Artikl')
+            value: Vrijednost dimenzije (None = ukupno)
+        """
+        return self.pattern_kernel(dimension if value is not None else None).heatmap('Ukupno', value)
+    
+    def get_calendar_heatmap(self, dimension: Optional[str] = None, value=None) -> pd.DataFrame:
+        """Podaci za heatmap - mjesec × dan u mjesecu (promet)."""
+        return self.pattern_kernel(dimension if value is not None else None).calendar('Ukupno', value)
     
     def get_period_comparison(self, period1: Tuple[str, str], period2: Tuple[str, str]) -> Dict:
-        """Usporedba dva perioda."""
-        df1 = self.df[(self.df['Datum'] >= period1[0]) & (self.df['Datum'] <= period1[1])]
-        df2 = self.df[(self.df['Datum'] >= period2[0]) & (self.df['Datum'] <= period2[1])]
-        
-        metrics1 = {
-            'promet': df1['Ukupno'].sum(),
-            'računi': df1['Fiskalni broj računa'].nunique(),
-            'količina': df1['Količina'].sum()
-        }
+        """
+        Usporedba dva perioda.
         
-        metrics2 = {
-            'promet': df2['Ukupno'].sum(),
-            'računi': df2['Fiskalni broj računa'].nunique(),
-            'količina': df2['Količina'].sum()
-        }
+        Args:
+            period1: (od, do) - granice uključene (str, date ili Timestamp)
+            period2: (od, do)
+        """
+        totals = self.daily_index.totals([period1, period2])
+        metrics1, metrics2 = [{
+            'promet': totals['Ukupno'].iloc[i],
+            'računi': int(totals['Racuni'].iloc[i]),
+            'količina': totals['Količina'].iloc[i]
+        } for i in range(2)]
         
         growth = {
             'promet_%': ((metrics2['promet'] - metrics1['promet']) / metrics1['promet'] * 100) if metrics1['promet'] > 0 else 0,
@@ -246,14 +363,9 @@ class LocationAnalytics:
         if 'Lokal' not in self.df.columns:
             return pd.DataFrame()
         
-        location = self.df.groupby('Lokal').agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        location = query_engine(self.df).query('Lokal', ['promet', 'broj_racuna', 'kolicina', 'prosjecan_racun'])
         
-        location.columns = ['Lokal', 'Promet', 'Broj_računa', 'Količina']
-        location['Prosječan_račun'] = location['Promet'] / location['Broj_računa']
+        location.columns = ['Lokal', 'Promet', 'Broj_računa', 'Količina', 'Prosječan_račun']
         
         return location
     
@@ -262,14 +374,9 @@ class LocationAnalytics:
         if 'Blagajna' not in self.df.columns:
             return pd.DataFrame()
         
-        cashier = self.df.groupby('Blagajna').agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        cashier = query_engine(self.df).query('Blagajna', ['promet', 'broj_racuna', 'kolicina', 'prosjecan_racun'])
         
-        cashier.columns = ['Blagajna', 'Promet', 'Broj_računa', 'Količina']
-        cashier['Prosječan_račun'] = cashier['Promet'] / cashier['Broj_računa']
+        cashier.columns = ['Blagajna', 'Promet', 'Broj_računa', 'Količina', 'Prosječan_račun']
         
         return cashier
     
@@ -278,15 +385,10 @@ class LocationAnalytics:
         if 'Izdao' not in self.df.columns:
             return pd.DataFrame()
         
-        staff = self.df.groupby('Izdao').agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        staff = query_engine(self.df).query('Izdao', ['promet', 'broj_racuna', 'kolicina', 'prosjecan_racun'])
         
-        staff.columns = ['Osoblje', 'Promet', 'Broj_računa', 'Količina']
+        staff.columns = ['Osoblje', 'Promet', 'Broj_računa', 'Količina', 'Prosječan_račun']
         staff = staff.sort_values('Promet', ascending=False)
-        staff['Prosječan_račun'] = staff['Promet'] / staff['Broj_računa']
         
         return staff
 
@@ -294,28 +396,43 @@ class LocationAnalytics:
 class CustomerAnalytics:
     """Analiza kupaca."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, invoices: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            invoices: Tablica računa (build_invoice_table) - ako nije zadana, gradi se iz df
+        """
         self.df = df
+        self._invoices = invoices
+    
+    @property
+    def invoices(self) -> pd.DataFrame:
+        """Tablica računa (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._invoices is None:
+            self._invoices = build_invoice_table(self.df)
+        return self._invoices
     
     def get_customer_segmentation(self) -> Dict:
         """Segmentacija kupaca (B2B vs B2C)."""
         if 'Porezni broj kupca' not in self.df.columns:
             return {}
         
-        # B2B = ima porezni broj
-        b2b = self.df[self.df['Porezni broj kupca'].notna()]
-        b2c = self.df[self.df['Porezni broj kupca'].isna()]
+        # B2B = ima porezni broj (kupac je atribut računa)
+        invoices = self.invoices
+        b2b = invoices[invoices['Porezni broj kupca'].notna()]
+        b2c = invoices[invoices['Porezni broj kupca'].isna()]
+        total = invoices['Ukupno'].sum()
         
         return {
             'b2b': {
                 'promet': b2b['Ukupno'].sum(),
-                'računi': b2b['Fiskalni broj računa'].nunique(),
-                'udio%': b2b['Ukupno'].sum() / self.df['Ukupno'].sum() * 100
+                'računi': len(b2b),
+                'udio%': b2b['Ukupno'].sum() / total * 100
             },
             'b2c': {
                 'promet': b2c['Ukupno'].sum(),
-                'računi': b2c['Fiskalni broj računa'].nunique(),
-                'udio%': b2c['Ukupno'].sum() / self.df['Ukupno'].sum() * 100
+                'računi': len(b2c),
+                'udio%': b2c['Ukupno'].sum() / total * 100
             }
         }
     
@@ -325,16 +442,17 @@ class CustomerAnalytics:
             return pd.DataFrame()
         
         # Filtriraj samo named customers
-        named = self.df[self.df['Kupac'].notna() & (self.df['Kupac'] != 'nan')]
+        invoices = self.invoices
+        named = invoices[invoices['Kupac'].notna() & (invoices['Kupac'] != 'nan')]
         
         if len(named) == 0:
             return pd.DataFrame()
         
-        top = named.groupby('Kupac').agg({
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Količina': 'sum'
-        }).reset_index()
+        top = named.groupby('Kupac', observed=True).agg(
+            Promet=('Ukupno', 'sum'),
+            Broj_računa=('Ukupno', 'size'),
+            Količina=('Količina', 'sum')
+        ).reset_index()
         
         top.columns = ['Kupac', 'Promet', 'Broj_računa', 'Količina']
         top = top.sort_values('Promet', ascending=False).head(n)
@@ -346,63 +464,59 @@ class CustomerAnalytics:
 class ProductComparisonAnalytics:
     """Analiza usporedbe prodaje proizvoda i kategorija kroz vrijeme."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, cube: Optional[SalesCube] = None,
+                 classifier: Optional[ProductClassifier] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            cube: Kocka prodaje (SalesCube) - ako nije zadana, gradi se iz df
+            classifier: Klasifikator proizvoda (default: zajednički klasifikator procesa)
+        """
         self.df = df
-        # Kategorizacija proizvoda
-        self.product_categories = self._create_product_categories()
-    
-    def _create_product_categories(self) -> Dict[str, List[str]]:
-        """Kreiranje kategorija proizvoda na osnovu naziva."""
-        categories = {
-            'Kava - Espresso bazirana': [],
-            'Kava - Specijalna': [],
-            'Hladna kava': [],
-            'Čaj': [],
-            'Sokovi i limunade': [],
-            'Deserti i kolači': [],
-            'Sendviči i hrana': [],
-            'Ostalo': []
-        }
-        
-        espresso_keywords = ['CAPPUCCINO', 'ESPRESSO', 'LATTE', 'MACCHIATO', 'AMERICANO', 'CORTADO', 'BOMBON']
-        special_coffee_keywords = ['TURKISH', 'MATCHA', 'HOT CHOCOLATE', 'BRUM']
-        iced_keywords = ['ICE', 'ICED']
-        tea_keywords = ['TEA']
-        drinks_keywords = ['LEMONADE', 'JUICE', 'VODA', 'WATER']
-        dessert_keywords = ['KOLAČ', 'CAKE', 'COKKIE', 'Kroasan']
-        food_keywords = ['Toast', 'Ham', 'WRAP', 'SANDWICH']
-        
-        for product in self.df['Artikl'].unique():
-            product_upper = str(product).upper()
-            categorized = False
-            
-            # Check iced first (može biti i espresso i ice)
-            if any(keyword in product_upper for keyword in iced_keywords):
-                categories['Hladna kava'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in espresso_keywords):
-                categories['Kava - Espresso bazirana'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in special_coffee_keywords):
-                categories['Kava - Specijalna'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in tea_keywords):
-                categories['Čaj'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in drinks_keywords):
-                categories['Sokovi i limunade'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in dessert_keywords):
-                categories['Deserti i kolači'].append(product)
-                categorized = True
-            elif any(keyword in product_upper for keyword in food_keywords):
-                categories['Sendviči i hrana'].append(product)
-                categorized = True
-            
-            if not categorized:
-                categories['Ostalo'].append(product)
-        
-        return categories
+        self._cube = cube
+        # Kategorizacija proizvoda - kategorije se pamte u klasifikatoru između rerunova
+        self.classifier = classifier if classifier is not None else get_classifier()
+        self._product_categories = None
+    
+    @property
+    def cube(self) -> SalesCube:
+        """Kocka prodaje (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._cube is None:
+            self._cube = SalesCube.from_frame(self.df)
+        return self._cube
+    
+    def _periodic(self, dims: List[str], period: str = 'M',
+                  measures: Tuple[str, ...] = ('Ukupno', 'Količina'),
+                  cube: Optional[SalesCube] = None) -> pd.DataFrame:
+        """
+        Mjere po periodu (npr. 'M', 'Q') i dimenzijama, sa periodom u koloni 'Datum'.
+
+        Mjeseci i kvartali se grupiraju po cjelobrojnim ključevima kocke (Godina,
+        Mjesec/Kvartal), a ostali periodi iz dnevnih ćelija.
+        """
+        cube = self.cube if cube is None else cube
+        measures = list(measures)
+        keys = PERIOD_KEYS.get(period)
+        if keys is None:
+            daily = cube.rollup(['Datum'] + dims, measures)
+            periods = daily['Datum'].dt.to_period(period)
+            return daily.groupby([periods] + dims, observed=True)[measures].sum().reset_index()
+        
+        periodic = cube.rollup(keys + dims, measures)
+        year = periodic.pop(keys[0])
+        month = periodic.pop(keys[1])
+        if period == 'Q':
+            month = (month - 1) * 3 + 1
+        start = pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': 1}))
+        periodic.insert(0, 'Datum', start.dt.to_period(period))
+        return periodic
+    
+    @property
+    def product_categories(self) -> Dict[str, List[str]]:
+        """{kategorija: [artikli]} za artikle iz df."""
+        if self._product_categories is None:
+            self._product_categories = self.classifier.group(self.df['Artikl'].dropna().unique())
+        return self._product_categories
     
     def get_categories_summary(self) -> pd.DataFrame:
         """Vraća sažetak svih kategorija sa brojem proizvoda."""
@@ -417,10 +531,7 @@ class ProductComparisonAnalytics:
     
     def get_product_category(self, product: str) -> str:
         """Vraća kategoriju za određeni proizvod."""
-        for category, products in self.product_categories.items():
-            if product in products:
-                return category
-        return 'Ostalo'
+        return self.classifier.category(product)
     
     def compare_products_monthly(self, products: Optional[List[str]] = None, top_n: int = 10) -> pd.DataFrame:
         """
@@ -433,24 +544,14 @@ class ProductComparisonAnalytics:
         Returns:
             DataFrame sa mjesečnom prodajom i postotnim promjenama
         """
-        df = self.df.copy()
-        
         # Ako nisu zadani proizvodi, uzmi top N
         if products is None:
-            top_products = df.groupby('Artikl')['Ukupno'].sum().nlargest(top_n).index.tolist()
+            revenue = self.cube.rollup('Artikl', ['Ukupno']).set_index('Artikl')['Ukupno']
+            top_products = revenue.nlargest(top_n).index.tolist()
             products = top_products
         
-        # Filter podatke
-        df_filtered = df[df['Artikl'].isin(products)].copy()
-        
-        # Grupiranje po mjesecu i proizvodu
-        monthly = df_filtered.groupby([
-            df_filtered['Datum i vrijeme'].dt.to_period('M'), 
-            'Artikl'
-        ]).agg({
-            'Ukupno': 'sum',
-            'Količina': 'sum'
-        }).reset_index()
+        # Grupiranje po mjesecu i proizvodu (samo ćelije odabranih proizvoda)
+        monthly = self._periodic(['Artikl'], 'M', cube=self.cube.filter({'Artikl': products}))
         
         monthly.columns = ['Mjesec', 'Artikl', 'Promet', 'Količina']
         monthly['Mjesec'] = monthly['Mjesec'].astype(str)
@@ -472,19 +573,13 @@ class ProductComparisonAnalytics:
     
     def compare_categories_monthly(self) -> pd.DataFrame:
         """Uspoređuje prodaju kategorija proizvoda mjesec po mjesec."""
-        df = self.df.copy()
+        monthly = self._periodic(['Artikl'], 'M')
         
         # Dodaj kategoriju svakom proizvodu
-        df['Kategorija'] = df['Artikl'].apply(self.get_product_category)
+        monthly['Kategorija'] = self.classifier.categorize(monthly['Artikl'])
         
         # Grupiranje po mjesecu i kategoriji
-        monthly = df.groupby([
-            df['Datum i vrijeme'].dt.to_period('M'),
-            'Kategorija'
-        ]).agg({
-            'Ukupno': 'sum',
-            'Količina': 'sum'
-        }).reset_index()
+        monthly = monthly.groupby(['Datum', 'Kategorija'], observed=True)[['Ukupno', 'Količina']].sum().reset_index()
         
         monthly.columns = ['Mjesec', 'Kategorija', 'Promet', 'Količina']
         monthly['Mjesec'] = monthly['Mjesec'].astype(str)
@@ -514,14 +609,12 @@ class ProductComparisonAnalytics:
         Returns:
             DataFrame sa usporedbom po godinama
         """
-        df = self.df.copy()
-        df['Kategorija'] = df['Artikl'].apply(self.get_product_category)
-        
-        # Filtriraj samo zadani mjesec
-        df_month = df[df['Mjesec'] == month].copy()
+        # Samo ćelije zadanog mjeseca
+        df_month = self.cube.filter({'Mjesec': [month]}).rollup(['Godina', 'Artikl'], ['Ukupno', 'Količina'])
+        df_month['Kategorija'] = self.classifier.categorize(df_month['Artikl'])
         
         # Grupiranje po godini i kategoriji
-        yearly = df_month.groupby(['Godina', 'Kategorija']).agg({
+        yearly = df_month.groupby(['Godina', 'Kategorija'], observed=True).agg({
             'Ukupno': 'sum',
             'Količina': 'sum'
         }).reset_index()
@@ -556,13 +649,8 @@ class ProductComparisonAnalytics:
         Returns:
             Dictionary s top rastom i padom proizvoda
         """
-        df = self.df.copy()
-        
         # Grupiranje po periodu i proizvodu
-        periodic = df.groupby([
-            df['Datum i vrijeme'].dt.to_period(period),
-            'Artikl'
-        ])['Ukupno'].sum().reset_index()
+        periodic = self._periodic(['Artikl'], period, ('Ukupno',))
         
         periodic.columns = ['Period', 'Artikl', 'Promet']
         periodic['Period'] = periodic['Period'].astype(str)
@@ -0,0 +1,181 @@
+"""
+Daily Index - Kumulativne dnevne sume za usporedbu proizvoljnih perioda
+"""
+import re
+from datetime import date
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .distinct_counts import distinct_per_group, invoice_codes
+from .sales_cube import SalesCube
+
+MEASURES = ['Ukupno', 'Količina', 'Racuni']
+
+DateLike = Union[str, date, pd.Timestamp]
+
+
+class DailyIndex:
+    """
+    Dnevni indeks prodaje sa kumulativnim sumama (prefix sums).
+
+    Za svaki dan od prvog do zadnjeg (i dane bez prometa) čuva kumulativni
+    promet, količinu i broj računa, pa je suma bilo kojeg raspona datuma
+    razlika dva elementa - O(1) po rasponu. Broj računa je aditivan jer svaki
+    račun pripada jednom danu.
+    """
+
+    def __init__(self, start: pd.Timestamp, cumulative: Dict[str, np.ndarray]):
+        """
+        Args:
+            start: Prvi dan indeksa
+            cumulative: {mjera: kumulativne sume} dužine broj_dana + 1 (počinje nulom)
+        """
+        self.start = start
+        self.cumulative = cumulative
+        self.n_days = len(next(iter(cumulative.values()))) - 1 if cumulative else 0
+
+    @classmethod
+    def from_daily(cls, daily: pd.DataFrame) -> 'DailyIndex':
+        """
+        Gradi indeks iz dnevnih suma.
+
+        Args:
+            daily: DataFrame sa kolonom 'Datum' (dan) i mjerama (npr. Ukupno, Količina, Racuni)
+                - više redova za isti dan se zbraja
+        """
+        daily = daily[daily['Datum'].notna()]
+        measures = [column for column in daily.columns if column != 'Datum']
+        if len(daily) == 0:
+            return cls(pd.NaT, {m: np.zeros(1) for m in measures})
+
+        days = pd.to_datetime(daily['Datum']).dt.normalize()
+        start = days.min()
+        offsets = ((days - start) // pd.Timedelta(days=1)).to_numpy()
+        n_days = int(offsets.max()) + 1
+
+        cumulative = {}
+        for measure in measures:
+            per_day = np.bincount(offsets, weights=daily[measure].to_numpy(dtype=float), minlength=n_days)
+            if pd.api.types.is_integer_dtype(daily[measure].dtype):
+                per_day = per_day.astype(np.int64)
+            cumulative[measure] = np.concatenate(([0], np.cumsum(per_day)))
+        return cls(start, cumulative)
+
+    @classmethod
+    def from_cube(cls, cube: SalesCube) -> 'DailyIndex':
+        """Gradi indeks iz kocke prodaje."""
+        measures = [m for m in MEASURES if m in cube.level_for(['Datum']).columns]
+        return cls.from_daily(cube.rollup('Datum', measures))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'DailyIndex':
+        """Gradi indeks iz DataFrame-a sa stavkama računa."""
+        return cls.from_cube(SalesCube.from_frame(df))
+
+    @classmethod
+    def for_kpis(cls, df: pd.DataFrame) -> 'DailyIndex':
+        """
+        Indeks KPI mjera po danu (jedan prolaz po stavkama).
+
+        Mjere: Ukupno, Količina, PDV, Stavke (redovi), Racuni, Iznos_računa (zbroj
+        iznosa računa) i 'Plaćanje: <način>' (promet po načinu plaćanja). Računi se
+        broje iz stavki - različiti ključevi računa (broj računa unutar godine) po danu.
+        """
+        day = df['Datum i vrijeme'].dt.normalize().rename('Datum')
+        spec = {'Ukupno': ('Ukupno', 'sum'), 'Stavke': ('Ukupno', 'size')}
+        for column in ('Količina', 'PDV'):
+            if column in df.columns:
+                spec[column] = (column, 'sum')
+        grouped = df.groupby(day, observed=True)
+        daily = grouped.agg(**spec)
+
+        if 'Način plaćanja' in df.columns:
+            payments = df.groupby([day, df['Način plaćanja']], observed=True)['Ukupno'].sum().unstack(fill_value=0)
+            payments.columns = [f"Plaćanje: {method}" for method in payments.columns]
+            daily = daily.join(payments, how='outer')
+
+        # Računi iz stavki - različiti ključevi računa po danu i promet stavki sa računom
+        codes = invoice_codes(df)
+        racuni = pd.Series(distinct_per_group(grouped.ngroup().to_numpy(), codes, grouped.ngroups),
+                           index=grouped.size().index)
+        amounts = df['Ukupno'].where(codes >= 0).groupby(day, observed=True).sum()
+        daily = daily.join(pd.DataFrame({'Racuni': racuni, 'Iznos_računa': amounts}), how='outer')
+
+        integer = ['Stavke', 'Racuni']
+        daily = daily.fillna(0).astype({column: np.int64 for column in integer})
+        return cls.from_daily(daily.reset_index())
+
+    def _bounds(self, starts: Sequence[DateLike], ends: Sequence[DateLike]) -> Tuple[np.ndarray, np.ndarray]:
+        if self.n_days == 0:
+            zeros = np.zeros(len(starts), dtype=np.int64)
+            return zeros, zeros
+        first = pd.to_datetime(pd.Series(list(starts))).dt.normalize()
+        last = pd.to_datetime(pd.Series(list(ends))).dt.normalize()
+        day = pd.Timedelta(days=1)
+        lo = np.clip(((first - self.start) // day).to_numpy(), 0, self.n_days)
+        hi = np.clip(((last - self.start) // day).to_numpy() + 1, 0, self.n_days)
+        return lo, np.maximum(hi, lo)
+
+    def totals(self, ranges: List[Tuple[DateLike, DateLike]]) -> pd.DataFrame:
+        """
+        Sume mjera za listu raspona datuma (granice uključene).
+
+        Args:
+            ranges: [(od, do), ...] - str, date ili Timestamp
+
+        Returns:
+            DataFrame sa kolonama Od, Do i mjerama, jedan red po rasponu
+        """
+        starts = [r[0] for r in ranges]
+        ends = [r[1] for r in ranges]
+        lo, hi = self._bounds(starts, ends)
+        result = pd.DataFrame({'Od': starts, 'Do': ends})
+        for measure, cumulative in self.cumulative.items():
+            result[measure] = cumulative[hi] - cumulative[lo]
+        return result
+
+    @property
+    def measures(self) -> List[str]:
+        """Mjere u indeksu."""
+        return list(self.cumulative)
+
+    def total(self, start: DateLike, end: DateLike) -> Dict[str, float]:
+        """Sume mjera za jedan raspon datuma (granice uključene)."""
+        lo, hi = self._bounds([start], [end])
+        return {measure: cumulative[hi[0]] - cumulative[lo[0]]
+                for measure, cumulative in self.cumulative.items()}
+
+
+def period_bounds(period) -> Tuple[str, pd.Timestamp, pd.Timestamp]:
+    """
+    Naziv i granice (prvi i zadnji dan) perioda.
+
+    Args:
+        period: Godina (2025 ili '2025'), mjesec ('2025-03'), ISO tjedan ('2025-W05'),
+            pd.Period ili raspon (od, do)
+
+    Returns:
+        (naziv, prvi dan, zadnji dan)
+    """
+    if isinstance(period, (tuple, list)):
+        start, end = pd.Timestamp(period[0]).normalize(), pd.Timestamp(period[1]).normalize()
+        return f"{start.date()} - {end.date()}", start, end
+    if isinstance(period, pd.Period):
+        return str(period), period.start_time.normalize(), period.end_time.normalize()
+    if isinstance(period, (int, np.integer)):
+        period = str(int(period))
+
+    text = str(period).strip()
+    if re.fullmatch(r'\d{4}', text):
+        year = int(text)
+        return text, pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31)
+    week = re.fullmatch(r'(\d{4})-?W(\d{1,2})', text, flags=re.IGNORECASE)
+    if week:
+        monday = pd.Timestamp(date.fromisocalendar(int(week.group(1)), int(week.group(2)), 1))
+        return f"{week.group(1)}-W{int(week.group(2)):02d}", monday, monday + pd.Timedelta(days=6)
+    if re.fullmatch(r'\d{4}-\d{1,2}', text):
+        month = pd.Period(text, freq='M')
+        return str(month), month.start_time.normalize(), month.end_time.normalize()
+    raise ValueError(f"Nepoznat period: {period!r} (očekivano npr. 2025, '2025-03', '2025-W05' ili (od, do))")
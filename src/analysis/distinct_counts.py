@@ -0,0 +1,140 @@
+"""
+Distinct Counts - Brojanje jedinstvenih računa nad cjelobrojnim ključevima
+"""
+from typing import Dict, List, Union
+
+import numpy as np
+import pandas as pd
+
+INVOICE_COL = 'Fiskalni broj računa'
+INVOICE_ID_COL = 'Racun_id'
+
+# Najveća bitmapa (grupe × kodovi) za deduplikaciju parova, u bajtovima
+MAX_BITMAP_SIZE = 1 << 25
+
+
+def invoice_codes(df: pd.DataFrame) -> np.ndarray:
+    """
+    Cjelobrojni ključ računa za svaki red (-1 = nepoznat račun).
+
+    Koristi kolonu 'Racun_id' koju dodaje AutoDataLoader, a ako je nema
+    računa isti ključ faktorizacijom para (broj računa, godina) - fiskalni
+    brojevi kreću ispočetka svake godine.
+    """
+    if INVOICE_ID_COL in df.columns:
+        return df[INVOICE_ID_COL].to_numpy()
+    numbers = pd.factorize(df[INVOICE_COL])[0]
+    if 'Datum i vrijeme' not in df.columns:
+        return numbers
+    codes = np.full(len(df), -1, dtype=numbers.dtype)
+    valid = numbers >= 0
+    years = df['Datum i vrijeme'].dt.year.fillna(-1).to_numpy(dtype=np.int64)
+    codes[valid] = pd.factorize(numbers[valid].astype(np.int64) * 65536 + (years[valid] + 1))[0]
+    return codes
+
+
+def column_codes(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Cjelobrojni kodovi kolone (-1 = nedostaje) - kodovi kategorije ili faktorizacija."""
+    if column in (INVOICE_COL, INVOICE_ID_COL):
+        return invoice_codes(df)
+    series = df[column]
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy()
+    return pd.factorize(series)[0]
+
+
+def count_distinct(codes: np.ndarray) -> int:
+    """Broj različitih nenegativnih kodova."""
+    codes = np.asarray(codes)
+    codes = codes[codes >= 0]
+    if len(codes) == 0:
+        return 0
+    return int(np.count_nonzero(np.bincount(codes)))
+
+
+def count_invoices(df: pd.DataFrame) -> int:
+    """Broj različitih računa (broj računa unutar godine - u jednoj godini isto kao nunique broja)."""
+    return count_distinct(invoice_codes(df))
+
+
+def distinct_per_group(group_ids: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Broj različitih kodova po grupi.
+
+    Parovi (grupa, kod) se kodiraju u jedan int64 i deduplikiraju - bitmapom
+    kad je prostor parova mali, inače hash tablicom nad int64 - a zatim se
+    prebroje po grupi sa bincount. Stavke istog računa su u datasetu jedna do
+    druge pa se uzastopni duplikati odbacuju prije toga.
+
+    Args:
+        group_ids: Redni broj grupe za svaki red (-1 = red nije ni u jednoj grupi)
+        codes: Kod vrijednosti za svaki red (-1 = nedostaje)
+        n_groups: Broj grupa
+    """
+    valid = (group_ids >= 0) & (codes >= 0)
+    groups = group_ids[valid].astype(np.int64)
+    values = codes[valid].astype(np.int64)
+    if len(values) == 0:
+        return np.zeros(n_groups, dtype=np.int64)
+
+    width = int(values.max()) + 1
+    pairs = groups * width + values
+    if len(pairs) > 1:
+        pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+
+    if n_groups * width <= MAX_BITMAP_SIZE:
+        seen = np.zeros(n_groups * width, dtype=bool)
+        seen[pairs] = True
+        return np.count_nonzero(seen.reshape(n_groups, width), axis=1)
+
+    return np.bincount(pd.unique(pairs) // width, minlength=n_groups)
+
+
+def invoice_groupby(df: pd.DataFrame):
+    """groupby po računu nad cjelobrojnim ključem umjesto stringa broja računa."""
+    codes = invoice_codes(df)
+    key = pd.Series(codes, index=df.index, name=INVOICE_ID_COL)
+    if (codes < 0).any():
+        key = key.where(key >= 0)
+    return df.groupby(key, observed=True)
+
+
+def aggregate(df: pd.DataFrame, by, spec: Dict[str, Union[str, List[str]]]) -> pd.DataFrame:
+    """
+    df.groupby(by, observed=True).agg(spec), ali se 'nunique' nad brojem računa
+    i kategorijama računa preko cjelobrojnih kodova (bez hashiranja stringova).
+
+    Kolone rezultata su istim redoslijedom i sa istim nazivima kao kod .agg(spec).
+
+    Args:
+        df: DataFrame
+        by: Kolona, lista kolona ili Series za grupiranje
+        spec: Agregacije kao za DataFrame.agg
+    """
+    grouped = df.groupby(by, observed=True)
+
+    fast = {}
+    rest = {}
+    for column, func in spec.items():
+        if func == 'nunique' and (column == INVOICE_COL or
+                                  isinstance(df[column].dtype, pd.CategoricalDtype)):
+            fast[column] = func
+        else:
+            rest[column] = func
+
+    if not fast:
+        return grouped.agg(spec)
+
+    result = grouped.agg(rest) if rest else pd.DataFrame(index=grouped.size().index)
+    group_ids = grouped.ngroup().to_numpy()
+    n_groups = len(result)
+    multi = isinstance(result.columns, pd.MultiIndex)
+
+    position = 0
+    for column, func in spec.items():
+        if column in fast:
+            counts = distinct_per_group(group_ids, column_codes(df, column), n_groups)
+            result.insert(position, (column, 'nunique') if multi else column, counts)
+        position += len(func) if isinstance(func, list) else 1
+
+    return result
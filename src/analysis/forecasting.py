@@ -0,0 +1,273 @@
+"""
+Forecasting - Sezonske prognoze dnevnog prometa (Holt-Winters, vektorizirano po serijama)
+"""
+from dataclasses import dataclass
+from itertools import product
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sales_cube import SalesCube
+
+WEEK = 7
+YEAR = 365.25
+
+# Mreža parametara (alpha, beta, gamma) - za svaku seriju se bira najbolja kombinacija
+PARAM_GRID = list(product([0.05, 0.15, 0.3], [0.0, 0.01], [0.05, 0.2]))
+
+# Prigušenje trenda (phi) - dugi horizonti ne rastu linearno
+DAMPING = 0.98
+
+# Broj harmonika godišnje sezonalnosti (koristi se uz bar godinu dana povijesti)
+YEARLY_HARMONICS = 3
+
+# Preskače se prvih n dana pri ocjeni greške (inicijalizacija stanja)
+WARMUP = 2 * WEEK
+
+
+def _fourier(days: np.ndarray, harmonics: int) -> np.ndarray:
+    """Matrica sin/cos članova godišnje sezonalnosti (dani × 2·harmonici)."""
+    angle = 2 * np.pi * np.outer(days, np.arange(1, harmonics + 1)) / YEAR
+    return np.hstack([np.sin(angle), np.cos(angle)])
+
+
+def _smooth(y: np.ndarray, params: np.ndarray, phi: float):
+    """
+    Aditivni Holt-Winters sa prigušenim trendom i tjednom sezonom.
+
+    Petlja ide po danima, a svaki korak je jedna operacija nad svim serijama
+    i svim kombinacijama parametara odjednom.
+
+    Args:
+        y: Serije (serije × dani)
+        params: Parametri (kombinacije × 3) - alpha, beta, gamma
+
+    Returns:
+        (level, trend, season, sse) - oblik (kombinacije × serije), season ima i tjedan
+    """
+    n_series, n_days = y.shape
+    alpha, beta, gamma = (params[:, i][:, None] for i in range(3))
+
+    first = y[:, :min(WEEK, n_days)]
+    level = np.broadcast_to(first.mean(axis=1), (len(params), n_series)).copy()
+    trend = np.zeros_like(level)
+    season = np.zeros((len(params), n_series, WEEK))
+    season[:, :, :first.shape[1]] = first - first.mean(axis=1, keepdims=True)
+    sse = np.zeros_like(level)
+
+    for t in range(n_days):
+        slot = t % WEEK
+        error = y[:, t] - (level + phi * trend + season[:, :, slot])
+        if t >= WARMUP:
+            sse += error ** 2
+        level = level + phi * trend + alpha * error
+        trend = phi * trend + beta * error
+        season[:, :, slot] += gamma * error
+    return level, trend, season, sse
+
+
+@dataclass
+class ForecastModel:
+    """
+    Prilagođeni modeli za skup serija (npr. svi artikli).
+
+    Stanja (level, trend, tjedna sezona) i koeficijenti godišnje sezonalnosti
+    su nizovi po serijama pa se prognoza za sve serije računa odjednom.
+    """
+    keys: List
+    dimension: Optional[str]
+    first_day: pd.Timestamp
+    n_days: int
+    level: np.ndarray
+    trend: np.ndarray
+    season: np.ndarray
+    yearly: Optional[np.ndarray]
+    sigma: np.ndarray
+    alpha: np.ndarray
+    phi: float = DAMPING
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije modela."""
+        arrays = [self.level, self.trend, self.season, self.sigma, self.alpha]
+        if self.yearly is not None:
+            arrays.append(self.yearly)
+        return sum(a.nbytes for a in arrays)
+
+    def predict(self, horizon: int) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+        """
+        Prognoza za sljedećih horizon dana.
+
+        Returns:
+            (datumi, prognoza, širina 95% intervala) - prognoza i širina su serije × dani
+        """
+        steps = np.arange(1, horizon + 1)
+        days = self.n_days - 1 + steps
+        damped = np.cumsum(self.phi ** steps)
+        forecast = (self.level[:, None] + damped[None, :] * self.trend[:, None]
+                    + self.season[:, days % WEEK])
+        if self.yearly is not None:
+            forecast += self.yearly @ _fourier(days, YEARLY_HARMONICS).T
+        spread = 1.96 * self.sigma[:, None] * np.sqrt(1 + (steps[None, :] - 1) * self.alpha[:, None] ** 2)
+        dates = pd.date_range(self.first_day + pd.Timedelta(days=self.n_days), periods=horizon, freq='D')
+        return dates, forecast, spread
+
+    def forecast(self, horizon: int = 30) -> pd.DataFrame:
+        """
+        Dnevna prognoza u dugom formatu.
+
+        Returns:
+            DataFrame sa kolonama [dimenzija], Datum, Prognoza, Donja_granica, Gornja_granica
+        """
+        dates, forecast, spread = self.predict(horizon)
+        result = pd.DataFrame({
+            'Datum': np.tile(dates, len(self.keys)),
+            'Prognoza': np.clip(forecast, 0, None).ravel(),
+            'Donja_granica': np.clip(forecast - spread, 0, None).ravel(),
+            'Gornja_granica': np.clip(forecast + spread, 0, None).ravel(),
+        })
+        if self.dimension is not None:
+            result.insert(0, self.dimension, np.repeat(np.asarray(self.keys, dtype=object), horizon))
+        return result
+
+    def summary(self, horizon: int = 30) -> pd.DataFrame:
+        """Ukupna prognoza po seriji za sljedećih horizon dana."""
+        _, forecast, _ = self.predict(horizon)
+        result = pd.DataFrame({'Prognoza': np.clip(forecast, 0, None).sum(axis=1)})
+        if self.dimension is not None:
+            result.insert(0, self.dimension, self.keys)
+        return result.sort_values('Prognoza', ascending=False).reset_index(drop=True)
+
+
+def fit_series(y: np.ndarray, first_day: pd.Timestamp, keys: Optional[List] = None,
+               dimension: Optional[str] = None) -> ForecastModel:
+    """
+    Prilagođava modele svim serijama odjednom.
+
+    Godišnja sezonalnost (Fourier članovi) se procjenjuje jednim lstsq za sve
+    serije kad postoji bar godina dana povijesti, a ostatak se modelira
+    Holt-Wintersom sa tjednom sezonom. Parametri se biraju po seriji iz
+    PARAM_GRID prema grešci prognoze jedan dan unaprijed.
+
+    Args:
+        y: Dnevni promet (serije × dani), bez praznina (dani bez prometa = 0)
+        first_day: Datum prvog stupca
+        keys: Nazivi serija
+        dimension: Dimenzija serija (npr. 'Artikl') ili None za ukupni promet
+    """
+    y = np.asarray(y, dtype=float)
+    n_series, n_days = y.shape
+    keys = list(range(n_series)) if keys is None else list(keys)
+
+    yearly = None
+    residual = y
+    if n_days >= 365:
+        days = np.arange(n_days)
+        terms = _fourier(days, YEARLY_HARMONICS)
+        design = np.hstack([np.ones((n_days, 1)), terms])
+        coef = np.linalg.lstsq(design, y.T, rcond=None)[0]
+        yearly = coef[1:].T
+        residual = y - yearly @ terms.T
+
+    params = np.array(PARAM_GRID)
+    level, trend, season, sse = _smooth(residual, params, DAMPING)
+    best = sse.argmin(axis=0)
+    series = np.arange(n_series)
+    n_scored = max(n_days - WARMUP, 1)
+
+    return ForecastModel(
+        keys=keys,
+        dimension=dimension,
+        first_day=first_day,
+        n_days=n_days,
+        level=level[best, series],
+        trend=trend[best, series],
+        season=season[best, series],
+        yearly=yearly,
+        sigma=np.sqrt(sse[best, series] / n_scored),
+        alpha=params[best, 0],
+    )
+
+
+def daily_matrix(cube: SalesCube, dimension: Optional[str] = None,
+                 top_n: Optional[int] = None) -> Tuple[np.ndarray, pd.Timestamp, List]:
+    """
+    Matrica dnevnog prometa (serije × dani) iz kocke.
+
+    Args:
+        cube: Kocka prodaje
+        dimension: Dimenzija serija (npr. 'Artikl', 'Prodajna grupa') ili None za ukupno
+        top_n: Samo top N serija po prometu
+
+    Returns:
+        (matrica, prvi dan, nazivi serija)
+    """
+    dims = ['Datum'] + ([dimension] if dimension else [])
+    daily = cube.rollup(dims, ['Ukupno'])
+    daily = daily[daily['Datum'].notna()]
+    if daily.empty:
+        return np.zeros((0, 0)), pd.NaT, []
+
+    first_day = daily['Datum'].min()
+    offsets = ((daily['Datum'] - first_day) // pd.Timedelta(days=1)).to_numpy()
+    n_days = int(offsets.max()) + 1
+
+    if dimension is None:
+        codes, keys = np.zeros(len(daily), dtype=np.int64), ['Ukupno']
+    else:
+        codes, keys = pd.factorize(daily[dimension])
+        keys = list(keys)
+
+    matrix = np.zeros((len(keys), n_days))
+    np.add.at(matrix, (codes, offsets), daily['Ukupno'].to_numpy(dtype=float))
+
+    if top_n is not None and len(keys) > top_n:
+        top = np.argsort(-matrix.sum(axis=1), kind='stable')[:top_n]
+        matrix = matrix[top]
+        keys = [keys[i] for i in top]
+    return matrix, first_day, keys
+
+
+class ForecastAnalytics:
+    """Prognoze prometa (ukupno, po artiklu, po prodajnoj grupi)."""
+
+    def __init__(self, df: pd.DataFrame, cube: Optional[SalesCube] = None):
+        """
+        Args:
+            df: DataFrame sa stavkama računa
+            cube: Kocka prodaje (SalesCube) - ako nije zadana, gradi se iz df
+        """
+        self.df = df
+        self._cube = cube
+
+    @property
+    def cube(self) -> SalesCube:
+        """Kocka prodaje (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._cube is None:
+            self._cube = SalesCube.from_frame(self.df)
+        return self._cube
+
+    def fit(self, dimension: Optional[str] = None, top_n: Optional[int] = None) -> Optional[ForecastModel]:
+        """
+        Prilagođava modele za ukupni promet ili sve serije dimenzije.
+
+        Args:
+            dimension: None (ukupni promet), 'Artikl' ili 'Prodajna grupa'
+            top_n: Samo top N serija po prometu
+
+        Returns:
+            ForecastModel ili None ako nema podataka
+        """
+        matrix, first_day, keys = daily_matrix(self.cube, dimension, top_n)
+        if matrix.size == 0:
+            return None
+        return fit_series(matrix, first_day, keys, dimension)
+
+    def get_forecast(self, horizon: int = 30, dimension: Optional[str] = None,
+                     top_n: Optional[int] = None) -> pd.DataFrame:
+        """Dnevna prognoza prometa za sljedećih horizon dana (vidi ForecastModel.forecast)."""
+        model = self.fit(dimension, top_n)
+        if model is None:
+            return pd.DataFrame()
+        return model.forecast(horizon)
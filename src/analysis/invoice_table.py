@@ -0,0 +1,76 @@
+"""
+Invoice Table - Tablica zaglavlja računa (jedan red po računu)
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .distinct_counts import INVOICE_COL, INVOICE_ID_COL, invoice_groupby
+
+# Atributi računa - uzima se vrijednost prve stavke
+HEADER_COLUMNS = [
+    INVOICE_COL, 'Datum i vrijeme', 'Datum', 'Godina', 'Mjesec', 'Lokal', 'Blagajna',
+    'Izdao', 'Način plaćanja', 'Kupac', 'Porezni broj kupca',
+]
+
+# Broj redova (stavki) računa - za provjeru da filtrirani df sadrži cijele račune
+ROWS_COL = 'Broj_redova'
+
+
+def build_invoice_table(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Gradi tablicu računa iz tablice stavki.
+
+    Kolone: Ukupno (iznos računa), Broj_stavki, Količina, atributi računa
+    (vrijeme, lokal, blagajna, izdao, način plaćanja, kupac) i Broj_redova.
+    Indeks je cjelobrojni ključ računa ('Racun_id' - broj računa unutar
+    godine). Stavke bez broja računa se ne broje.
+
+    Args:
+        df: DataFrame sa stavkama računa
+
+    Returns:
+        DataFrame sa jednim redom po računu
+    """
+    spec = {'Ukupno': ('Ukupno', 'sum')}
+    if 'Artikl' in df.columns:
+        spec['Broj_stavki'] = ('Artikl', 'count')
+    if 'Količina' in df.columns:
+        spec['Količina'] = ('Količina', 'sum')
+    for col in HEADER_COLUMNS:
+        if col in df.columns:
+            spec[col] = (col, 'first')
+    spec[ROWS_COL] = ('Ukupno', 'size')
+
+    invoices = invoice_groupby(df).agg(**spec)
+    if invoices.index.dtype != np.int32 and len(invoices) > 0:
+        invoices.index = invoices.index.astype(np.int32)
+    return invoices
+
+
+def select_invoices(invoices: Optional[pd.DataFrame], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Računi čije su stavke u df (npr. nakon filtriranja po godini ili lokalu).
+
+    Ako je tablica zadana, df ima 'Racun_id' i sadrži sve stavke odabranih
+    računa (filter po atributu računa), tablica se samo filtrira. Ako filter
+    dijeli račune (npr. po prodajnoj grupi), tablica se gradi iz df.
+
+    Args:
+        invoices: Tablica računa cijelog dataseta (ili None)
+        df: Filtrirani DataFrame sa stavkama
+    """
+    if invoices is None or INVOICE_ID_COL not in df.columns or ROWS_COL not in invoices.columns:
+        return build_invoice_table(df)
+
+    codes = df[INVOICE_ID_COL].to_numpy()
+    ids = invoices.index.to_numpy()
+    size = int(max(codes.max(initial=-1), ids.max(initial=-1))) + 1
+    rows = np.bincount(codes[codes >= 0], minlength=size)
+    present = rows[ids] > 0
+    if not (rows[ids[present]] == invoices[ROWS_COL].to_numpy()[present]).all():
+        return build_invoice_table(df)
+    if present.all():
+        return invoices
+    return invoices[present]
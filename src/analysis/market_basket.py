@@ -0,0 +1,212 @@
+"""
+Market Basket - Artikli koji se prodaju zajedno (rijetka matrica računi × artikli)
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .distinct_counts import column_codes, invoice_codes
+
+# Najveći broj artikala u skupu kod FP-growth
+MAX_ITEMSET_SIZE = 4
+
+
+class _FPNode:
+    __slots__ = ('item', 'count', 'parent', 'children')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+
+
+def _fp_growth(transactions: List[Tuple[Tuple[int, ...], int]], min_count: int,
+               max_size: int, suffix: Tuple[int, ...] = (),
+               found: Optional[Dict[Tuple[int, ...], int]] = None) -> Dict[Tuple[int, ...], int]:
+    """
+    FP-growth nad (artikli, broj ponavljanja) transakcijama.
+
+    Gradi FP-stablo sa artiklima poredanim po učestalosti, a za svaki artikl
+    (od najrjeđeg) rekurzivno rudari uvjetnu bazu - putanje od njegovih
+    čvorova do korijena.
+
+    Returns:
+        {skup artikala (sortirani kodovi): broj računa}
+    """
+    found = {} if found is None else found
+    counts = Counter()
+    for items, weight in transactions:
+        counts.update(dict.fromkeys(items, weight))
+    frequent = {item: count for item, count in counts.items() if count >= min_count}
+    if not frequent:
+        return found
+
+    rank = {item: i for i, item in enumerate(sorted(frequent, key=lambda item: (-frequent[item], item)))}
+    root = _FPNode(None, None)
+    header: Dict[int, List[_FPNode]] = {item: [] for item in frequent}
+    for items, weight in transactions:
+        node = root
+        for item in sorted((item for item in items if item in rank), key=rank.__getitem__):
+            child = node.children.get(item)
+            if child is None:
+                child = node.children[item] = _FPNode(item, node)
+                header[item].append(child)
+            child.count += weight
+            node = child
+
+    for item in sorted(frequent, key=rank.__getitem__, reverse=True):
+        itemset = tuple(sorted(suffix + (item,)))
+        found[itemset] = frequent[item]
+        if len(itemset) >= max_size:
+            continue
+        conditional = []
+        for node in header[item]:
+            path = []
+            parent = node.parent
+            while parent.item is not None:
+                path.append(parent.item)
+                parent = parent.parent
+            if path:
+                conditional.append((tuple(path), node.count))
+        if conditional:
+            _fp_growth(conditional, min_count, max_size, itemset, found)
+    return found
+
+
+class BasketAnalytics:
+    """
+    Analiza korpe - parovi i skupovi artikala na istim računima.
+
+    Računi i artikli se kodiraju u rijetku binarnu matricu X (računi × artikli),
+    pa je broj računa za svaki par artikala X.T @ X, a broj računa po artiklu
+    zbroj stupaca.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame sa stavkama računa (Fiskalni broj računa / Racun_id, Artikl)
+        """
+        self.df = df
+        self._matrix = None
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """Binarna matrica računi × artikli (gradi se pri prvom korištenju)."""
+        if self._matrix is None:
+            self._build()
+        return self._matrix
+
+    def _build(self):
+        invoices = invoice_codes(self.df)
+        articles = column_codes(self.df, 'Artikl')
+        if isinstance(self.df['Artikl'].dtype, pd.CategoricalDtype):
+            names = self.df['Artikl'].cat.categories
+        else:
+            names = pd.Index(pd.unique(self.df['Artikl'].dropna()))
+
+        valid = (invoices >= 0) & (articles >= 0)
+        rows = np.unique(invoices[valid], return_inverse=True)[1]
+        matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, articles[valid])),
+                                   shape=(rows.max() + 1 if len(rows) else 0, len(names)))
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+
+        # Samo artikli koji postoje u odabiru
+        used = np.flatnonzero(matrix.getnnz(axis=0))
+        self._matrix = matrix[:, used]
+        self.articles = names[used]
+        self.item_counts = np.asarray(self._matrix.sum(axis=0)).ravel()
+
+    @property
+    def n_invoices(self) -> int:
+        """Broj računa sa bar jednim artiklom."""
+        return self.matrix.shape[0]
+
+    def get_pairs(self, min_support: float = 0.001, min_count: int = 5) -> pd.DataFrame:
+        """
+        Parovi artikala na istim računima.
+
+        Args:
+            min_support: Najmanji udio računa sa oba artikla
+            min_count: Najmanji broj računa sa oba artikla
+
+        Returns:
+            DataFrame sa kolonama Artikl_A, Artikl_B, Broj_računa, Podrška%,
+            Pouzdanost_A→B%, Pouzdanost_B→A%, Lift - sortiran po liftu
+        """
+        matrix = self.matrix
+        n = self.n_invoices
+        co = sparse.triu(matrix.T @ matrix, k=1).tocoo()
+        keep = (co.data >= max(min_count, min_support * n)) if n else np.zeros(0, dtype=bool)
+        a, b, both = co.row[keep], co.col[keep], co.data[keep].astype(np.int64)
+        count_a, count_b = self.item_counts[a], self.item_counts[b]
+
+        pairs = pd.DataFrame({
+            'Artikl_A': self.articles[a],
+            'Artikl_B': self.articles[b],
+            'Broj_računa': both,
+            'Podrška%': both / n * 100 if n else both * 0.0,
+            'Pouzdanost_A→B%': both / count_a * 100,
+            'Pouzdanost_B→A%': both / count_b * 100,
+            'Lift': both * n / (count_a * count_b.astype(float)),
+        })
+        return pairs.sort_values(['Lift', 'Broj_računa'], ascending=False).reset_index(drop=True)
+
+    def get_rules(self, min_support: float = 0.001, min_confidence: float = 0.1,
+                  min_lift: float = 1.0, min_count: int = 5) -> pd.DataFrame:
+        """
+        Pravila "ako je na računu A, tu je i B" za parove artikala.
+
+        Returns:
+            DataFrame sa kolonama Ako, Onda, Broj_računa, Podrška%, Pouzdanost%, Lift
+        """
+        pairs = self.get_pairs(min_support, min_count)
+        common = ['Broj_računa', 'Podrška%', 'Lift']
+        forward = pairs[['Artikl_A', 'Artikl_B', 'Pouzdanost_A→B%'] + common]
+        backward = pairs[['Artikl_B', 'Artikl_A', 'Pouzdanost_B→A%'] + common]
+        columns = ['Ako', 'Onda', 'Pouzdanost%'] + common
+        rules = pd.concat([frame.set_axis(columns, axis=1) for frame in (forward, backward)], ignore_index=True)
+        rules = rules[(rules['Pouzdanost%'] >= min_confidence * 100) & (rules['Lift'] >= min_lift)]
+        return rules[['Ako', 'Onda', 'Broj_računa', 'Podrška%', 'Pouzdanost%', 'Lift']].sort_values(
+            ['Lift', 'Pouzdanost%'], ascending=False).reset_index(drop=True)
+
+    def get_frequent_itemsets(self, min_support: float = 0.01, max_size: int = MAX_ITEMSET_SIZE,
+                              min_size: int = 2) -> pd.DataFrame:
+        """
+        Česti skupovi artikala (FP-growth).
+
+        Identične korpe se prije rudarenja spajaju u jednu transakciju sa
+        brojem ponavljanja, a artikli ispod praga podrške se odbacuju.
+
+        Args:
+            min_support: Najmanji udio računa sa svim artiklima skupa
+            max_size: Najveći broj artikala u skupu
+            min_size: Najmanji broj artikala u skupu za prikaz
+
+        Returns:
+            DataFrame sa kolonama Artikli, Broj_artikala, Broj_računa, Podrška%
+        """
+        matrix = self.matrix
+        n = self.n_invoices
+        min_count = max(int(np.ceil(min_support * n)), 1)
+        frequent = np.flatnonzero(self.item_counts >= min_count)
+        reduced = matrix[:, frequent].tocsr()
+
+        baskets = Counter(tuple(reduced.indices[start:end])
+                          for start, end in zip(reduced.indptr[:-1], reduced.indptr[1:]) if end > start)
+        found = _fp_growth(list(baskets.items()), min_count, max_size)
+
+        itemsets = [(items, count) for items, count in found.items() if len(items) >= min_size]
+        names = self.articles[frequent]
+        result = pd.DataFrame({
+            'Artikli': [' + '.join(str(names[i]) for i in items) for items, _ in itemsets],
+            'Broj_artikala': [len(items) for items, _ in itemsets],
+            'Broj_računa': [count for _, count in itemsets],
+        })
+        result['Podrška%'] = result['Broj_računa'] / n * 100 if n else 0.0
+        return result.sort_values(['Broj_računa', 'Broj_artikala'], ascending=False).reset_index(drop=True)
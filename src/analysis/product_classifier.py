@@ -0,0 +1,209 @@
+"""
+Product Classifier - Kategorizacija artikala po taksonomiji proizvoda
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Taksonomija proizvoda (pravila kategorija)
+DEFAULT_TAXONOMY = Path(__file__).with_name('product_taxonomy.json')
+
+
+def load_taxonomy(path=DEFAULT_TAXONOMY) -> Dict:
+    """
+    Učitava taksonomiju iz JSON fajla.
+
+    Format: {"version", "default" (kategorija bez pravila), "order" (redoslijed
+    prikaza), "rules": [{"category", "priority", "exact", "keywords", "patterns"}]}.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def taxonomy_version(taxonomy: Dict) -> str:
+    """Verzija taksonomije - oznaka iz fajla i hash pravila."""
+    digest = hashlib.sha256(json.dumps(taxonomy, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return f"{taxonomy.get('version', 0)}-{digest.hexdigest()[:12]}"
+
+
+class ProductClassifier:
+    """
+    Kategorizira artikle po taksonomiji.
+
+    Pravila se primjenjuju po prioritetu (manji broj = prije):
+    - exact: točni nazivi artikala - imaju prednost pred svim ostalim pravilima
+    - keywords: riječi sadržane u nazivu velikim slovima
+    - patterns: regularni izrazi nad nazivom velikim slovima
+    Artikl dobiva kategoriju prvog pravila koje mu odgovara, a inače default.
+
+    Klasificiraju se samo nazivi koji još nisu u tablici artikl → kategorija.
+    Tablica se može spremati na disk (mapping_path) pa se između pokretanja
+    računaju samo novi artikli. Novi artikli se zapisuju tek pozivom flush()
+    (npr. nakon učitavanja), a ne pri svakoj klasifikaciji. Promjena
+    taksonomije poništava tablicu.
+    """
+
+    def __init__(self, taxonomy: Optional[Dict] = None, mapping_path: Optional[str] = None):
+        """
+        Args:
+            taxonomy: Taksonomija (default: product_taxonomy.json)
+            mapping_path: JSON fajl za tablicu artikl → kategorija (None = samo u memoriji)
+        """
+        taxonomy = load_taxonomy() if taxonomy is None else taxonomy
+        rules = sorted(taxonomy.get('rules', []), key=lambda rule: rule.get('priority', 0))
+        self.default = taxonomy.get('default', 'Ostalo')
+        self.version = taxonomy_version(taxonomy)
+
+        names = list(dict.fromkeys([rule['category'] for rule in rules] + [self.default]))
+        order = [name for name in taxonomy.get('order', []) if name in names]
+        self.categories: List[str] = order + [name for name in names if name not in order]
+        code = {name: i for i, name in enumerate(self.categories)}
+        self._default_code = code[self.default]
+
+        self._exact: Dict[str, int] = {}
+        self._rules = []
+        for rule in rules:
+            for name in rule.get('exact', []):
+                self._exact.setdefault(name, code[rule['category']])
+            parts = [re.escape(k) for k in rule.get('keywords', [])]
+            parts += [f"(?:{pattern})" for pattern in rule.get('patterns', [])]
+            if parts:
+                self._rules.append((code[rule['category']], re.compile('|'.join(parts))))
+
+        # Kategorijske kolone imaju abecedno sortirane kategorije (kao groupby po stringu)
+        self._sorted = sorted(self.categories)
+        self._to_sorted = np.array([self._sorted.index(name) for name in self.categories], dtype=np.int8)
+
+        self.mapping_path = Path(mapping_path) if mapping_path else None
+        self._known: Dict[str, int] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load_mapping()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_TAXONOMY, mapping_path: Optional[str] = None) -> 'ProductClassifier':
+        """Klasifikator iz fajla taksonomije."""
+        return cls(load_taxonomy(path), mapping_path)
+
+    def _load_mapping(self):
+        if self.mapping_path is None or not self.mapping_path.exists():
+            return
+        try:
+            with open(self.mapping_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('taxonomy') != self.version:
+            return
+        code = {name: i for i, name in enumerate(self.categories)}
+        self._known = {article: code[category] for article, category in data.get('articles', {}).items()
+                       if category in code}
+
+    def save_mapping(self):
+        """Zapisuje tablicu artikl → kategorija na disk."""
+        if self.mapping_path is None:
+            return
+        self.mapping_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.mapping_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'taxonomy': self.version,
+                'articles': {article: self.categories[c] for article, c in self._known.items()},
+            }, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.mapping_path)
+        self._dirty = False
+
+    def flush(self) -> bool:
+        """
+        Zapisuje tablicu na disk ako su od zadnjeg zapisa dodani novi artikli.
+
+        Returns:
+            True ako je tablica zapisana
+        """
+        with self._lock:
+            if not self._dirty or self.mapping_path is None:
+                return False
+            self.save_mapping()
+            return True
+
+    @property
+    def mapping(self) -> Dict[str, str]:
+        """Tablica artikl → kategorija za sve do sada viđene artikle."""
+        return {article: self.categories[c] for article, c in self._known.items()}
+
+    def _classify_new(self, names: List[str]) -> np.ndarray:
+        upper = pd.Series(names, dtype=object).astype(str).str.upper()
+        codes = np.full(len(names), self._default_code, dtype=np.int8)
+        pending = np.ones(len(names), dtype=bool)
+        for category, pattern in self._rules:
+            hit = pending & upper.str.contains(pattern, regex=True).to_numpy()
+            codes[hit] = category
+            pending &= ~hit
+        for i, name in enumerate(names):
+            if name in self._exact:
+                codes[i] = self._exact[name]
+        return codes
+
+    def codes(self, names: Iterable) -> np.ndarray:
+        """Kod kategorije (indeks u self.categories) za svaki naziv."""
+        names = list(names)
+        with self._lock:
+            new = list(dict.fromkeys(name for name in names
+                                     if isinstance(name, str) and name not in self._known))
+            if new:
+                self._known.update(zip(new, self._classify_new(new).tolist()))
+                self._dirty = True
+            known = self._known
+            return np.array([known.get(name, self._default_code) for name in names], dtype=np.int8)
+
+    def category(self, name: str) -> str:
+        """Kategorija jednog artikla."""
+        return self.categories[self.codes([name])[0]]
+
+    def categorize(self, articles: pd.Series) -> pd.Series:
+        """
+        Kategorija za svaki red (kategorijska Series, isti indeks).
+
+        Klasificiraju se samo jedinstveni nazivi, a redovi se mapiraju preko
+        kodova. Kategorije su abecedno sortirane.
+        """
+        if isinstance(articles.dtype, pd.CategoricalDtype):
+            row_codes = articles.cat.codes.to_numpy()
+            uniques = articles.cat.categories
+        else:
+            row_codes, uniques = pd.factorize(articles)
+        lookup = self._to_sorted[np.append(self.codes(uniques), self._default_code)]
+        values = pd.Categorical.from_codes(lookup[row_codes], categories=self._sorted)
+        return pd.Series(values, index=articles.index, name='Kategorija')
+
+    def group(self, names: Iterable) -> Dict[str, List]:
+        """{kategorija: [artikli]} redoslijedom kategorija i pojavljivanja artikala."""
+        names = list(names)
+        grouped = {category: [] for category in self.categories}
+        for name, code in zip(names, self.codes(names)):
+            grouped[self.categories[code]].append(name)
+        return grouped
+
+
+_default_classifier: Optional[ProductClassifier] = None
+
+
+def get_classifier() -> ProductClassifier:
+    """Zajednički klasifikator procesa (pamti kategorije između rerunova)."""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = ProductClassifier()
+    return _default_classifier
+
+
+def set_classifier(classifier: ProductClassifier):
+    """Postavlja zajednički klasifikator procesa (npr. sa perzistentnom tablicom)."""
+    global _default_classifier
+    _default_classifier = classifier
@@ -0,0 +1,211 @@
+"""
+Query Engine - Imenovane metrike i dimenzije sa planerom agregacija
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from .distinct_counts import INVOICE_COL, column_codes, distinct_per_group
+
+# Osnovne agregacije - (kolona, funkcija); sum i count su aditivne pa se mogu
+# zbrajati iz finijeg grupiranja, a nunique se uvijek računa nad stavkama
+BASE = {
+    'promet': ('Ukupno', 'sum'),
+    'kolicina': ('Količina', 'sum'),
+    'broj_racuna': (INVOICE_COL, 'nunique'),
+    'broj_artikala': ('Artikl', 'nunique'),
+    'broj_stavki': ('Artikl', 'count'),
+    'cijena_suma': ('Cijena', 'sum'),
+    'cijena_n': ('Cijena', 'count'),
+}
+
+ADDITIVE = {name for name, (_, func) in BASE.items() if func in ('sum', 'count')}
+
+# Izvedene metrike - (osnovne agregacije, formula nad tablicom rezultata)
+DERIVED: Dict[str, Tuple[Tuple[str, ...], Callable[[pd.DataFrame], pd.Series]]] = {
+    'prosjecan_racun': (('promet', 'broj_racuna'), lambda t: t['promet'] / t['broj_racuna']),
+    'prosjecna_cijena': (('cijena_suma', 'cijena_n'), lambda t: t['cijena_suma'] / t['cijena_n']),
+    'cijena_po_komadu': (('promet', 'kolicina'), lambda t: t['promet'] / t['kolicina']),
+    'udio%': (('promet',), lambda t: t['promet'] / t['promet'].sum() * 100),
+}
+
+METRICS = list(BASE) + list(DERIVED)
+
+# Imenovane dimenzije koje nisu kolone - funkcija nad stavkama
+DIMENSIONS: Dict[str, Callable[[pd.DataFrame], pd.Series]] = {
+    'Datum_dan': lambda df: df['Datum i vrijeme'].dt.date,
+}
+
+Dims = Union[str, Sequence[str]]
+
+
+def _bases(metrics: Iterable[str]) -> List[str]:
+    """Osnovne agregacije potrebne za metrike (redoslijed prvog pojavljivanja)."""
+    needed = []
+    for metric in metrics:
+        if metric in BASE:
+            needed.append(metric)
+        elif metric in DERIVED:
+            needed.extend(DERIVED[metric][0])
+        else:
+            raise ValueError(f"Nepoznata metrika: {metric!r} (dostupne: {', '.join(METRICS)})")
+    return list(dict.fromkeys(needed))
+
+
+class QueryEngine:
+    """
+    Upiti oblika "metrike po dimenzijama" nad tablicom stavki.
+
+    Planer spaja sve upite sa istim grupiranjem u jedan prolaz (jedan
+    groupby za sve potrebne osnovne agregacije) i pamti osnovne agregacije
+    po grupiranju. Sljedeći upit koristi zapamćene kolone, a aditivne mjere
+    (sume i brojevi) grubljeg grupiranja zbraja iz već izračunatog finijeg
+    grupiranja umjesto novog prolaza po stavkama.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame sa stavkama računa (engine ga ne drži živim - drži ga pozivatelj)
+        """
+        self._df_ref = weakref.ref(df)
+        self._cache: Dict[Tuple[str, ...], pd.DataFrame] = {}
+        self._complete: Dict[str, bool] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """DataFrame nad kojim se rade upiti."""
+        df = self._df_ref()
+        if df is None:
+            raise ReferenceError("DataFrame QueryEngine-a više ne postoji")
+        return df
+
+    def _key(self, dimension: str) -> pd.Series:
+        if dimension in DIMENSIONS and dimension not in self.df.columns:
+            return DIMENSIONS[dimension](self.df).rename(dimension)
+        return self.df[dimension]
+
+    def _has_all(self, dimension: str) -> bool:
+        """Dimenzija nema praznih vrijednosti (grupiranje po njoj ne izbacuje redove)."""
+        if dimension not in self._complete:
+            self._complete[dimension] = bool(self._key(dimension).notna().all())
+        return self._complete[dimension]
+
+    def _finer(self, dims: Tuple[str, ...], bases: List[str]) -> Optional[pd.DataFrame]:
+        """Zapamćeno finije grupiranje iz kojeg se mogu zbrojiti tražene aditivne agregacije."""
+        if not set(bases) <= ADDITIVE:
+            return None
+        for cached_dims, table in self._cache.items():
+            extra = [d for d in cached_dims if d not in dims]
+            if (set(dims) < set(cached_dims) and set(bases) <= set(table.columns)
+                    and all(self._has_all(d) for d in extra)):
+                return table
+        return None
+
+    def _compute(self, dims: Tuple[str, ...], bases: List[str]) -> pd.DataFrame:
+        """Osnovne agregacije za grupiranje - jedan groupby po stavkama ili zbroj finijeg grupiranja."""
+        finer = self._finer(dims, bases)
+        if finer is not None:
+            return finer.groupby(level=list(dims), observed=True, sort=True)[bases].sum()
+
+        keys = [self._key(d) for d in dims]
+        grouped = self.df.groupby(keys if len(keys) > 1 else keys[0], observed=True, sort=True)
+        summed = {base: BASE[base] for base in bases if BASE[base][1] != 'nunique'}
+        table = grouped.agg(**summed) if summed else pd.DataFrame(index=grouped.size().index)
+
+        # Broj različitih vrijednosti preko cjelobrojnih kodova (kao aggregate)
+        distinct = [base for base in bases if BASE[base][1] == 'nunique']
+        if distinct:
+            group_ids = grouped.ngroup().to_numpy()
+            for base in distinct:
+                table[base] = distinct_per_group(group_ids, column_codes(self.df, BASE[base][0]), len(table))
+        return table[bases]
+
+    def _ensure(self, dims: Tuple[str, ...], bases: List[str]) -> pd.DataFrame:
+        with self._lock:
+            table = self._cache.get(dims)
+            missing = [b for b in bases if table is None or b not in table.columns]
+            if missing:
+                part = self._compute(dims, missing)
+                table = part if table is None else table.join(part)
+                self._cache[dims] = table
+            return table
+
+    def run(self, requests: Sequence[Tuple[Dims, Sequence[str]]]) -> List[pd.DataFrame]:
+        """
+        Izvršava više upita - upiti sa istim grupiranjem dijele jedan prolaz.
+
+        Args:
+            requests: [(dimenzije, metrike), ...]
+
+        Returns:
+            Lista DataFrame-ova (dimenzije kao kolone pa metrike), redoslijedom upita
+        """
+        normalized = [((dims,) if isinstance(dims, str) else tuple(dims), list(metrics))
+                      for dims, metrics in requests]
+        plan: Dict[Tuple[str, ...], List[str]] = {}
+        for dims, metrics in normalized:
+            plan.setdefault(dims, []).extend(_bases(metrics))
+        for dims, bases in plan.items():
+            self._ensure(dims, list(dict.fromkeys(bases)))
+
+        results = []
+        for dims, metrics in normalized:
+            table = self._cache[dims]
+            result = table[[m for m in _bases(metrics)]].copy()
+            for metric in metrics:
+                if metric in DERIVED:
+                    result[metric] = DERIVED[metric][1](result)
+            results.append(result[metrics].reset_index())
+        return results
+
+    def query(self, dims: Dims, metrics: Sequence[str]) -> pd.DataFrame:
+        """
+        Metrike po dimenzijama.
+
+        Args:
+            dims: Dimenzija ili lista dimenzija (kolone ili imenovane dimenzije iz DIMENSIONS)
+            metrics: Metrike iz METRICS (npr. 'promet', 'broj_racuna', 'prosjecan_racun', 'udio%')
+
+        Returns:
+            DataFrame sa dimenzijama i metrikama (sortiran po dimenzijama)
+        """
+        return self.run([(dims, metrics)])[0]
+
+    def clear(self):
+        """Briše zapamćene agregacije."""
+        with self._lock:
+            self._cache.clear()
+            self._complete.clear()
+
+
+# Registar engina po id(df) - bez jakih referenci na df (zapis se briše kad se df
+# obriše), a najdavnije korišteni engini se izbacuju zajedno sa svojim agregacijama
+MAX_ENGINES = 8
+
+_engines: 'OrderedDict[int, QueryEngine]' = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def _forget(key: int, engine_ref: 'weakref.ref'):
+    engine = engine_ref()
+    if engine is not None and _engines.get(key) is engine:
+        _engines.pop(key, None)
+
+
+def query_engine(df: pd.DataFrame) -> QueryEngine:
+    """Zajednički QueryEngine za DataFrame - sve analitičke klase nad istim df dijele agregacije."""
+    with _engines_lock:
+        key = id(df)
+        engine = _engines.get(key)
+        if engine is None or engine._df_ref() is not df:
+            engine = _engines[key] = QueryEngine(df)
+            weakref.finalize(df, _forget, key, weakref.ref(engine))
+        _engines.move_to_end(key)
+        while len(_engines) > MAX_ENGINES:
+            _engines.popitem(last=False)
+        return engine
@@ -0,0 +1,187 @@
+"""
+Result Cache - Memoizacija rezultata analitičkih klasa (LRU sa memorijskim budžetom)
+"""
+import copy
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_MISSING = object()
+
+
+def estimate_nbytes(value: Any) -> int:
+    """Procjena zauzeća memorije rezultata (DataFrame, Series, dict, lista, objekt sa nbytes, skalar)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True, index=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k) + estimate_nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if isinstance(getattr(value, 'nbytes', None), (int, np.integer)):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def _normalize_values(values: Optional[Iterable]) -> Optional[Tuple]:
+    if values is None:
+        return None
+    items = {v.item() if isinstance(v, np.generic) else v for v in values}
+    return tuple(sorted(items, key=lambda v: (type(v).__name__, v)))
+
+
+def filter_signature(years: Optional[Iterable] = None, months: Optional[Iterable] = None,
+                     locations: Optional[Iterable] = None) -> Tuple:
+    """
+    Normalizirani potpis filtera - isti odabir uvijek daje isti ključ
+    (redoslijed i duplikati nisu bitni, None = bez filtera).
+    """
+    return (('Godina', _normalize_values(years)),
+            ('Mjesec', _normalize_values(months)),
+            ('Lokal', _normalize_values(locations)))
+
+
+def _freeze(value: Any) -> Hashable:
+    """Argumenti metode kao hashable ključ (TypeError ako nije moguće)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, np.generic):
+        return value.item()
+    hash(value)
+    return value
+
+
+class ResultCache:
+    """
+    LRU cache rezultata sa ograničenjem broja unosa i ukupne memorije.
+
+    Kad se budžet prekorači, izbacuju se najdavnije korišteni rezultati.
+    Rezultat veći od cijelog budžeta se ne sprema.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024, max_entries: int = 1024):
+        """
+        Args:
+            max_bytes: Memorijski budžet u bajtovima
+            max_entries: Najveći broj spremljenih rezultata
+        """
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Vraća spremljeni rezultat (i označava ga kao nedavno korišten)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Sprema rezultat i izbacuje najstarije unose ako je budžet prekoračen."""
+        size = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self._entries and (self.nbytes > self.max_bytes or len(self._entries) > self.max_entries):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+
+    def clear(self):
+        """Briše sve unose."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        """Broj unosa, zauzeće memorije i pogodci."""
+        total = self.hits + self.misses
+        return {
+            'unosa': len(self._entries),
+            'memorija_mb': self.nbytes / 1e6,
+            'pogodaka': self.hits,
+            'promašaja': self.misses,
+            'pogodak%': (self.hits / total * 100) if total > 0 else 0,
+        }
+
+
+class CachedAnalytics:
+    """
+    Proxy oko analitičke klase - rezultati metoda se spremaju u ResultCache.
+
+    Ključ rezultata je (key, klasa, naziv metode, argumenti), gdje key treba
+    sadržavati verziju dataseta i potpis filtera. Analitički objekt se kreira
+    tek kad neki rezultat nije u cache-u. Vraćaju se kopije rezultata pa
+    izmjene u pozivatelju ne mijenjaju cache.
+    """
+
+    def __init__(self, cls: type, cache: ResultCache, key: Hashable, *args, **kwargs):
+        """
+        Args:
+            cls: Analitička klasa (npr. FinancialAnalytics)
+            cache: Zajednički ResultCache
+            key: Ključ skupa podataka (verzija dataseta, potpis filtera)
+            *args, **kwargs: Argumenti konstruktora klase
+        """
+        self._cls = cls
+        self._cache = cache
+        self._key = (key, cls.__name__)
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+
+    @property
+    def instance(self) -> Any:
+        """Analitički objekt (kreira se pri prvom pozivu)."""
+        if self._instance is None:
+            self._instance = self._cls(*self._args, **self._kwargs)
+        return self._instance
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_') or not callable(getattr(self._cls, name, None)):
+            # Atributi (df, invoices, ...) se ne spremaju
+            return getattr(self.instance, name)
+
+        def call(*args, **kwargs):
+            try:
+                key = (self._key, name, _freeze(args), _freeze(kwargs))
+            except TypeError:
+                # Argumenti koji se ne mogu hashirati - bez cache-a
+                return getattr(self.instance, name)(*args, **kwargs)
+
+            result = self._cache.get(key, _MISSING)
+            if result is _MISSING:
+                result = getattr(self.instance, name)(*args, **kwargs)
+                self._cache.put(key, result)
+            return copy.deepcopy(result)
+
+        return call
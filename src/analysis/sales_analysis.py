@@ -6,16 +6,28 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import List, Optional
 
+from .query_engine import query_engine
+from .invoice_table import build_invoice_table
+
 
 class SalesAnalyzer:
     """Klasa za analizu prodaje artikala i prodajnih grupa."""
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, invoices: Optional[pd.DataFrame] = None):
         """
         Args:
             df: Obrađeni DataFrame
+            invoices: Tablica računa (build_invoice_table) - ako nije zadana, gradi se iz df
         """
         self.df = df
+        self._invoices = invoices
+    
+    @property
+    def invoices(self) -> pd.DataFrame:
+        """Tablica računa (gradi se pri prvom korištenju ako nije zadana)."""
+        if self._invoices is None:
+            self._invoices = build_invoice_table(self.df)
+        return self._invoices
     
     def analyze_by_product_group(self, top_n: Optional[int] = None) -> pd.DataFrame:
         """
@@ -28,20 +40,15 @@ class SalesAnalyzer:
         if 'Prodajna grupa' not in self.df.columns:
             return pd.DataFrame()
         
-        groups = self.df.groupby('Prodajna grupa').agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'nunique'
-        }).reset_index()
-        
+        groups = query_engine(self.df).query('Prodajna grupa', [
+            'kolicina', 'promet', 'broj_racuna', 'broj_artikala', 'cijena_po_komadu', 'udio%'
+        ])
         groups.columns = [
-            'Prodajna_grupa', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_različitih_artikala'
+            'Prodajna_grupa',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_različitih_artikala',
+            'Prosječna_cijena', 'Udio_u_prometu'
         ]
-        
-        groups['Prosječna_cijena'] = groups['Promet'] / groups['Ukupna_količina']
-        groups['Udio_u_prometu'] = (groups['Promet'] / groups['Promet'].sum() * 100).round(2)
+        groups['Udio_u_prometu'] = groups['Udio_u_prometu'].round(2)
         
         groups = groups.sort_values('Promet', ascending=False)
         
@@ -62,27 +69,25 @@ class SalesAnalyzer:
         if 'Prodajna grupa' in self.df.columns:
             group_cols.append('Prodajna grupa')
         
-        articles = self.df.groupby(group_cols).agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Cijena': 'mean',
-            'Fiskalni broj računa': 'nunique'
-        }).reset_index()
+        articles = query_engine(self.df).query(group_cols, [
+            'kolicina', 'promet', 'prosjecna_cijena', 'broj_racuna', 'udio%'
+        ])
         
         # Postavljanje naziva kolona zavisno od grupiranja
         if 'Prodajna grupa' in self.df.columns:
             articles.columns = [
                 'Artikl', 'Prodajna_grupa',
-                'Ukupna_količina', 'Promet', 'Prosječna_cijena', 'Broj_računa'
+                'Ukupna_količina', 'Promet', 'Prosječna_cijena', 'Broj_računa', 'Udio_u_prometu'
             ]
         else:
             articles.columns = [
                 'Artikl',
-                'Ukupna_količina', 'Promet', 'Prosječna_cijena', 'Broj_računa'
+                'Ukupna_količina', 'Promet', 'Prosječna_cijena', 'Broj_računa', 'Udio_u_prometu'
             ]
-            articles['Prodajna_grupa'] = 'N/A'  # Dodaj placeholder kolonu
+            # Dodaj placeholder kolonu (ispred udjela, kao ranije)
+            articles.insert(articles.columns.get_loc('Udio_u_prometu'), 'Prodajna_grupa', 'N/A')
         
-        articles['Udio_u_prometu'] = (articles['Promet'] / articles['Promet'].sum() * 100).round(2)
+        articles['Udio_u_prometu'] = articles['Udio_u_prometu'].round(2)
         
         articles = articles.sort_values('Promet', ascending=False)
         
@@ -166,10 +171,7 @@ class SalesAnalyzer:
             # Ako nema prodajne grupe, grupiši samo po vremenskoj dimenziji
             group_cols.append('Artikl')  # Koristi artikl kao alternativu
         
-        performance = self.df.groupby(group_cols).agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum'
-        }).reset_index()
+        performance = query_engine(self.df).query(group_cols, ['kolicina', 'promet'])
         
         # Postavljanje naziva kolona
         if 'Prodajna grupa' in self.df.columns:
@@ -186,10 +188,10 @@ class SalesAnalyzer:
         metrics = {
             'ukupni_promet': self.df['Ukupno'].sum(),
             'ukupna_kolicina': self.df['Količina'].sum(),
-            'prosječan_račun': self.df.groupby('Fiskalni broj računa')['Ukupno'].sum().mean(),
+            'prosječan_račun': self.invoices['Ukupno'].mean(),
             'prosječna_stavka': self.df['Ukupno'].mean(),
             'broj_transakcija': len(self.df),
-            'broj_računa': self.df['Fiskalni broj računa'].nunique(),
+            'broj_računa': len(self.invoices),
             'broj_artikala': self.df['Artikl'].nunique(),
             'broj_prodajnih_grupa': self.df['Prodajna grupa'].nunique(),
             'prosječna_količina_po_transakciji': self.df['Količina'].mean(),
@@ -0,0 +1,193 @@
+"""
+Sales Cube - Predagregirana kocka prodaje (datum × sat × lokal × grupa × artikl)
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .distinct_counts import distinct_per_group, invoice_codes
+
+# Nivoi kocke - broj računa je aditivan samo unutar nivoa na kojem je izračunat
+# (račun pripada jednoj ćeliji datum × sat × lokal, ali može imati više artikala)
+LEVEL_DIMS = {
+    'racuni': ['Datum', 'Sat', 'Lokal'],
+    'grupe': ['Datum', 'Sat', 'Lokal', 'Prodajna grupa'],
+    'artikli': ['Datum', 'Sat', 'Lokal', 'Prodajna grupa', 'Artikl'],
+}
+
+MEASURES = ['Ukupno', 'Količina', 'Stavke', 'Racuni']
+
+# Kalendarske dimenzije izvedene iz datuma ćelije
+CALENDAR_DIMS = ['Godina', 'Mjesec', 'Kvartal', 'Tjedan', 'Dan',
+                 'Dan_u_tjednu_broj', 'Dan_u_tjednu', 'Mjesec_naziv']
+
+
+def _build_level(df: pd.DataFrame, dims: List[str], day: pd.Series,
+                 codes: np.ndarray) -> pd.DataFrame:
+    keys = [day if dim == 'Datum' else df[dim] for dim in dims]
+    grouped = df.groupby(keys, observed=True, dropna=False, sort=True)
+
+    spec = {'Ukupno': ('Ukupno', 'sum')}
+    if 'Količina' in df.columns:
+        spec['Količina'] = ('Količina', 'sum')
+    spec['Stavke'] = ('Ukupno', 'count')
+    level = grouped.agg(**spec)
+
+    level['Racuni'] = distinct_per_group(grouped.ngroup().to_numpy(), codes, len(level))
+    return level.reset_index()
+
+
+def _add_calendar(level: pd.DataFrame) -> pd.DataFrame:
+    datum = level['Datum'].dt
+    complete = bool(level['Datum'].notna().all())
+
+    def small(values, dtype):
+        return values.astype(dtype) if complete else values
+
+    level['Godina'] = small(datum.year, np.int16)
+    level['Mjesec'] = small(datum.month, np.int8)
+    level['Kvartal'] = small(datum.quarter, np.int8)
+    level['Tjedan'] = datum.isocalendar().week.astype('UInt8')
+    level['Dan'] = small(datum.day, np.int8)
+    level['Dan_u_tjednu_broj'] = small(datum.dayofweek, np.int8)
+    level['Dan_u_tjednu'] = datum.day_name().astype('category')
+    level['Mjesec_naziv'] = datum.month_name().astype('category')
+    return level
+
+
+class SalesCube:
+    """
+    OLAP kocka prodaje.
+
+    Gradi se jednom iz tablice stavki na tri nivoa (račun: datum × sat × lokal,
+    grupa: + prodajna grupa, artikl: + prodajna grupa + artikl) sa mjerama
+    Ukupno, Količina, Stavke (broj stavki s iznosom) i Racuni (broj različitih
+    računa). Upiti (rollup) se odgovaraju iz najmanjeg nivoa koji sadrži tražene
+    dimenzije, pa je broj računa aditivan. Filter po dimenziji koje nivo nema
+    izbacuje taj nivo.
+    """
+
+    def __init__(self, levels: Dict[str, pd.DataFrame],
+                 conditions: Optional[Dict[str, List]] = None):
+        """
+        Args:
+            levels: {naziv nivoa: DataFrame ćelija}
+            conditions: Primijenjeni filteri {dimenzija: dozvoljene vrijednosti}
+        """
+        self.levels = levels
+        self.conditions = conditions or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'SalesCube':
+        """
+        Gradi kocku iz DataFrame-a sa stavkama računa.
+
+        Args:
+            df: DataFrame sa stavkama (Datum i vrijeme, Sat, Lokal, Prodajna grupa,
+                Artikl, Ukupno, Količina, Fiskalni broj računa) - dimenzije koje
+                nedostaju se izostavljaju
+        """
+        day = df['Datum i vrijeme'].dt.normalize().rename('Datum')
+        codes = invoice_codes(df)
+
+        levels = {}
+        for name, dims in LEVEL_DIMS.items():
+            dims = [dim for dim in dims if dim == 'Datum' or dim in df.columns]
+            levels[name] = _add_calendar(_build_level(df, dims, day, codes))
+        return cls(levels)
+
+    def __len__(self) -> int:
+        return sum(len(level) for level in self.levels.values())
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije kocke."""
+        return int(sum(level.memory_usage(deep=True).sum() for level in self.levels.values()))
+
+    def _level_name(self, dims: Sequence[str]) -> str:
+        for name in LEVEL_DIMS:
+            if name in self.levels and all(dim in self.levels[name].columns for dim in dims):
+                return name
+        finest = self.levels[list(self.levels)[-1]] if self.levels else pd.DataFrame()
+        raise KeyError(f"Kocka nema dimenzije: {[d for d in dims if d not in finest.columns]}")
+
+    def level_for(self, dims: Sequence[str]) -> pd.DataFrame:
+        """Najmanji nivo kocke koji sadrži sve zadane dimenzije."""
+        return self.levels[self._level_name(dims)]
+
+    def _check_invoices(self, name: str, dims: Sequence[str]):
+        """
+        Broj računa je aditivan samo ako se ne zbraja preko ćelija istog računa -
+        najfinija dimenzija nivoa (artikl pa prodajna grupa) mora biti tražena
+        ili filtrirana na jednu vrijednost (artikl određuje prodajnu grupu).
+        """
+        finer = [dim for dim in LEVEL_DIMS[name][len(LEVEL_DIMS['racuni']):] if dim in self.levels[name].columns]
+        covered = [i for i, dim in enumerate(finer) if dim in dims or len(self.conditions.get(dim, ())) == 1]
+        extra = finer[covered[-1] + 1:] if covered else finer
+        if extra:
+            raise ValueError(f"Broj računa nije aditivan na nivou '{name}' preko {extra} - "
+                             f"dodajte dimenzije u rollup ili računajte iz stavki")
+
+    def filter(self, conditions: Dict[str, Optional[Iterable]]) -> 'SalesCube':
+        """
+        Vraća kocku samo sa ćelijama koje zadovoljavaju uvjete.
+
+        Nivoi bez neke filtrirane dimenzije (npr. 'racuni' kod filtera po Artikl)
+        se izbacuju, pa se upiti odgovaraju iz nivoa koji filter poštuju. Broj
+        računa se tada ne zbraja preko artikala/grupa (rollup javlja ValueError).
+
+        Args:
+            conditions: {dimenzija: dozvoljene vrijednosti}; None = bez filtera (kao isin,
+                prazna lista ne propušta ništa)
+        """
+        conditions = {dim: list(values) for dim, values in conditions.items() if values is not None}
+        if not conditions:
+            return self
+        self._level_name(list(conditions))
+
+        merged = dict(self.conditions)
+        for dim, values in conditions.items():
+            merged[dim] = [v for v in merged[dim] if v in values] if dim in merged else values
+
+        levels = {}
+        for name, level in self.levels.items():
+            if not all(dim in level.columns for dim in conditions):
+                continue
+            mask = np.ones(len(level), dtype=bool)
+            for dim, values in conditions.items():
+                mask &= level[dim].isin(values).to_numpy()
+            levels[name] = level if mask.all() else level[mask].reset_index(drop=True)
+        return SalesCube(levels, merged)
+
+    def rollup(self, dims: Union[str, List[str]],
+               measures: Sequence[str] = ('Ukupno', 'Količina', 'Stavke', 'Racuni')) -> pd.DataFrame:
+        """
+        Agregira kocku na zadane dimenzije (isto kao groupby nad stavkama).
+
+        Args:
+            dims: Dimenzija ili lista dimenzija (Datum, Sat, Lokal, Prodajna grupa,
+                Artikl ili kalendarske dimenzije)
+            measures: Mjere (Ukupno, Količina, Stavke, Racuni)
+
+        Returns:
+            DataFrame sa dimenzijama i mjerama, sortiran po dimenzijama
+        """
+        dims = [dims] if isinstance(dims, str) else list(dims)
+        name = self._level_name(dims)
+        if 'Racuni' in measures:
+            self._check_invoices(name, dims)
+        level = self.levels[name]
+        return level.groupby(dims, observed=True, sort=True)[list(measures)].sum().reset_index()
+
+    def total(self, measure: str = 'Ukupno'):
+        """Ukupna vrijednost mjere (Racuni = broj različitih računa)."""
+        name = self._level_name([])
+        if measure == 'Racuni':
+            self._check_invoices(name, [])
+        return self.levels[name][measure].sum()
+
+    def distinct(self, dim: str, by: Union[str, List[str]]) -> pd.Series:
+        """Broj različitih vrijednosti dimenzije po grupi (npr. artikala po prodajnoj grupi)."""
+        level = self.level_for([dim] + ([by] if isinstance(by, str) else list(by)))
+        return level.groupby(by, observed=True, sort=True)[dim].nunique()
@@ -0,0 +1,285 @@
+"""
+Sketches - Približni broj različitih vrijednosti (HyperLogLog) i kvantili (log-histogram) po danu i lokalu
+"""
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .distinct_counts import column_codes, invoice_codes
+
+# HyperLogLog: 2^12 registara - standardna greška ~1.6%
+PRECISION = 12
+
+# Kvantili: relativna greška vrijednosti ~1% u rasponu [MIN_VALUE, MAX_VALUE]
+ACCURACY = 0.01
+MIN_VALUE = 0.01
+MAX_VALUE = 1e6
+
+QUANTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+def hash64(codes: np.ndarray) -> np.ndarray:
+    """64-bitni hash cijelih brojeva (splitmix64)."""
+    z = np.asarray(codes).astype(np.uint64) + _GOLDEN
+    z = (z ^ (z >> np.uint64(30))) * _MIX1
+    z = (z ^ (z >> np.uint64(27))) * _MIX2
+    return z ^ (z >> np.uint64(31))
+
+
+def hll_ranks(codes: np.ndarray, precision: int = PRECISION):
+    """
+    HyperLogLog registar i rang za svaki kod.
+
+    Prvih precision bitova hasha bira registar, a rang je broj vodećih nula
+    ostatka + 1. Registar skupa pamti najveći rang, pa se skupovi spajaju
+    maksimumom po registru.
+    """
+    hashed = hash64(codes)
+    index = (hashed >> np.uint64(64 - precision)).astype(np.int64)
+    rest = hashed << np.uint64(precision)
+    top_bit = np.frexp(rest.astype(np.float64))[1] - 1
+    rank = np.where(rest == 0, 64 - precision + 1, 64 - top_bit).astype(np.uint8)
+    return index, rank
+
+
+def hll_estimate(registers: np.ndarray) -> float:
+    """Procjena broja različitih vrijednosti iz (spojenih) registara."""
+    m = len(registers)
+    if m == 0:
+        return 0.0
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros > 0:
+        estimate = m * np.log(m / zeros)
+    return float(estimate)
+
+
+class CellSketch:
+    """
+    Rijetki sketch po ćeliji - za svaku ćeliju samo neprazni parovi (ključ, vrijednost).
+
+    Za HyperLogLog ključ je registar, a vrijednost najveći rang (spajanje
+    maksimumom); za histogram ključ je bucket, a vrijednost broj (spajanje
+    zbrajanjem). Zauzeće raste sa brojem vrijednosti, a ne sa brojem ćelija.
+    """
+
+    def __init__(self, ptr: np.ndarray, keys: np.ndarray, values: np.ndarray, size: int, merge: str):
+        """
+        Args:
+            ptr: Početak unosa svake ćelije (dužina broj_ćelija + 1)
+            keys: Ključevi unosa (registar ili bucket)
+            values: Vrijednosti unosa (rang ili broj)
+            size: Broj ključeva (registara ili bucketa)
+            merge: 'max' (HyperLogLog) ili 'sum' (histogram)
+        """
+        self.ptr = ptr
+        self.keys = keys
+        self.values = values
+        self.size = size
+        self.merge = merge
+
+    @classmethod
+    def build(cls, cells: np.ndarray, keys: np.ndarray, values: Optional[np.ndarray],
+              n_cells: int, size: int, merge: str) -> 'CellSketch':
+        """Gradi sketch iz (ćelija, ključ, vrijednost) parova - values=None broji pojave."""
+        flat = cells.astype(np.int64) * size + keys
+        if merge == 'sum':
+            flat, values = np.unique(flat, return_counts=True)
+            values = values.astype(np.uint32)
+        else:
+            order = np.lexsort((values, flat))
+            flat, values = flat[order], values[order]
+            last = np.append(flat[1:] != flat[:-1], True)
+            flat, values = flat[last], values[last]
+        ptr = np.searchsorted(flat // size, np.arange(n_cells + 1))
+        dtype = np.uint16 if size <= np.iinfo(np.uint16).max else np.int64
+        return cls(ptr, (flat % size).astype(dtype), values, size, merge)
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije."""
+        return self.ptr.nbytes + self.keys.nbytes + self.values.nbytes
+
+    def merged(self, cells: np.ndarray) -> np.ndarray:
+        """Spojeni gusti sketch odabranih ćelija (maska ćelija)."""
+        selected = np.repeat(cells, np.diff(self.ptr))
+        keys, values = self.keys[selected].astype(np.int64), self.values[selected]
+        if self.merge == 'sum':
+            return np.bincount(keys, weights=values, minlength=self.size).astype(np.int64)
+        result = np.zeros(self.size, dtype=np.uint8)
+        np.maximum.at(result, keys, values)
+        return result
+
+
+class QuantileBuckets:
+    """
+    Logaritamski histogram (kao DDSketch) - vrijednost x > 0 ide u bucket
+    ceil(log_γ x), γ = (1 + a) / (1 - a), pa je svaki kvantil unutar relativne
+    greške a. Histogrami se spajaju zbrajanjem. Bucket 0 su vrijednosti <= 0.
+    """
+
+    def __init__(self, accuracy: float = ACCURACY, min_value: float = MIN_VALUE, max_value: float = MAX_VALUE):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = np.log(self.gamma)
+        self.first = int(np.ceil(np.log(min_value) / self._log_gamma))
+        last = int(np.ceil(np.log(max_value) / self._log_gamma))
+        self.n_buckets = last - self.first + 2
+        keys = np.arange(self.first, last + 1)
+        self.values = np.concatenate(([0.0], 2 * self.gamma ** keys / (self.gamma + 1)))
+
+    def bucket(self, values: np.ndarray) -> np.ndarray:
+        """Indeks bucketa za svaku vrijednost (0 = vrijednost <= 0)."""
+        values = np.asarray(values, dtype=float)
+        positive = values > 0
+        keys = np.ceil(np.log(np.where(positive, values, 1.0)) / self._log_gamma)
+        index = np.clip(keys - self.first + 1, 1, self.n_buckets - 1).astype(np.int64)
+        return np.where(positive, index, 0)
+
+    def quantiles(self, counts: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+        """Kvantili iz (spojenog) histograma - NaN ako je prazan."""
+        cumulative = np.cumsum(counts, dtype=np.int64)
+        total = cumulative[-1] if len(cumulative) else 0
+        if total == 0:
+            return np.full(len(qs), np.nan)
+        ranks = np.asarray(qs, dtype=float) * (total - 1)
+        return self.values[np.searchsorted(cumulative, ranks, side='right')]
+
+
+class SketchIndex:
+    """
+    Predizračunati sketchevi po ćeliji dan × lokal.
+
+    Za svaku ćeliju čuva HyperLogLog registre računa i artikala te histograme
+    iznosa računa i cijena stavki. Odabir dana/lokala se odgovara spajanjem
+    ćelija (maksimum registara, zbroj histograma) bez prolaza kroz stavke.
+    Brojevi su približni - za točne vrijednosti koriste se analitičke klase.
+    """
+
+    def __init__(self, first_day: pd.Timestamp, n_days: int, locations: pd.Index,
+                 sketches: Dict[str, CellSketch], buckets: QuantileBuckets):
+        self.first_day = first_day
+        self.n_days = n_days
+        self.locations = locations
+        self.sketches = sketches
+        self.buckets = buckets
+        self.days = pd.date_range(first_day, periods=n_days, freq='D') if n_days else pd.DatetimeIndex([])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, precision: int = PRECISION,
+                   accuracy: float = ACCURACY) -> 'SketchIndex':
+        """
+        Gradi sketcheve iz stavki (jedan prolaz po mjeri).
+
+        Iznos računa je zbroj stavki računa u ćeliji dan × lokal (ključ računa
+        je broj računa unutar godine).
+
+        Args:
+            df: DataFrame sa stavkama računa
+            precision: Broj bitova HyperLogLog indeksa registra
+            accuracy: Relativna greška kvantila
+        """
+        buckets = QuantileBuckets(accuracy)
+
+        day = df['Datum i vrijeme'].to_numpy().astype('datetime64[D]')
+        valid_days = day[~np.isnat(day)]
+        if len(valid_days) == 0:
+            return cls(pd.NaT, 0, pd.Index([]), {}, buckets)
+        first_day = valid_days.min()
+        n_days = int((valid_days.max() - first_day).astype(np.int64)) + 1
+
+        if 'Lokal' in df.columns:
+            locations = pd.Index(df['Lokal'].dropna().unique()).sort_values()
+        else:
+            locations = pd.Index(['Ukupno'])
+        n_cells = n_days * len(locations)
+
+        def cells(frame: pd.DataFrame) -> np.ndarray:
+            days = frame['Datum i vrijeme'].to_numpy().astype('datetime64[D]')
+            offsets = np.where(np.isnat(days), -1, (days - first_day).astype(np.int64))
+            if 'Lokal' in frame.columns:
+                location = locations.get_indexer(frame['Lokal'])
+            else:
+                location = np.zeros(len(frame), dtype=np.int64)
+            return np.where((offsets >= 0) & (location >= 0), offsets * len(locations) + location, -1)
+
+        line_cells = cells(df)
+        sketches = {}
+
+        invoices = invoice_codes(df)
+        keep = (line_cells >= 0) & (invoices >= 0)
+        sketches['racuni'] = CellSketch.build(line_cells[keep], *hll_ranks(invoices[keep], precision),
+                                              n_cells, 1 << precision, 'max')
+
+        codes = column_codes(df, 'Artikl')
+        keep = (line_cells >= 0) & (codes >= 0)
+        sketches['artikli'] = CellSketch.build(line_cells[keep], *hll_ranks(codes[keep], precision),
+                                               n_cells, 1 << precision, 'max')
+
+        # Iznos računa - zbroj stavki po paru (ćelija, račun)
+        values = df['Ukupno'].to_numpy(dtype=float)
+        keep = (line_cells >= 0) & (invoices >= 0) & ~np.isnan(values)
+        width = int(invoices.max(initial=-1)) + 1
+        pairs, inverse = np.unique(line_cells[keep].astype(np.int64) * width + invoices[keep], return_inverse=True)
+        amounts = np.bincount(inverse, weights=values[keep], minlength=len(pairs))
+        sketches['iznos_računa'] = CellSketch.build(pairs // width, buckets.bucket(amounts), None,
+                                                    n_cells, buckets.n_buckets, 'sum')
+        if 'Cijena' in df.columns:
+            values = df['Cijena'].to_numpy(dtype=float)
+            keep = (line_cells >= 0) & ~np.isnan(values)
+            sketches['cijena_stavke'] = CellSketch.build(line_cells[keep], buckets.bucket(values[keep]), None,
+                                                         n_cells, buckets.n_buckets, 'sum')
+        return cls(pd.Timestamp(first_day), n_days, locations, sketches, buckets)
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije sketcheva."""
+        return sum(sketch.nbytes for sketch in self.sketches.values())
+
+    def _cells(self, conditions: Optional[Dict[str, Optional[Iterable]]] = None,
+               start=None, end=None) -> np.ndarray:
+        """Maska ćelija (dani × lokali) za uvjete Godina/Mjesec/Lokal i raspon datuma."""
+        conditions = {dim: values for dim, values in (conditions or {}).items() if values is not None}
+        days = np.ones(self.n_days, dtype=bool)
+        if 'Godina' in conditions:
+            days &= np.isin(self.days.year, list(conditions['Godina']))
+        if 'Mjesec' in conditions:
+            days &= np.isin(self.days.month, list(conditions['Mjesec']))
+        if start is not None:
+            days &= self.days >= pd.Timestamp(start).normalize()
+        if end is not None:
+            days &= self.days <= pd.Timestamp(end).normalize()
+        locations = np.ones(len(self.locations), dtype=bool)
+        if 'Lokal' in conditions:
+            locations &= self.locations.isin(list(conditions['Lokal']))
+        return np.outer(days, locations).ravel()
+
+    def distinct(self, name: str, conditions: Optional[Dict[str, Optional[Iterable]]] = None,
+                 start=None, end=None) -> int:
+        """Približan broj različitih računa ('racuni') ili artikala ('artikli')."""
+        if name not in self.sketches:
+            return 0
+        return int(round(hll_estimate(self.sketches[name].merged(self._cells(conditions, start, end)))))
+
+    def quantiles(self, name: str, qs: Sequence[float] = QUANTILES,
+                  conditions: Optional[Dict[str, Optional[Iterable]]] = None, start=None, end=None) -> pd.Series:
+        """Približni kvantili iznosa računa ('iznos_računa') ili cijene stavke ('cijena_stavke')."""
+        if name not in self.sketches:
+            return pd.Series(np.nan, index=[f'P{q * 100:g}' for q in qs])
+        counts = self.sketches[name].merged(self._cells(conditions, start, end))
+        return pd.Series(self.buckets.quantiles(counts, qs), index=[f'P{q * 100:g}' for q in qs])
+
+    def summary(self, conditions: Optional[Dict[str, Optional[Iterable]]] = None,
+                start=None, end=None) -> Dict:
+        """Približni brojevi računa i artikala te kvantili iznosa računa i cijene stavke."""
+        return {
+            'broj_računa': self.distinct('racuni', conditions, start, end),
+            'broj_artikala': self.distinct('artikli', conditions, start, end),
+            'iznos_računa': self.quantiles('iznos_računa', QUANTILES, conditions, start, end),
+            'cijena_stavke': self.quantiles('cijena_stavke', QUANTILES, conditions, start, end),
+        }
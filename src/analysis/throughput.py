@@ -0,0 +1,274 @@
+"""
+Throughput - Broj računa po vremenskim slotovima (5/15 min), vršna opterećenja i potrebno osoblje
+"""
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .distinct_counts import invoice_codes
+from .time_patterns import DAY_NAMES
+
+By = Union[None, str, List[str]]
+
+
+def slot_label(slot: np.ndarray, minutes: int) -> np.ndarray:
+    """Početak slota kao 'HH:MM'."""
+    start = np.asarray(slot) * minutes
+    return np.char.add(np.char.add(np.char.zfill((start // 60).astype(str), 2), ':'),
+                       np.char.zfill((start % 60).astype(str), 2))
+
+
+class ThroughputAnalytics:
+    """
+    Protok računa po vremenskim slotovima.
+
+    Vremena računa (prva stavka računa u df) se pretvaraju u cjelobrojni dan
+    i slot unutar dana (datetime64 aritmetika), a brojevi računa se jednim
+    bincount-om slažu u gusti niz grupe × dani × slotovi. Profili po danu u tjednu, vršna
+    opterećenja i potrebno osoblje su operacije nad tim nizom.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame sa stavkama računa (npr. filtrirani pogled)
+        """
+        self.df = df
+        self._arrivals: Optional[pd.DataFrame] = None
+        self._grids: Dict[Tuple, Tuple] = {}
+
+    @property
+    def arrivals(self) -> pd.DataFrame:
+        """
+        Prva stavka svakog računa iz df (vrijeme dolaska, lokal, blagajna...).
+
+        Računa se iz stavki pogleda, pa račun ulazi samo sa svojim vremenom
+        (ključ računa je broj računa unutar godine).
+        """
+        if self._arrivals is None:
+            codes = invoice_codes(self.df)
+            rows = np.flatnonzero(codes >= 0)
+            first = np.unique(codes[rows], return_index=True)[1]
+            self._arrivals = self.df.iloc[np.sort(rows[first])]
+        return self._arrivals
+
+    def _grid(self, minutes: int, by: By = None):
+        """
+        Niz broja računa (grupe × dani × slotovi) za širinu slota.
+
+        Returns:
+            (counts, keys, first_day, slots_per_day) - keys je DataFrame vrijednosti grupa
+        """
+        by = [by] if isinstance(by, str) else list(by or [])
+        cache_key = (minutes, tuple(by))
+        if cache_key in self._grids:
+            return self._grids[cache_key]
+
+        if 1440 % minutes != 0:
+            raise ValueError(f"Širina slota mora dijeliti dan (1440 min), zadano: {minutes}")
+        slots_per_day = 1440 // minutes
+
+        arrivals = self.arrivals
+        timestamps = arrivals['Datum i vrijeme'].to_numpy()
+        valid = ~np.isnat(timestamps)
+        if by:
+            grouped = arrivals.groupby(by, observed=True, sort=True)
+            groups = grouped.ngroup().to_numpy()
+            keys = grouped.size().index.to_frame(index=False)
+            valid &= groups >= 0
+        else:
+            groups = np.zeros(len(arrivals), dtype=np.int64)
+            keys = pd.DataFrame(index=range(1))
+
+        timestamps, groups = timestamps[valid], groups[valid]
+        if len(timestamps) == 0:
+            result = (np.zeros((len(keys), 0, slots_per_day), dtype=np.int64), keys, pd.NaT, slots_per_day)
+            self._grids[cache_key] = result
+            return result
+
+        days = timestamps.astype('datetime64[D]')
+        minute_of_day = (timestamps.astype('datetime64[m]') - days).astype(np.int64)
+        first_day = days.min()
+        day_index = (days - first_day).astype(np.int64)
+        n_days = int(day_index.max()) + 1
+
+        bins = (groups * n_days + day_index) * slots_per_day + minute_of_day // minutes
+        counts = np.bincount(bins, minlength=len(keys) * n_days * slots_per_day)
+        result = (counts.reshape(len(keys), n_days, slots_per_day), keys, pd.Timestamp(first_day), slots_per_day)
+        self._grids[cache_key] = result
+        return result
+
+    @staticmethod
+    def _frame(keys: pd.DataFrame, group_index: np.ndarray, columns: Dict) -> pd.DataFrame:
+        result = keys.iloc[group_index].reset_index(drop=True)
+        for name, values in columns.items():
+            result[name] = values
+        return result
+
+    def get_slot_counts(self, minutes: int = 15, by: By = None) -> pd.DataFrame:
+        """
+        Broj računa po slotu (samo slotovi sa računima).
+
+        Args:
+            minutes: Širina slota u minutama (npr. 5 ili 15)
+            by: Grupiranje - None, 'Lokal', 'Blagajna' ili ['Lokal', 'Blagajna']
+
+        Returns:
+            DataFrame sa kolonama grupe, Početak, Računi
+        """
+        counts, keys, first_day, slots_per_day = self._grid(minutes, by)
+        group, day, slot = np.nonzero(counts)
+        start = first_day + pd.to_timedelta(day * 1440 + slot * minutes, unit='m')
+        return self._frame(keys, group, {'Početak': start, 'Računi': counts[group, day, slot]})
+
+    def _weekday_stats(self, counts: np.ndarray, first_day: pd.Timestamp,
+                       percentiles: Sequence[float]) -> Dict[str, np.ndarray]:
+        """Prosjek, percentili i maksimum po danu u tjednu - nizovi grupe × 7 × slotovi (samo radni dani grupe)."""
+        weekday = (np.arange(counts.shape[1]) + first_day.dayofweek) % 7
+        open_days = counts.sum(axis=2) > 0
+        shape = (counts.shape[0], 7, counts.shape[2])
+        stats = {name: np.full(shape, np.nan) for name in ['Prosjek', 'Maks'] + [f'P{p:g}' for p in percentiles]}
+        for day in range(7):
+            selected = counts[:, weekday == day, :].astype(float)
+            worked = open_days[:, weekday == day]
+            has_days = worked.any(axis=1)
+            if not has_days.any():
+                continue
+            selected[~worked] = np.nan
+            selected[~has_days] = 0
+            stats['Prosjek'][:, day] = np.nanmean(selected, axis=1)
+            stats['Maks'][:, day] = np.nanmax(selected, axis=1)
+            for p in percentiles:
+                stats[f'P{p:g}'][:, day] = np.nanpercentile(selected, p, axis=1)
+            for values in stats.values():
+                values[~has_days, day] = np.nan
+        return stats
+
+    def get_weekday_profile(self, minutes: int = 15, by: By = None,
+                            percentiles: Sequence[float] = (50, 90, 95)) -> pd.DataFrame:
+        """
+        Računi po slotu za svaki dan u tjednu - prosjek, percentili i maksimum
+        preko radnih dana (dani bez ijednog računa grupe se ne broje).
+
+        Returns:
+            DataFrame sa kolonama grupe, Dan_u_tjednu_broj, Dan, Slot, Prosjek, P.., Maks
+            (samo slotovi u kojima je bilo računa)
+        """
+        counts, keys, first_day, _ = self._grid(minutes, by)
+        if counts.shape[1] == 0:
+            return pd.DataFrame()
+        stats = self._weekday_stats(counts, first_day, percentiles)
+        group, day, slot = np.nonzero(np.nan_to_num(stats['Maks']) > 0)
+        columns = {'Dan_u_tjednu_broj': day.astype(np.int8), 'Dan': np.array(DAY_NAMES)[day],
+                   'Slot': slot_label(slot, minutes)}
+        columns.update({name: values[group, day, slot] for name, values in stats.items() if name != 'Maks'})
+        columns['Maks'] = stats['Maks'][group, day, slot]
+        return self._frame(keys, group, columns)
+
+    def get_peak_loads(self, minutes: int = 5, window: int = 60, by: By = None) -> pd.DataFrame:
+        """
+        Vršno opterećenje po danu - najveći broj računa u kliznom prozoru.
+
+        Args:
+            minutes: Širina slota u minutama
+            window: Širina kliznog prozora u minutama (višekratnik širine slota)
+            by: Grupiranje (vidi get_slot_counts)
+
+        Returns:
+            DataFrame sa kolonama grupe, Datum, Dan_u_tjednu_broj, Računi, Vršno_opterećenje,
+            Početak_vrška (jedan red po radnom danu grupe)
+        """
+        counts, keys, first_day, slots_per_day = self._grid(minutes, by)
+        width = max(window // minutes, 1)
+        if width > slots_per_day:
+            raise ValueError(f"Prozor ne može biti duži od dana (1440 min), zadano: {window}")
+        cumulative = np.concatenate([np.zeros(counts.shape[:2] + (1,), dtype=np.int64),
+                                     np.cumsum(counts, axis=2)], axis=2)
+        rolling = cumulative[:, :, width:] - cumulative[:, :, :-width]
+
+        group, day = np.nonzero(counts.sum(axis=2) > 0)
+        peak_slot = rolling[group, day].argmax(axis=1)
+        dates = first_day + pd.to_timedelta(day, unit='D')
+        return self._frame(keys, group, {
+            'Datum': dates,
+            'Dan_u_tjednu_broj': dates.dayofweek.to_numpy().astype(np.int8),
+            'Računi': counts[group, day].sum(axis=1),
+            'Vršno_opterećenje': rolling[group, day, peak_slot],
+            'Početak_vrška': slot_label(peak_slot, minutes),
+        })
+
+    def get_peak_percentiles(self, minutes: int = 5, window: int = 60, by: By = None) -> pd.DataFrame:
+        """Percentili dnevnog vršnog opterećenja (P50, P90, maksimum) po danu u tjednu."""
+        peaks = self.get_peak_loads(minutes, window, by)
+        if peaks.empty:
+            return peaks
+        groups = [column for column in peaks.columns if column not in
+                  ('Datum', 'Dan_u_tjednu_broj', 'Računi', 'Vršno_opterećenje', 'Početak_vrška')]
+        result = peaks.groupby(groups + ['Dan_u_tjednu_broj'], observed=True)['Vršno_opterećenje'].agg(
+            P50=lambda s: s.quantile(0.5), P90=lambda s: s.quantile(0.9), Maks='max').reset_index()
+        result.insert(len(groups) + 1, 'Dan', np.array(DAY_NAMES)[result['Dan_u_tjednu_broj'].to_numpy()])
+        return result
+
+    def get_rush_hours(self, minutes: int = 15, by: By = None, threshold: float = 1.5) -> pd.DataFrame:
+        """
+        Špice - uzastopni slotovi u kojima je prosječan broj računa bar threshold puta
+        veći od prosjeka grupe po slotu (preko slotova u kojima se radi).
+
+        Returns:
+            DataFrame sa kolonama grupe, Dan_u_tjednu_broj, Dan, Od, Do, Prosjek (računa po slotu u špici)
+        """
+        counts, keys, first_day, slots_per_day = self._grid(minutes, by)
+        if counts.shape[1] == 0:
+            return pd.DataFrame()
+        mean = np.nan_to_num(self._weekday_stats(counts, first_day, ())['Prosjek'])
+        working = mean > 0
+        baseline = mean.sum(axis=(1, 2)) / np.maximum(working.sum(axis=(1, 2)), 1)
+        rush = mean >= threshold * baseline[:, None, None]
+        rush &= working
+
+        edges = np.diff(np.pad(rush.astype(np.int8), ((0, 0), (0, 0), (1, 1))), axis=2)
+        group, day, start = np.nonzero(edges == 1)
+        end = np.nonzero(edges == -1)[2]
+        load = np.concatenate([np.zeros(mean.shape[:2] + (1,)), np.cumsum(mean, axis=2)], axis=2)
+        average = (load[group, day, end] - load[group, day, start]) / (end - start)
+        return self._frame(keys, group, {
+            'Dan_u_tjednu_broj': day.astype(np.int8),
+            'Dan': np.array(DAY_NAMES)[day],
+            'Od': slot_label(start, minutes),
+            'Do': slot_label(end, minutes),
+            'Prosjek': average,
+        })
+
+    def get_staffing(self, minutes: int = 15, by: By = 'Lokal', service_minutes: float = 3.0,
+                     percentile: float = 90, orders_per_person: float = 1.0) -> pd.DataFrame:
+        """
+        Potrebno osoblje po slotu prema Littleovom zakonu (L = λ · W).
+
+        λ je broj računa u slotu na zadanom percentilu (preko radnih dana istog
+        dana u tjednu) podijeljen širinom slota, W prosječno vrijeme usluge, a L
+        prosječan broj narudžbi u izradi u isto vrijeme.
+
+        Args:
+            minutes: Širina slota u minutama
+            by: Grupiranje (npr. 'Lokal')
+            service_minutes: Prosječno vrijeme usluge po računu (minute)
+            percentile: Percentil opterećenja za planiranje (npr. 90)
+            orders_per_person: Broj narudžbi koje jedna osoba radi istovremeno
+
+        Returns:
+            DataFrame sa kolonama grupe, Dan_u_tjednu_broj, Dan, Slot, Računi_P..,
+            Dolasci_po_min, Istovremeno, Potrebno_osoblje
+        """
+        profile = self.get_weekday_profile(minutes, by, (percentile,))
+        if profile.empty:
+            return profile
+        column = f'P{percentile:g}'
+        arrivals = profile[column] / minutes
+        concurrent = arrivals * service_minutes
+        staffing = profile[[c for c in profile.columns if c not in ('Prosjek', 'Maks', column)]].copy()
+        staffing[f'Računi_{column}'] = profile[column]
+        staffing['Dolasci_po_min'] = arrivals
+        staffing['Istovremeno'] = concurrent
+        staffing['Potrebno_osoblje'] = np.maximum(np.ceil(concurrent / orders_per_person), 1).astype(np.int64)
+        return staffing
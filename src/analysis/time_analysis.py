@@ -6,6 +6,8 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict, List
 
+from .query_engine import query_engine
+
 
 class TimeAnalyzer:
     """Klasa za vremensku analizu prodaje."""
@@ -19,52 +21,40 @@ class TimeAnalyzer:
     
     def analyze_by_month(self) -> pd.DataFrame:
         """Analiza po mjesecima."""
-        monthly = self.df.groupby(['Godina', 'Mjesec', 'Mjesec_naziv']).agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'nunique'
-        }).reset_index()
-        
+        monthly = query_engine(self.df).query(
+            ['Godina', 'Mjesec', 'Mjesec_naziv'],
+            ['kolicina', 'promet', 'broj_racuna', 'broj_artikala', 'prosjecan_racun']
+        )
         monthly.columns = [
-            'Godina', 'Mjesec', 'Mjesec_naziv', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_artikala'
+            'Godina', 'Mjesec', 'Mjesec_naziv',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_artikala', 'Prosječan_račun'
         ]
-        monthly['Prosječan_račun'] = monthly['Promet'] / monthly['Broj_računa']
         
         return monthly.sort_values(['Godina', 'Mjesec'])
     
     def analyze_by_week(self) -> pd.DataFrame:
         """Analiza po tjednima."""
-        weekly = self.df.groupby(['Godina', 'Tjedan']).agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'nunique'
-        }).reset_index()
-        
+        weekly = query_engine(self.df).query(
+            ['Godina', 'Tjedan'],
+            ['kolicina', 'promet', 'broj_racuna', 'broj_artikala', 'prosjecan_racun']
+        )
         weekly.columns = [
-            'Godina', 'Tjedan', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_artikala'
+            'Godina', 'Tjedan',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_artikala', 'Prosječan_račun'
         ]
-        weekly['Prosječan_račun'] = weekly['Promet'] / weekly['Broj_računa']
         
         return weekly.sort_values(['Godina', 'Tjedan'])
     
     def analyze_by_day_of_week(self) -> pd.DataFrame:
         """Analiza po danima u tjednu."""
-        daily = self.df.groupby(['Dan_u_tjednu', 'Dan_u_tjednu_broj']).agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'count'
-        }).reset_index()
-        
+        daily = query_engine(self.df).query(
+            ['Dan_u_tjednu', 'Dan_u_tjednu_broj'],
+            ['kolicina', 'promet', 'broj_racuna', 'broj_stavki', 'prosjecan_racun']
+        )
         daily.columns = [
-            'Dan_u_tjednu', 'Dan_broj', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija'
+            'Dan_u_tjednu', 'Dan_broj',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija', 'Prosječan_račun'
         ]
-        daily['Prosječan_račun'] = daily['Promet'] / daily['Broj_računa']
         
         return daily.sort_values('Dan_broj')
     
@@ -78,45 +68,34 @@ class TimeAnalyzer:
             else:
                 return pd.DataFrame(columns=['Sat', 'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija', 'Prosječan_račun'])
         
-        # Uklanjanje redova gdje je Sat NaN
-        df_valid = self.df[self.df['Sat'].notna()].copy()
-        
-        if len(df_valid) == 0:
+        if not self.df['Sat'].notna().any():
             return pd.DataFrame(columns=['Sat', 'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija', 'Prosječan_račun'])
         
-        hourly = df_valid.groupby('Sat').agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'count'
-        }).reset_index()
-        
+        # Redovi gdje je Sat NaN ne ulaze ni u jednu grupu
+        hourly = query_engine(self.df).query(
+            'Sat', ['kolicina', 'promet', 'broj_racuna', 'broj_stavki', 'prosjecan_racun']
+        )
         hourly.columns = [
-            'Sat', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija'
+            'Sat',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija', 'Prosječan_račun'
         ]
-        hourly['Prosječan_račun'] = hourly['Promet'] / hourly['Broj_računa']
         
         return hourly.sort_values('Sat')
     
     def analyze_by_period(self) -> pd.DataFrame:
         """Analiza po periodu dana (jutro, popodne, večer, noć)."""
-        period = self.df.groupby('Period_dana').agg({
-            'Količina': 'sum',
-            'Ukupno': 'sum',
-            'Fiskalni broj računa': 'nunique',
-            'Artikl': 'count'
-        }).reset_index()
-        
+        period = query_engine(self.df).query(
+            'Period_dana', ['kolicina', 'promet', 'broj_racuna', 'broj_stavki', 'prosjecan_racun']
+        )
         period.columns = [
-            'Period_dana', 
-            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija'
+            'Period_dana',
+            'Ukupna_količina', 'Promet', 'Broj_računa', 'Broj_transakcija', 'Prosječan_račun'
         ]
-        period['Prosječan_račun'] = period['Promet'] / period['Broj_računa']
         
         # Sortiranje po redoslijedu
         period_order = ['Jutro', 'Popodne', 'Večer', 'Noć']
-        period['sort_order'] = period['Period_dana'].apply(
+        # astype(str) - apply na kategoriji bi vratio kategoriju (sortiranje po kodovima)
+        period['sort_order'] = period['Period_dana'].astype(str).apply(
             lambda x: period_order.index(x) if x in period_order else 999
         )
         period = period.sort_values('sort_order').drop('sort_order', axis=1)
@@ -131,11 +110,7 @@ class TimeAnalyzer:
             granularity: 'daily', 'weekly', ili 'monthly'
         """
         if granularity == 'daily':
-            trend = self.df.groupby(self.df['Datum i vrijeme'].dt.date).agg({
-                'Količina': 'sum',
-                'Ukupno': 'sum',
-                'Fiskalni broj računa': 'nunique'
-            }).reset_index()
+            trend = query_engine(self.df).query('Datum_dan', ['kolicina', 'promet', 'broj_racuna'])
             trend.columns = ['Datum', 'Ukupna_količina', 'Promet', 'Broj_računa']
         
         elif granularity == 'weekly':
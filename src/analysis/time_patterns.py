@@ -0,0 +1,145 @@
+"""
+Time Patterns - Gusti nizovi prometa po vremenskim ćelijama (dan u tjednu × sat, mjesec × dan)
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .sales_cube import SalesCube
+
+MEASURES = ['Ukupno', 'Količina', 'Stavke', 'Racuni']
+
+# Broj ćelija kocke po vremenskoj ćeliji - ćelija postoji u rollupu samo ako je > 0
+CELLS = 'Celije'
+
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+BIN_COLUMNS = ['Dan_u_tjednu_broj', 'Sat', 'Mjesec', 'Dan']
+
+
+class TimePatternKernel:
+    """
+    Vremenski obrasci u fiksnim gustim nizovima.
+
+    Jednim bincount-om po mjeri (nad cjelobrojnim indeksom ćelije) puni nizove
+    grupa × 7 × 24 (dan u tjednu × sat) i grupa × 12 × 31 (mjesec × dan).
+    Obrasci po satu i po danu u tjednu su zbrojevi iste mreže. Broj računa je
+    aditivan jer račun pripada jednoj ćeliji datum × sat × lokal.
+
+    Uz dimenziju (npr. Lokal ili Artikl) nizovi imaju po jedan red za svaku
+    vrijednost, pa su heatmape po lokalu/artiklu samo izrezi bez novog prolaza.
+    """
+
+    def __init__(self, week_hour: Dict[str, np.ndarray], month_day: Dict[str, np.ndarray],
+                 keys: Optional[pd.Index] = None, dimension: Optional[str] = None):
+        """
+        Args:
+            week_hour: {mjera: niz grupe × 7 × 24}
+            month_day: {mjera: niz grupe × 12 × 31}
+            keys: Vrijednosti dimenzije (redovi nizova) - None = jedna grupa (ukupno)
+            dimension: Naziv dimenzije
+        """
+        self.week_hour = week_hour
+        self.month_day = month_day
+        self.keys = keys
+        self.dimension = dimension
+
+    @classmethod
+    def from_level(cls, level: pd.DataFrame, dimension: Optional[str] = None,
+                   measures: Sequence[str] = MEASURES) -> 'TimePatternKernel':
+        """
+        Gradi nizove iz nivoa kocke (jedan prolaz po ćelijama).
+
+        Args:
+            level: Nivo kocke sa kalendarskim dimenzijama i satom
+            dimension: Dodatna dimenzija (redovi nizova) ili None
+            measures: Mjere za akumulaciju
+        """
+        measures = [m for m in measures if m in level.columns]
+        valid = level[BIN_COLUMNS].notna().all(axis=1).to_numpy()
+        keys = None
+        groups = np.zeros(len(level), dtype=np.int64)
+        if dimension is not None:
+            values = level[dimension]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                groups, keys = values.cat.codes.to_numpy().astype(np.int64), values.cat.categories
+            else:
+                groups, keys = pd.factorize(values, sort=True)
+            valid = valid & (groups >= 0)
+        n_groups = 1 if keys is None else len(keys)
+
+        rows = level[valid]
+        groups = groups[valid]
+        dow, hour, month, day = (rows[column].to_numpy(dtype=np.int64) for column in BIN_COLUMNS)
+        week_bins = (groups * 7 + dow) * 24 + hour
+        month_bins = (groups * 12 + month - 1) * 31 + day - 1
+
+        week_hour, month_day = {}, {}
+        for measure in list(measures) + [CELLS]:
+            weights = None if measure == CELLS else rows[measure].to_numpy(dtype=float)
+            integer = measure == CELLS or pd.api.types.is_integer_dtype(rows[measure].dtype)
+            for bins, shape, target in ((week_bins, (7, 24), week_hour), (month_bins, (12, 31), month_day)):
+                counts = np.bincount(bins, weights=weights, minlength=n_groups * shape[0] * shape[1])
+                target[measure] = counts.astype(np.int64 if integer else float).reshape(n_groups, *shape)
+        return cls(week_hour, month_day, keys, dimension)
+
+    @classmethod
+    def from_cube(cls, cube: SalesCube, dimension: Optional[str] = None) -> 'TimePatternKernel':
+        """Gradi nizove iz najmanjeg nivoa kocke koji sadrži dimenziju."""
+        level = cube.level_for([dimension] if dimension else [])
+        return cls.from_level(level, dimension)
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije nizova."""
+        return sum(a.nbytes for grid in (self.week_hour, self.month_day) for a in grid.values())
+
+    def _rows(self, grid: Dict[str, np.ndarray], measure: str, value=None) -> np.ndarray:
+        array = grid[measure]
+        if value is None:
+            return array.sum(axis=0)
+        position = self.keys.get_indexer([value])[0] if self.keys is not None else -1
+        if position < 0:
+            return np.zeros_like(array[0])
+        return array[position]
+
+    def grid(self, measure: str = 'Ukupno', value=None) -> np.ndarray:
+        """Niz 7 × 24 (dan u tjednu × sat) za mjeru - ukupno ili za jednu vrijednost dimenzije."""
+        return self._rows(self.week_hour, measure, value)
+
+    def hourly(self, value=None) -> pd.DataFrame:
+        """Mjere po satu (samo sati sa prometom)."""
+        return self._profile(axis=0, name='Sat', value=value)
+
+    def weekly(self, value=None) -> pd.DataFrame:
+        """Mjere po danu u tjednu (samo dani sa prometom)."""
+        profile = self._profile(axis=1, name='Dan_u_tjednu_broj', value=value)
+        names = np.array(DAY_NAMES)[profile['Dan_u_tjednu_broj'].to_numpy()]
+        profile.insert(1, 'Dan_u_tjednu', pd.Categorical(names, categories=sorted(set(names))))
+        return profile
+
+    def _profile(self, axis: int, name: str, value=None) -> pd.DataFrame:
+        present = self._rows(self.week_hour, CELLS, value).sum(axis=axis) > 0
+        result = pd.DataFrame({name: np.flatnonzero(present).astype(np.int8)})
+        for measure in self.week_hour:
+            if measure != CELLS:
+                result[measure] = self._rows(self.week_hour, measure, value).sum(axis=axis)[present]
+        return result
+
+    def heatmap(self, measure: str = 'Ukupno', value=None) -> pd.DataFrame:
+        """Pivot dan u tjednu × sat (samo dani i sati sa prometom, prazne ćelije = 0)."""
+        return self._pivot(self.week_hour, measure, value, 'Dan_u_tjednu_broj', 'Sat', 0)
+
+    def calendar(self, measure: str = 'Ukupno', value=None) -> pd.DataFrame:
+        """Pivot mjesec × dan u mjesecu (samo mjeseci i dani sa prometom, prazne ćelije = 0)."""
+        return self._pivot(self.month_day, measure, value, 'Mjesec', 'Dan', 1)
+
+    def _pivot(self, grid: Dict[str, np.ndarray], measure: str, value, index: str, columns: str,
+               start: int) -> pd.DataFrame:
+        cells = self._rows(grid, CELLS, value) > 0
+        rows, cols = np.flatnonzero(cells.any(axis=1)), np.flatnonzero(cells.any(axis=0))
+        values = self._rows(grid, measure, value)[np.ix_(rows, cols)].astype(float)
+        return pd.DataFrame(values,
+                            index=pd.Index((rows + start).astype(np.int8), name=index),
+                            columns=pd.Index((cols + start).astype(np.int8), name=columns))
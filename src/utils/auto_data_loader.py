@@ -2,54 +2,328 @@
 Auto Data Loader - Automatski učitava i objedinjuje sve račun fajlove
 """
 import pandas as pd
+import numpy as np
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 import re
+import hashlib
+
+from .data_cache import DataCache, file_sha256
+from .excel_stream import iter_excel_chunks
+from .calendar_features import add_calendar_features
+from .ingest_manifest import IngestManifest
+from .compaction import CompactionStats, compact_frame, concat_frames, encode_strings, frame_nbytes
+
+# Verzija obrade - povećati kad se promijeni _process_frame kako bi se cache poništio
+PROCESSING_VERSION = '4'
 
 
 class AutoDataLoader:
     """Automatski učitava sve relevantne Excel fajlove iz data foldera."""
     
-    def __init__(self, data_folder: str = "data"):
+    def __init__(self, data_folder: str = "data", use_cache: bool = True,
+                 cache_dir: Optional[str] = None, workers: int = 1,
+                 streaming: bool = False, chunk_size: int = 50_000,
+                 incremental: bool = True):
+        """
+        Args:
+            data_folder: Folder sa Excel fajlovima
+            use_cache: Koristi perzistentni cache obrađenih fajlova
+            cache_dir: Folder za cache (default: <data_folder>/.cache)
+            workers: Broj procesa za paralelno parsiranje fajlova (1 = sekvencijalno)
+            streaming: Čitaj .xlsx fajlove u dijelovima (manja potrošnja memorije)
+            chunk_size: Broj redova po dijelu u streaming modu
+            incremental: Vodi manifest i parsiraj samo nove ili izmijenjene fajlove
+                (zahtijeva use_cache). Bez manifesta se cache-iraju obrađeni fajlovi.
+        """
         self.data_folder = Path(data_folder)
+        self.workers = max(1, int(workers))
+        self.streaming = streaming
+        self.chunk_size = chunk_size
         self.racuni_df: pd.DataFrame = None
         self.loaded_files: List[str] = []
+        self.dataset_version: Optional[str] = None
+        self.cache: Optional[DataCache] = None
+        self.manifest: Optional[IngestManifest] = None
+        self.compaction = CompactionStats()
+        if use_cache:
+            cache_path = Path(cache_dir) if cache_dir else self.data_folder / '.cache'
+            # Podaci se spremaju jednom - uz manifest kao objedinjeni dataset,
+            # inače kao cache obrađenih fajlova
+            if incremental:
+                self.manifest = IngestManifest(str(cache_path), name='racuni',
+                                               version=PROCESSING_VERSION)
+            else:
+                self.cache = DataCache(str(cache_path), version=PROCESSING_VERSION)
         
-    def load_all_racuni(self) -> pd.DataFrame:
+    def load_all_racuni(self, workers: Optional[int] = None) -> pd.DataFrame:
         """
         Automatski pronalazi i učitava sve fajlove sa računima.
         
+        Uz uključen cache, manifest bilježi što je učitano iz svakog fajla, a objedinjeni
+        dataset se sprema na disk. Parsiraju se samo novi ili izmijenjeni fajlovi i
+        spajaju sa postojećim podacima.
+        
+        Args:
+            workers: Broj procesa za paralelno parsiranje (default: vrijednost iz konstruktora).
+                1 = sekvencijalno učitavanje.
+        
         Returns:
             DataFrame sa svim objedinjenim računima
         """
-        all_dfs = []
+        workers = self.workers if workers is None else max(1, int(workers))
+        self.loaded_files = []
+        self.compaction = CompactionStats()
         
         # Pronađi sve Excel fajlove
         excel_files = list(self.data_folder.glob('*.xlsx')) + list(self.data_folder.glob('*.xls'))
         
-        for file in sorted(excel_files):
-            # Provjeri da li je to račun fajl
-            if self._is_racuni_file(file):
+        # Provjeri da li je to račun fajl
+        racuni_files = [file for file in sorted(excel_files) if self._is_racuni_file(file)]
+        
+        # Inkrementalno učitavanje - nepromijenjeni fajlovi dolaze iz spremljenog dataseta
+        base_df = None
+        files_to_load = racuni_files
+        diff = None
+        if self.manifest is not None:
+            diff = self.manifest.diff(racuni_files)
+            if diff.unchanged:
+                base_df = self.manifest.load_dataset()
+            if base_df is not None:
+                stale = diff.changed + diff.removed
+                if stale:
+                    base_df = base_df[~base_df['_source_file'].isin(stale)].reset_index(drop=True)
+                files_to_load = [file for file in racuni_files if file.name not in diff.unchanged]
+                for name in diff.unchanged:
+                    print(f"📂 {name}: ⚡ nepromijenjen (manifest)")
+        
+        loaded = self._load_files(files_to_load, workers)
+        
+        if self.cache is not None:
+            self.cache.prune()
+        
+        frames = [df for _, df in loaded]
+        if base_df is not None and len(base_df) > 0:
+            frames.insert(0, base_df)
+        
+        if not frames:
+            raise ValueError("Nema pronađenih račun fajlova!")
+        
+        # Kategorije različitih fajlova se ujedinjuju, nekorištene (obrisani fajlovi) se brišu
+        df = compact_frame(concat_frames(frames))
+        if base_df is not None and loaded:
+            df = self._order_by_file(df, racuni_files)
+        self._assign_invoice_ids(df)
+        self.racuni_df = df
+        
+        loaded_names = set(df['_source_file'].unique())
+        self.loaded_files = [file.name for file in racuni_files if file.name in loaded_names]
+        
+        if self.manifest is not None:
+            self._update_manifest(diff, files_to_load, loaded, base_df is None)
+        self.dataset_version = self._dataset_version(
+            [file for file in racuni_files if file.name in loaded_names])
+        
+        print(f"✅ Podaci procesirani")
+        if self.compaction.bytes_before > 0:
+            print(f"🗜️ Kompaktiranje: {self.compaction.describe()}")
+        print(f"💾 Memorija: {frame_nbytes(self.racuni_df) / 1e6:,.1f} MB")
+        print(f"\n✅ UKUPNO: {len(self.racuni_df):,} redova iz {len(self.loaded_files)} fajlova")
+        return self.racuni_df
+    
+    def _load_files(self, files: List[Path], workers: int) -> List[tuple]:
+        """Učitava zadane fajlove (cache, process pool ili sekvencijalno). Vraća [(fajl, df)]."""
+        loaded = []
+        
+        # Fajlovi iz cache-a se ne parsiraju
+        cached = {}
+        to_parse = []
+        for file in files:
+            df = self.cache.get(file) if self.cache is not None else None
+            if df is not None:
+                cached[file] = df
+            else:
+                to_parse.append(file)
+        
+        executor, futures = self._submit_parallel(to_parse, workers)
+        
+        try:
+            # Rezultati se obrađuju redom sortiranih fajlova - deterministički redoslijed
+            for file in files:
                 print(f"📂 Učitavam: {file.name}")
                 
                 try:
-                    df = self._load_racuni_file(file)
+                    if file in cached:
+                        df = cached.pop(file)
+                        print(f"   ⚡ Iz cache-a")
+                    else:
+                        df, stats = self._parse_result(file, futures)
+                        self.compaction = self.compaction + stats
+                        self._store_in_cache(file, df)
+                    
                     if df is not None and len(df) > 0:
-                        df['_source_file'] = file.name
-                        all_dfs.append(df)
-                        self.loaded_files.append(file.name)
+                        loaded.append((file, df))
                         print(f"   ✅ Učitano {len(df):,} redova")
                 except Exception as e:
                     print(f"   ❌ Greška: {str(e)}")
                     continue
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
         
-        if all_dfs:
-            self.racuni_df = pd.concat(all_dfs, ignore_index=True)
-            self._process_data()
-            print(f"\n✅ UKUPNO: {len(self.racuni_df):,} redova iz {len(all_dfs)} fajlova")
-            return self.racuni_df
-        else:
-            raise ValueError("Nema pronađenih račun fajlova!")
+        return loaded
+    
+    @staticmethod
+    def _order_by_file(df: pd.DataFrame, files: List[Path]) -> pd.DataFrame:
+        """Redoslijed redova po sortiranim fajlovima - isti kao kod potpunog učitavanja."""
+        rank = {file.name: i for i, file in enumerate(files)}
+        codes = df['_source_file'].map(rank).to_numpy(dtype=float)
+        order = np.argsort(codes, kind='stable')
+        if (order == np.arange(len(order))).all():
+            return df
+        return df.take(order).reset_index(drop=True)
+    
+    @staticmethod
+    def _assign_invoice_ids(df: pd.DataFrame):
+        """
+        Dodaje kolonu 'Racun_id' - gusti int32 ključ računa (-1 = bez broja).
+        
+        Fiskalni brojevi računa kreću ispočetka svake godine, pa je ključ par
+        (broj računa, godina) - isti broj iz različitih godina su različiti
+        računi. Ključ se dodjeljuje nad cijelim objedinjenim datasetom pa je
+        isti račun iz različitih fajlova isti ključ. Analize broje jedinstvene
+        račune nad ovim ključem umjesto nad stringom.
+        """
+        if 'Fiskalni broj računa' not in df.columns:
+            return
+        numbers, _ = pd.factorize(df['Fiskalni broj računa'])
+        codes = np.full(len(df), -1, dtype=np.int32)
+        valid = numbers >= 0
+        key = numbers[valid].astype(np.int64)
+        if 'Datum i vrijeme' in df.columns:
+            years = df['Datum i vrijeme'].dt.year.fillna(-1).to_numpy(dtype=np.int64)
+            key = key * 65536 + (years[valid] + 1)
+        codes[valid] = pd.factorize(key)[0]
+        df['Racun_id'] = codes
+    
+    def _dataset_version(self, files: List[Path]) -> str:
+        """
+        Verzija dataseta - hash sadržaja učitanih fajlova i verzije obrade.
+
+        Mijenja se samo kad se promijeni neki fajl (ili obrada), pa služi kao
+        ključ za cache rezultata analitike. Hash fajla se uzima iz manifesta ili
+        cache-a kad se fajl nije mijenjao.
+        """
+        digest = hashlib.sha256(PROCESSING_VERSION.encode())
+        for file in sorted(files, key=lambda f: f.name):
+            if self.manifest is not None:
+                sha = self.manifest.fingerprint(file).sha256
+            elif self.cache is not None:
+                sha = self.cache.fingerprint(file).sha256
+            else:
+                sha = file_sha256(file)
+            digest.update(f"{file.name}:{sha}\n".encode())
+        return digest.hexdigest()[:16]
+    
+    def _update_manifest(self, diff, attempted: List[Path], loaded: List[tuple], full_load: bool):
+        """Bilježi učitane fajlove i sprema objedinjeni dataset ako se nešto promijenilo."""
+        loaded_names = {file.name for file, _ in loaded}
+        
+        for name in diff.removed:
+            self.manifest.forget(name)
+        # Fajlovi koji nisu uspješno učitani se pokušavaju ponovo idući put
+        for file in attempted:
+            if file.name not in loaded_names:
+                self.manifest.forget(file.name)
+        for file, df in loaded:
+            self.manifest.record(file, df)
+        
+        if full_load or diff.has_changes or loaded:
+            try:
+                self.manifest.save_dataset(self.racuni_df)
+                self.manifest.save()
+            except OSError as e:
+                print(f"⚠️ Manifest nije spremljen: {str(e)}")
+    
+    def _submit_parallel(self, files: List[Path], workers: int):
+        """Pokreće parsiranje fajlova u process pool-u. Vraća (executor, {fajl: future})."""
+        if workers <= 1 or len(files) <= 1:
+            return None, {}
+        
+        try:
+            executor = ProcessPoolExecutor(max_workers=min(workers, len(files)))
+            futures = {file: executor.submit(_parse_racuni_worker, str(file), self.streaming, self.chunk_size)
+                       for file in files}
+        except (OSError, NotImplementedError) as e:
+            # Okruženje bez podrške za procese - sekvencijalno učitavanje
+            print(f"⚠️ Paralelno učitavanje nije dostupno ({str(e)}), učitavam sekvencijalno")
+            return None, {}
+        
+        return executor, futures
+    
+    def _parse_result(self, file: Path, futures: Dict) -> tuple:
+        """
+        Rezultat parsiranja iz process pool-a, ili sekvencijalno ako fajl nije u pool-u.
+        
+        Ako radni proces padne (npr. nestane memorije), pool je neupotrebljiv -
+        taj i svi preostali fajlovi se parsiraju sekvencijalno.
+        """
+        future = futures.pop(file, None)
+        if future is not None:
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                print(f"   ⚠️ Paralelno učitavanje prekinuto, nastavljam sekvencijalno")
+                futures.clear()
+        return self._parse_file(file)
+    
+    def _parse_file(self, file: Path) -> tuple:
+        """
+        Učitava i procesira pojedinačni fajl (bez cache-a).
+        
+        Returns:
+            (DataFrame ili None, CompactionStats)
+        """
+        stats = CompactionStats()
+        if self.streaming and file.suffix.lower() == '.xlsx':
+            return self._stream_racuni_file(file, stats), stats
+        
+        df = self._load_racuni_file(file)
+        if df is None or len(df) == 0:
+            return df, stats
+        
+        df['_source_file'] = file.name
+        return self._process_frame(df, stats), stats
+    
+    def _stream_racuni_file(self, file: Path, stats: Optional[CompactionStats] = None) -> Optional[pd.DataFrame]:
+        """Čita .xlsx fajl u dijelovima i procesira (i kompaktira) svaki dio zasebno."""
+        with pd.ExcelFile(file) as xls:
+            if len(xls.sheet_names) > 1:
+                sheet = self._probe_data_sheet(xls)
+            else:
+                sheet = xls.sheet_names[0]
+        if sheet is None:
+            return None
+        
+        chunks = []
+        for chunk in iter_excel_chunks(file, sheet, self.chunk_size):
+            chunk['_source_file'] = file.name
+            chunks.append(self._process_frame(chunk, stats))
+        
+        if not chunks:
+            return None
+        return concat_frames(chunks)
+    
+    def _store_in_cache(self, file: Path, df: Optional[pd.DataFrame]):
+        """Sprema obrađeni fajl u cache."""
+        if self.cache is None or df is None or len(df) == 0:
+            return
+        try:
+            self.cache.put(file, df)
+        except OSError as e:
+            print(f"   ⚠️ Cache nije spremljen: {str(e)}")
     
     def _is_racuni_file(self, file: Path) -> bool:
         """Provjerava da li je fajl račun fajl."""
@@ -75,29 +349,13 @@ class AutoDataLoader:
         """Učitava pojedinačni račun fajl."""
         # Provjeri da li ima sheet-ove
         try:
-            xls = pd.ExcelFile(file)
-            df = None
-            
-            if len(xls.sheet_names) > 1:
-                # Pronađi sheet sa podacima - pokušaj različite varijante
-                for sheet in xls.sheet_names:
-                    sheet_lower = sheet.lower()
-                    # Pokušaj učitati svaki sheet i provjeri ima li podataka
-                    if any(keyword in sheet_lower for keyword in ['podaci', 'račun', 'racun', 'stavk']):
-                        temp_df = pd.read_excel(file, sheet_name=sheet)
-                        if len(temp_df) > 0:
-                            df = temp_df
-                            break
-                
-                # Ako nije pronađeno, pokušaj sve sheet-ove dok ne nađemo podatke
-                if df is None or len(df) == 0:
-                    for sheet in xls.sheet_names:
-                        temp_df = pd.read_excel(file, sheet_name=sheet)
-                        if len(temp_df) > 0 and 'Fiskalni broj računa' in temp_df.columns:
-                            df = temp_df
-                            break
-            else:
-                df = pd.read_excel(file)
+            # Jedan handle za cijeli workbook - sheet-ovi se ne otvaraju ponovo
+            with pd.ExcelFile(file) as xls:
+                if len(xls.sheet_names) > 1:
+                    sheet = self._probe_data_sheet(xls)
+                    df = xls.parse(sheet) if sheet is not None else None
+                else:
+                    df = xls.parse(xls.sheet_names[0])
         except Exception as e:
             # Fallback - pokušaj učitati default
             try:
@@ -107,35 +365,66 @@ class AutoDataLoader:
         
         return df
     
+    @staticmethod
+    def _probe_data_sheet(xls: pd.ExcelFile) -> Optional[str]:
+        """
+        Pronalazi sheet sa podacima čitajući samo zaglavlje i prvi red svakog sheet-a.
+        
+        Returns:
+            Naziv sheet-a ili None ako nijedan sheet nema podatke
+        """
+        probes = {}
+        
+        def probe(sheet):
+            if sheet not in probes:
+                probes[sheet] = xls.parse(sheet, nrows=1)
+            return probes[sheet]
+        
+        # Pronađi sheet sa podacima - pokušaj različite varijante
+        for sheet in xls.sheet_names:
+            sheet_lower = sheet.lower()
+            if any(keyword in sheet_lower for keyword in ['podaci', 'račun', 'racun', 'stavk']):
+                if len(probe(sheet)) > 0:
+                    return sheet
+        
+        # Ako nije pronađeno, pokušaj sve sheet-ove dok ne nađemo podatke
+        for sheet in xls.sheet_names:
+            header = probe(sheet)
+            if len(header) > 0 and 'Fiskalni broj računa' in header.columns:
+                return sheet
+        
+        return None
+    
     def _process_data(self):
         """Procesira učitane podatke."""
         if self.racuni_df is None:
             return
         
-        df = self.racuni_df
+        stats = CompactionStats()
+        self.racuni_df = self._process_frame(self.racuni_df, stats)
+        print(f"✅ Podaci procesirani")
+        print(f"🗜️ Kompaktiranje: {stats.describe()}")
+    
+    def _process_frame(self, df: pd.DataFrame, stats: Optional[CompactionStats] = None) -> pd.DataFrame:
+        """
+        Konverzija tipova i dodavanje vremenskih kolona za jedan DataFrame.
+        
+        String kolone se zapisuju kao kategorije, a kalendarske kolone kao mali int tipovi.
         
+        Args:
+            df: Sirovi DataFrame (mijenja se na mjestu)
+            stats: Ako je zadan, dodaje mu se zauzeće memorije prije i poslije kompaktiranja
+        """
         # Konverzija datuma
         date_cols = ['Datum i vrijeme', 'Knjigovodstveni datum']
         for col in date_cols:
             if col in df.columns:
                 df[col] = pd.to_datetime(df[col], errors='coerce')
         
-        # Dodavanje vremenskih kolona
+        # Dodavanje vremenskih kolona (vektorizirano, jednom po danu)
         if 'Datum i vrijeme' in df.columns:
-            df['Godina'] = df['Datum i vrijeme'].dt.year
-            df['Mjesec'] = df['Datum i vrijeme'].dt.month
-            df['Mjesec_naziv'] = df['Datum i vrijeme'].dt.month_name()
-            df['Dan'] = df['Datum i vrijeme'].dt.day
-            df['Dan_u_tjednu'] = df['Datum i vrijeme'].dt.day_name()
-            df['Dan_u_tjednu_broj'] = df['Datum i vrijeme'].dt.dayofweek
-            df['Tjedan'] = df['Datum i vrijeme'].dt.isocalendar().week
-            df['Sat'] = df['Datum i vrijeme'].dt.hour
-            df['Minuta'] = df['Datum i vrijeme'].dt.minute
-            df['Kvartal'] = df['Datum i vrijeme'].dt.quarter
-            df['Datum'] = df['Datum i vrijeme'].dt.date
-            
-            # Period dana
-            df['Period_dana'] = df['Sat'].apply(self._get_period_dana)
+            add_calendar_features(df, 'Datum i vrijeme', include_date=True,
+                                  unknown_period='Nepoznato')
         
         # Konverzija numeričkih kolona
         numeric_cols = ['Količina', 'Cijena', 'Ukupno', 'PDV', 'PNP', 
@@ -144,28 +433,22 @@ class AutoDataLoader:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
         
-        # Čišćenje string kolona
+        if stats is not None:
+            bytes_before = frame_nbytes(df)
+        
+        # Čišćenje string kolona - strip se radi samo nad jedinstvenim vrijednostima
         string_cols = ['Lokal', 'Artikl', 'Prodajna grupa', 'Način plaćanja', 'Izdao']
         for col in string_cols:
             if col in df.columns:
-                df[col] = df[col].astype(str).str.strip()
+                df[col] = encode_strings(df[col])
         
-        self.racuni_df = df
-        print(f"✅ Podaci procesirani")
-    
-    @staticmethod
-    def _get_period_dana(sat: int) -> str:
-        """Određuje period dana na osnovu sata."""
-        if pd.isna(sat):
-            return 'Nepoznato'
-        if 6 <= sat < 12:
-            return 'Jutro'
-        elif 12 <= sat < 18:
-            return 'Popodne'
-        elif 18 <= sat < 22:
-            return 'Večer'
-        else:
-            return 'Noć'
+        compact_frame(df)
+        
+        if stats is not None:
+            stats.bytes_before += bytes_before
+            stats.bytes_after += frame_nbytes(df)
+        
+        return df
     
     def get_summary(self) -> Dict:
         """Vraća sažetak učitanih podataka."""
@@ -181,12 +464,20 @@ class AutoDataLoader:
             'datum_od': df['Datum i vrijeme'].min() if 'Datum i vrijeme' in df.columns else None,
             'datum_do': df['Datum i vrijeme'].max() if 'Datum i vrijeme' in df.columns else None,
             'ukupan_promet': df['Ukupno'].sum() if 'Ukupno' in df.columns else 0,
-            'broj_računa': df['Fiskalni broj računa'].nunique() if 'Fiskalni broj računa' in df.columns else 0,
+            'broj_računa': df.loc[df['Racun_id'] >= 0, 'Racun_id'].nunique() if 'Racun_id' in df.columns else 0,
             'broj_artikala': df['Artikl'].nunique() if 'Artikl' in df.columns else 0,
             'broj_lokala': df['Lokal'].nunique() if 'Lokal' in df.columns else 0,
+            'verzija_dataseta': self.dataset_version,
         }
 
 
+def _parse_racuni_worker(path: str, streaming: bool = False,
+                         chunk_size: int = 50_000) -> tuple:
+    """Parsira jedan račun fajl u zasebnom procesu."""
+    loader = AutoDataLoader(use_cache=False, streaming=streaming, chunk_size=chunk_size)
+    return loader._parse_file(Path(path))
+
+
 # Test
 if __name__ == "__main__":
     loader = AutoDataLoader("data")
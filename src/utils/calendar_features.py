@@ -0,0 +1,109 @@
+"""
+Calendar Features - Vektorizirano izvođenje vremenskih kolona
+"""
+import numpy as np
+import pandas as pd
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+NS_PER_HOUR = 60 * NS_PER_MINUTE
+
+# Period dana po satu (0-23)
+PERIOD_DANA_PO_SATU = np.array(
+    ['Noć'] * 6 + ['Jutro'] * 6 + ['Popodne'] * 6 + ['Večer'] * 4 + ['Noć'] * 2,
+    dtype=object
+)
+
+
+def period_dana(hours: np.ndarray, unknown: str = 'Nepoznato') -> np.ndarray:
+    """
+    Period dana za niz sati (lookup tablica umjesto apply po redu).
+
+    Args:
+        hours: Sati (0-23), NaN za nepoznato
+        unknown: Vrijednost za nepoznati sat
+    """
+    hours = np.asarray(hours, dtype=float)
+    valid = ~np.isnan(hours)
+    result = np.full(len(hours), unknown, dtype=object)
+    result[valid] = PERIOD_DANA_PO_SATU[hours[valid].astype(np.int64)]
+    return result
+
+
+def _int_column(values: np.ndarray, valid: np.ndarray, all_valid: bool) -> np.ndarray:
+    """int32 kao .dt accessor; float64 sa NaN ako postoje nepoznati datumi."""
+    if all_valid:
+        return values.astype(np.int32)
+    out = np.full(len(valid), np.nan)
+    out[valid] = values
+    return out
+
+
+def _object_column(table: np.ndarray, offsets: np.ndarray, valid: np.ndarray,
+                   all_valid: bool, missing=np.nan) -> np.ndarray:
+    if all_valid:
+        return table[offsets]
+    out = np.full(len(valid), missing, dtype=object)
+    out[valid] = table[offsets]
+    return out
+
+
+def add_calendar_features(df: pd.DataFrame, datetime_col: str = 'Datum i vrijeme',
+                          include_date: bool = True,
+                          unknown_period: str = 'Nepoznato') -> pd.DataFrame:
+    """
+    Dodaje vremenske kolone (Godina, Mjesec, Mjesec_naziv, Dan, Dan_u_tjednu,
+    Dan_u_tjednu_broj, Tjedan, Sat, Minuta, Kvartal, Datum, Period_dana).
+
+    Kalendarske vrijednosti se računaju jednom po danu na gustom kalendaru
+    (od prvog do zadnjeg datuma) i prenose na redove indeksiranjem, a sat i
+    minuta se dobivaju cjelobrojnom aritmetikom nad nanosekundama.
+
+    Args:
+        df: DataFrame sa datetime kolonom
+        datetime_col: Naziv datetime kolone
+        include_date: Dodaj i kolonu 'Datum' (datetime.date)
+        unknown_period: Period dana za redove bez datuma
+    """
+    values = df[datetime_col].to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(values)
+    all_valid = bool(valid.all())
+
+    day_ns = values[valid].astype('datetime64[D]')
+    day_int = day_ns.astype(np.int64)
+    ns_of_day = values[valid].astype(np.int64) - day_ns.astype('datetime64[ns]').astype(np.int64)
+
+    if len(day_int) > 0:
+        first_day = day_int.min()
+        offsets = day_int - first_day
+        calendar = pd.DatetimeIndex(
+            np.arange(first_day, first_day + offsets.max() + 1).astype('datetime64[D]')
+        )
+    else:
+        offsets = day_int
+        calendar = pd.DatetimeIndex([], dtype='datetime64[ns]')
+
+    iso_week = calendar.isocalendar().week.to_numpy(dtype=np.int64)
+
+    df['Godina'] = _int_column(calendar.year.to_numpy()[offsets], valid, all_valid)
+    df['Mjesec'] = _int_column(calendar.month.to_numpy()[offsets], valid, all_valid)
+    df['Mjesec_naziv'] = _object_column(calendar.month_name().to_numpy(dtype=object), offsets, valid, all_valid)
+    df['Dan'] = _int_column(calendar.day.to_numpy()[offsets], valid, all_valid)
+    df['Dan_u_tjednu'] = _object_column(calendar.day_name().to_numpy(dtype=object), offsets, valid, all_valid)
+    df['Dan_u_tjednu_broj'] = _int_column(calendar.dayofweek.to_numpy()[offsets], valid, all_valid)
+
+    week = np.zeros(len(valid), dtype=np.uint32)
+    week[valid] = iso_week[offsets]
+    df['Tjedan'] = pd.arrays.IntegerArray(week, ~valid)
+
+    hours = ns_of_day // NS_PER_HOUR
+    df['Sat'] = _int_column(hours, valid, all_valid)
+    df['Minuta'] = _int_column((ns_of_day // NS_PER_MINUTE) % 60, valid, all_valid)
+    df['Kvartal'] = _int_column(calendar.quarter.to_numpy()[offsets], valid, all_valid)
+
+    if include_date:
+        df['Datum'] = _object_column(np.array(calendar.date, dtype=object), offsets, valid,
+                                     all_valid, missing=pd.NaT)
+
+    df['Period_dana'] = period_dana(df['Sat'].to_numpy(dtype=float), unknown=unknown_period)
+
+    return df
@@ -0,0 +1,174 @@
+"""
+Compaction - Kompaktni zapis objedinjenog DataFrame-a (kategorije i mali int tipovi)
+"""
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import infer_dtype
+
+# Kalendarske kolone i najmanji tip koji im odgovara
+CALENDAR_INT_TYPES = {
+    'Godina': np.int16,
+    'Mjesec': np.int8,
+    'Dan': np.int8,
+    'Dan_u_tjednu_broj': np.int8,
+    'Sat': np.int8,
+    'Minuta': np.int8,
+    'Kvartal': np.int8,
+    'Tjedan': 'UInt8',
+}
+
+# String kolone sa malo različitih vrijednosti - uvijek se zapisuju kao kategorije
+CATEGORICAL_COLUMNS = [
+    'Lokal', 'Blagajna', 'Način plaćanja', 'Artikl', 'Prodajna grupa', 'Izdao', 'Kupac',
+    'Mjesec_naziv', 'Dan_u_tjednu', 'Period_dana', '_source_file',
+]
+
+
+@dataclass
+class CompactionStats:
+    """Zauzeće memorije prije i poslije kompaktiranja (u bajtovima)."""
+    bytes_before: int = 0
+    bytes_after: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def __add__(self, other: 'CompactionStats') -> 'CompactionStats':
+        return CompactionStats(self.bytes_before + other.bytes_before,
+                               self.bytes_after + other.bytes_after)
+
+    def describe(self) -> str:
+        ratio = self.bytes_before / self.bytes_after if self.bytes_after else 0
+        return (f"{self.bytes_before / 1e6:,.1f} MB → {self.bytes_after / 1e6:,.1f} MB "
+                f"(ušteđeno {self.saved / 1e6:,.1f} MB, {ratio:.1f}x)")
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Stvarno zauzeće memorije DataFrame-a (uključujući stringove)."""
+    return int(df.memory_usage(deep=True, index=True).sum())
+
+
+def encode_strings(values: pd.Series, strip: bool = True) -> pd.Categorical:
+    """
+    Pretvara kolonu u kategoriju sa sortiranim kategorijama.
+
+    Čišćenje (astype(str) i strip) se radi samo nad jedinstvenim vrijednostima
+    pa je rezultat isti kao `values.astype(str).str.strip()`, samo kodiran.
+
+    Args:
+        values: Kolona sa stringovima
+        strip: Očisti vrijednosti kao astype(str).str.strip()
+    """
+    if strip:
+        codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        cleaned = pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str).str.strip()
+    else:
+        codes, uniques = pd.factorize(values, use_na_sentinel=True)
+        cleaned = pd.Series(np.asarray(uniques, dtype=object), dtype=object)
+
+    # Različite sirove vrijednosti mogu nakon čišćenja biti iste
+    clean_codes, categories = pd.factorize(cleaned, sort=True)
+    clean_codes = np.append(clean_codes, -1)
+    return pd.Categorical.from_codes(clean_codes[codes], categories=categories)
+
+
+def _is_string_column(series: pd.Series) -> bool:
+    if series.dtype != object and not pd.api.types.is_string_dtype(series.dtype):
+        return False
+    return infer_dtype(series, skipna=True) == 'string'
+
+
+def _fits(series: pd.Series, dtype) -> bool:
+    """Da li sve vrijednosti stanu u manji int tip (astype bi ih inače preljevom promijenio)."""
+    dtype = pd.api.types.pandas_dtype(dtype)
+    info = np.iinfo(getattr(dtype, 'numpy_dtype', dtype))
+    low, high = series.min(), series.max()
+    return (pd.isna(low) or low >= info.min) and (pd.isna(high) or high <= info.max)
+
+
+def compact_frame(df: pd.DataFrame, categorical: Optional[Iterable[str]] = None,
+                  max_unique_ratio: Optional[float] = None) -> pd.DataFrame:
+    """
+    Pretvara string kolone sa malo različitih vrijednosti u kategorije, a
+    kalendarske int kolone u najmanji odgovarajući tip. Vrijednosti se ne mijenjaju.
+
+    Args:
+        df: DataFrame (mijenja se na mjestu)
+        categorical: String kolone koje postaju kategorije (default: CATEGORICAL_COLUMNS)
+        max_unique_ratio: Ako je zadan, i ostale string kolone postaju kategorije kad
+            je udio jedinstvenih vrijednosti manji od ovoga. Kod obrade u dijelovima
+            treba ostati None kako bi svi dijelovi imali iste tipove.
+
+    Returns:
+        Isti DataFrame sa kompaktnim tipovima
+    """
+    categorical = set(CATEGORICAL_COLUMNS if categorical is None else categorical)
+    n = len(df)
+
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Nakon filtriranja mogu ostati nekorištene kategorije
+            df[col] = series.cat.remove_unused_categories()
+            continue
+        if col in categorical and n > 0 and series.isna().all():
+            # Prazna kolona u jednom dijelu - ista vrsta kao u ostalim dijelovima
+            df[col] = pd.Categorical(np.full(n, np.nan, dtype=object))
+            continue
+        if not _is_string_column(series):
+            continue
+        if col in categorical or (max_unique_ratio is not None and n > 0
+                                  and series.nunique() <= max_unique_ratio * n):
+            df[col] = encode_strings(series, strip=False)
+
+    for col, dtype in CALENDAR_INT_TYPES.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if (pd.api.types.is_integer_dtype(series.dtype) and series.dtype != dtype
+                and _fits(series, dtype)):
+            df[col] = series.astype(dtype)
+
+    return df
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Spaja DataFrame-ove zadržavajući kategorije.
+
+    pd.concat kategorije sa različitim skupovima vrijednosti pretvara u object,
+    pa se kategorije prvo ujedine (sortirano) i svi dijelovi prekodiraju.
+    """
+    if len(frames) == 1:
+        return frames[0]
+
+    unions = {}
+    for col in frames[0].columns:
+        dtypes = [frame[col].dtype if col in frame.columns else None for frame in frames]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        categories = dtypes[0].categories
+        if all(dtype.categories.equals(categories) for dtype in dtypes):
+            continue
+        # Prazni dijelovi (samo NaN) ne smiju promijeniti tip kategorija
+        parts = [dtype.categories for dtype in dtypes if len(dtype.categories) > 0]
+        categories = parts[0] if parts else categories
+        for part in parts[1:]:
+            categories = categories.union(part)
+        unions[col] = categories
+
+    if unions:
+        frames = [_with_categories(frame, unions) for frame in frames]
+
+    return pd.concat(frames, ignore_index=True)
+
+
+def _with_categories(df: pd.DataFrame, unions: dict) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    for col, categories in unions.items():
+        df[col] = df[col].cat.set_categories(categories)
+    return df
@@ -0,0 +1,220 @@
+"""
+Data Cache - Perzistentni cache obrađenih Excel fajlova (Parquet)
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Otisak izvornog fajla - putanja, veličina, mtime i hash sadržaja."""
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Računa SHA-256 hash sadržaja fajla."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint_file(path: Path, known: Optional[Dict] = None) -> FileFingerprint:
+    """
+    Kreira otisak fajla.
+
+    Args:
+        path: Putanja do fajla
+        known: Prethodno zapisani otisak (dict). Ako se veličina i mtime
+            podudaraju, hash se ne računa ponovo.
+    """
+    path = Path(path)
+    stat = path.stat()
+    if known and known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns:
+        sha = known['sha256']
+    else:
+        sha = file_sha256(path)
+    return FileFingerprint(str(path.resolve()), stat.st_size, stat.st_mtime_ns, sha)
+
+
+def save_frame(df: pd.DataFrame, base_path: Path) -> Optional[Path]:
+    """
+    Sprema DataFrame kao Parquet.
+
+    Bez pyarrow-a ili kad Parquet zapis ne uspije, cache se preskače.
+
+    Args:
+        df: DataFrame za spremanje
+        base_path: Putanja bez ekstenzije
+
+    Returns:
+        Putanja zapisanog fajla ili None ako nije spremljen
+    """
+    if not HAS_PYARROW:
+        print("   ⚠️ pyarrow nije instaliran - cache se ne sprema")
+        return None
+
+    base_path = Path(base_path)
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+    parquet_file = base_path.with_name(base_path.name + '.parquet')
+    tmp_file = base_path.with_name(base_path.name + '.tmp')
+    try:
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, parquet_file)
+        return parquet_file
+    except Exception as e:
+        # Npr. miješani tipovi u object kolonama - Parquet ih ne podržava
+        if tmp_file.exists():
+            tmp_file.unlink()
+        print(f"   ⚠️ Cache nije spremljen ({base_path.name}): {str(e)}")
+        return None
+
+
+def load_frame(path: Path) -> Optional[pd.DataFrame]:
+    """Učitava DataFrame zapisan sa save_frame (samo Parquet; ostalo vraća None)."""
+    path = Path(path)
+    if path.suffix != '.parquet' or not HAS_PYARROW:
+        return None
+    return pd.read_parquet(path)
+
+
+class DataCache:
+    """
+    Cache obrađenih DataFrame-ova po izvornom fajlu.
+
+    Svaki unos je ključan po putanji, veličini, mtime-u i SHA-256 hashu
+    sadržaja. Ako se fajl promijeni, unos se automatski briše i gradi ponovo.
+    Podaci se spremaju kao Parquet (pyarrow); bez njega se ništa ne sprema.
+    """
+
+    INDEX_NAME = 'index.json'
+
+    def __init__(self, cache_dir: str, version: str = '1'):
+        """
+        Args:
+            cache_dir: Folder u koji se sprema cache
+            version: Verzija obrade - promjena verzije poništava sve unose
+        """
+        self.cache_dir = Path(cache_dir)
+        self.version = str(version)
+        self._index: Dict[str, Dict] = self._read_index()
+
+    def _read_index(self) -> Dict[str, Dict]:
+        index_path = self.cache_dir / self.INDEX_NAME
+        if not index_path.exists():
+            return {}
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        index_path = self.cache_dir / self.INDEX_NAME
+        tmp_path = index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, index_path)
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).resolve())
+
+    def fingerprint(self, path: Path) -> FileFingerprint:
+        """Vraća otisak fajla, koristeći zapisani hash kad se fajl nije mijenjao."""
+        return fingerprint_file(path, self._index.get(self._key(path)))
+
+    def get(self, path: Path) -> Optional[pd.DataFrame]:
+        """Vraća obrađeni DataFrame iz cache-a ili None ako unos ne postoji ili je zastario."""
+        key = self._key(path)
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+
+        fp = self.fingerprint(path)
+        if entry.get('version') != self.version or entry.get('sha256') != fp.sha256:
+            self.invalidate(path)
+            return None
+
+        try:
+            df = load_frame(self.cache_dir / entry['file'])
+        except Exception:
+            df = None
+        if df is None:
+            self.invalidate(path)
+            return None
+
+        # Sadržaj isti, ali fajl je "dotaknut" - zapamti novi mtime
+        if entry.get('mtime_ns') != fp.mtime_ns or entry.get('size') != fp.size:
+            entry.update(size=fp.size, mtime_ns=fp.mtime_ns)
+            self._write_index()
+
+        return df
+
+    def put(self, path: Path, df: pd.DataFrame) -> Optional[FileFingerprint]:
+        """Sprema obrađeni DataFrame za zadani izvorni fajl (None ako nije spremljen)."""
+        fp = self.fingerprint(path)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        old_entry = self._index.pop(fp.path, None)
+        cache_file = save_frame(df, self.cache_dir / f"{fp.sha256[:20]}_v{self.version}")
+
+        if old_entry and (cache_file is None or old_entry.get('file') != cache_file.name):
+            self._remove_file(old_entry.get('file'))
+        if cache_file is None:
+            if old_entry:
+                self._write_index()
+            return None
+
+        self._index[fp.path] = {
+            'size': fp.size,
+            'mtime_ns': fp.mtime_ns,
+            'sha256': fp.sha256,
+            'version': self.version,
+            'file': cache_file.name,
+        }
+        self._write_index()
+        return fp
+
+    def invalidate(self, path: Path):
+        """Briše unos za zadani fajl."""
+        entry = self._index.pop(self._key(path), None)
+        if entry is not None:
+            self._remove_file(entry.get('file'))
+            self._write_index()
+
+    def prune(self):
+        """Briše unose za fajlove koji više ne postoje."""
+        missing = [key for key in self._index if not Path(key).exists()]
+        for key in missing:
+            self._remove_file(self._index.pop(key).get('file'))
+        if missing:
+            self._write_index()
+
+    def _remove_file(self, name: Optional[str]):
+        if not name:
+            return
+        # Isti sadržaj može dijeliti cache fajl s drugom putanjom
+        if any(entry.get('file') == name for entry in self._index.values()):
+            return
+        try:
+            (self.cache_dir / name).unlink()
+        except OSError:
+            pass
@@ -5,6 +5,8 @@ import pandas as pd
 from datetime import datetime, timedelta
 from typing import Optional, Tuple, Dict
 
+from .calendar_features import add_calendar_features
+
 
 class DataLoader:
     """Klasa za učitavanje i obradu podataka o računima."""
@@ -138,43 +140,17 @@ class DataLoader:
         # Mapiranje ostalih kolona na standardne nazive
         self._standardize_column_names()
         
-        # Dodavanje kolona za vremensku analizu
-        # Osiguraj da Datum i vrijeme nije samo datum već i vrijeme
-        dt_series = self.df_processed['Datum i vrijeme']
-        
-        self.df_processed['Godina'] = dt_series.dt.year
-        self.df_processed['Mjesec'] = dt_series.dt.month
-        self.df_processed['Mjesec_naziv'] = dt_series.dt.strftime('%B')
-        self.df_processed['Dan'] = dt_series.dt.day
-        self.df_processed['Dan_u_tjednu'] = dt_series.dt.day_name()
-        self.df_processed['Dan_u_tjednu_broj'] = dt_series.dt.dayofweek
-        self.df_processed['Tjedan'] = dt_series.dt.isocalendar().week
-        self.df_processed['Sat'] = dt_series.dt.hour
-        self.df_processed['Minuta'] = dt_series.dt.minute
-        self.df_processed['Kvartal'] = dt_series.dt.quarter
+        # Dodavanje kolona za vremensku analizu (vektorizirano, jednom po danu)
+        add_calendar_features(self.df_processed, 'Datum i vrijeme', include_date=False,
+                              unknown_period='Noć')
         
         # Debug: Provjeri koliko različitih sati ima
         unique_hours = self.df_processed['Sat'].unique()
         print(f"Pronađeno {len(unique_hours)} različitih sati: {sorted(unique_hours)[:10]}...")
         
-        # Dodavanje perioda dana
-        self.df_processed['Period_dana'] = self.df_processed['Sat'].apply(self._get_period_dana)
-        
         print("Podaci su uspješno obrađeni!")
         return self.df_processed
     
-    @staticmethod
-    def _get_period_dana(sat: int) -> str:
-        """Određuje period dana na osnovu sata."""
-        if 6 <= sat < 12:
-            return 'Jutro'
-        elif 12 <= sat < 18:
-            return 'Popodne'
-        elif 18 <= sat < 22:
-            return 'Večer'
-        else:
-            return 'Noć'
-    
     def filter_by_date_range(
         self, 
         start_date: Optional[str] = None, 
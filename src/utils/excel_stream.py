@@ -0,0 +1,89 @@
+"""
+Excel Stream - Čitanje velikih .xlsx fajlova u dijelovima (openpyxl read-only)
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+
+def _header_names(header: tuple) -> List[str]:
+    """Nazivi kolona kao kod pd.read_excel (prazni -> 'Unnamed: i', duplikati -> '.1')."""
+    names = []
+    seen = {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def _rows_to_frame(rows: List[tuple], columns: List[str]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    # Prazne ćelije kao NaN (openpyxl vraća None) - isto kao pd.read_excel,
+    # a potpuno prazna kolona je float64
+    for col in frame.columns[frame.dtypes == object]:
+        values = frame[col]
+        if values.isna().all():
+            frame[col] = np.full(len(frame), np.nan)
+        else:
+            frame[col] = values.where(values.notna(), np.nan)
+    return frame
+
+
+def iter_excel_chunks(file: Path, sheet_name: Optional[str] = None,
+                      chunk_size: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Čita sheet red po red i vraća DataFrame-ove od najviše chunk_size redova.
+
+    Workbook se otvara u read-only modu pa se u memoriji drži samo jedan dio
+    podataka, a ne cijeli sheet.
+
+    Args:
+        file: Putanja do .xlsx fajla
+        sheet_name: Naziv sheet-a (None = prvi sheet)
+        chunk_size: Broj redova po dijelu
+    """
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name is not None else wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        # Prvi neprazni red je zaglavlje
+        header = None
+        for row in rows:
+            if any(value is not None for value in row):
+                header = row
+                break
+        if header is None:
+            return
+
+        # Prazne kolone na kraju zaglavlja se ignoriraju
+        width = len(header)
+        while width > 0 and header[width - 1] is None:
+            width -= 1
+        columns = _header_names(header[:width])
+
+        buffer = []
+        for row in rows:
+            row = row[:width]
+            if all(value is None for value in row):
+                continue
+            if len(row) < width:
+                row = row + (None,) * (width - len(row))
+            buffer.append(row)
+
+            if len(buffer) >= chunk_size:
+                yield _rows_to_frame(buffer, columns)
+                buffer = []
+
+        if buffer:
+            yield _rows_to_frame(buffer, columns)
+    finally:
+        wb.close()
@@ -0,0 +1,112 @@
+"""
+Filter Index - Bitmape redova po vrijednosti za brzo filtriranje dataseta
+"""
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Kolone globalnih filtera dashboarda
+INDEX_COLUMNS = ['Godina', 'Mjesec', 'Lokal', 'Blagajna', 'Način plaćanja', 'Prodajna grupa']
+
+
+def _key(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class FilterIndex:
+    """
+    Indeks filtera - za svaku vrijednost kolone spakirana bitmapa redova (1 bit po redu).
+
+    Odabir se dobiva OR-om bitmapa odabranih vrijednosti unutar kolone i AND-om
+    među kolonama, bez ponovnog skeniranja kolona. Kad odabrani redovi čine
+    kontinuirani raspon (npr. jedna godina u datasetu sortiranom po vremenu),
+    pogled je iloc isječak bez kopiranja podataka.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[List[str]] = None):
+        """
+        Args:
+            df: DataFrame koji se indeksira (ne smije se mijenjati nakon izgradnje)
+            columns: Kolone za indeks (default: INDEX_COLUMNS koje postoje u df)
+        """
+        columns = INDEX_COLUMNS if columns is None else columns
+        self.n_rows = len(df)
+        self.bitmaps: Dict[str, Dict] = {}
+        for column in columns:
+            if column in df.columns:
+                self.bitmaps[column] = self._build(df[column])
+
+    def _build(self, series: pd.Series) -> Dict:
+        codes, uniques = pd.factorize(series)
+        # Redovi grupirani po kodu - svaka bitmapa se puni samo svojim redovima
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        bitmaps = {}
+        for code, value in enumerate(uniques):
+            rows = np.zeros(self.n_rows, dtype=bool)
+            rows[order[bounds[code]:bounds[code + 1]]] = True
+            bitmaps[_key(value)] = np.packbits(rows)
+        return bitmaps
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije indeksa."""
+        return sum(bits.nbytes for bitmaps in self.bitmaps.values() for bits in bitmaps.values())
+
+    def covers(self, conditions: Dict[str, Optional[Iterable]]) -> bool:
+        """Da li su sve filtrirane kolone u indeksu."""
+        return all(column in self.bitmaps for column, values in conditions.items() if values is not None)
+
+    def bits(self, conditions: Dict[str, Optional[Iterable]]) -> Optional[np.ndarray]:
+        """
+        Spakirana bitmapa redova koji zadovoljavaju uvjete.
+
+        Args:
+            conditions: {kolona: dozvoljene vrijednosti}; None = bez filtera (kao isin,
+                prazna lista ne propušta ništa)
+
+        Returns:
+            Spakirana bitmapa (np.packbits) ili None ako nijedan uvjet ne filtrira
+        """
+        result = None
+        for column, values in conditions.items():
+            if values is None:
+                continue
+            bitmaps = self.bitmaps[column]
+            column_bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            for value in set(_key(v) for v in values):
+                if value in bitmaps:
+                    column_bits |= bitmaps[value]
+            result = column_bits if result is None else result & column_bits
+        return result
+
+    def mask(self, conditions: Dict[str, Optional[Iterable]]) -> Optional[np.ndarray]:
+        """Bool maska redova (None ako nijedan uvjet ne filtrira)."""
+        bits = self.bits(conditions)
+        if bits is None:
+            return None
+        return np.unpackbits(bits, count=self.n_rows).view(bool)
+
+    def select(self, df: pd.DataFrame, conditions: Dict[str, Optional[Iterable]]) -> pd.DataFrame:
+        """
+        Filtrirani pogled na indeksirani DataFrame.
+
+        Vraća df ako su odabrani svi redovi, iloc isječak ako su odabrani redovi
+        kontinuirani, a inače kopiju samo odabranih redova.
+        """
+        mask = self.mask(conditions)
+        if mask is None:
+            return df
+        rows = np.flatnonzero(mask)
+        if len(rows) == self.n_rows:
+            return df
+        if len(rows) > 0 and rows[-1] - rows[0] + 1 == len(rows):
+            return df.iloc[rows[0]:rows[-1] + 1]
+        return df.take(rows)
+
+    def values(self, column: str, conditions: Optional[Dict[str, Optional[Iterable]]] = None) -> list:
+        """Vrijednosti kolone (redoslijedom pojavljivanja) koje imaju bar jedan red uz uvjete."""
+        bits = self.bits(conditions or {})
+        return [value for value, value_bits in self.bitmaps[column].items()
+                if bits is None or (value_bits & bits).any()]
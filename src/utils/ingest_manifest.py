@@ -0,0 +1,190 @@
+"""
+Ingest Manifest - Evidencija učitanih fajlova za inkrementalno učitavanje
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .data_cache import FileFingerprint, fingerprint_file, save_frame, load_frame
+
+
+@dataclass
+class ManifestDiff:
+    """Razlika između fajlova u folderu i onoga što je zapisano u manifestu."""
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.new or self.changed or self.removed)
+
+
+class IngestManifest:
+    """
+    Manifest učitanih fajlova.
+
+    Za svaki fajl bilježi otisak (veličina, mtime, SHA-256), broj redova,
+    datumski raspon, promet i broj računa. Uz manifest se može spremiti
+    objedinjeni dataset ili obrađeni DataFrame pojedinog fajla, pa se
+    nepromijenjeni fajlovi nikad ne parsiraju ponovo.
+    """
+
+    def __init__(self, manifest_dir: str, name: str = 'manifest', version: str = '1'):
+        """
+        Args:
+            manifest_dir: Folder u koji se spremaju manifest i podaci
+            name: Naziv manifesta (omogućava više manifesta u istom folderu)
+            version: Verzija obrade - promjena verzije poništava manifest
+        """
+        self.manifest_dir = Path(manifest_dir)
+        self.name = name
+        self.version = str(version)
+        self.path = self.manifest_dir / f"{name}.json"
+        self.files: Dict[str, Dict] = {}
+        self.dataset_file: Optional[str] = None
+        self._read()
+
+    def _read(self):
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.version:
+            return
+        self.files = data.get('files', {})
+        self.dataset_file = data.get('dataset')
+
+    def save(self):
+        """Zapisuje manifest na disk."""
+        self.manifest_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.version,
+                'dataset': self.dataset_file,
+                'files': self.files,
+            }, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+
+    def fingerprint(self, file: Path) -> FileFingerprint:
+        """Otisak fajla - hash se računa samo ako su se veličina ili mtime promijenili."""
+        return fingerprint_file(file, self.files.get(Path(file).name))
+
+    def is_current(self, file: Path) -> bool:
+        """Da li je fajl zapisan u manifestu i nepromijenjen od zadnjeg učitavanja."""
+        entry = self.files.get(Path(file).name)
+        return entry is not None and entry.get('sha256') == self.fingerprint(file).sha256
+
+    def diff(self, files: List[Path]) -> ManifestDiff:
+        """Uspoređuje fajlove sa manifestom."""
+        result = ManifestDiff()
+        names = set()
+
+        for file in sorted(files):
+            file = Path(file)
+            names.add(file.name)
+            if file.name not in self.files:
+                result.new.append(file.name)
+            elif not self.is_current(file):
+                result.changed.append(file.name)
+            else:
+                result.unchanged.append(file.name)
+
+        result.removed = sorted(name for name in self.files if name not in names)
+        return result
+
+    def record(self, file: Path, df: pd.DataFrame, fp: Optional[FileFingerprint] = None):
+        """Bilježi što je učitano iz fajla."""
+        file = Path(file)
+        fp = fp or self.fingerprint(file)
+
+        entry = self.files.get(file.name, {})
+        entry.update({
+            'size': fp.size,
+            'mtime_ns': fp.mtime_ns,
+            'sha256': fp.sha256,
+            'redova': int(len(df)),
+            'kolona': int(len(df.columns)),
+            'datum_od': None,
+            'datum_do': None,
+            'ukupan_promet': float(df['Ukupno'].sum()) if 'Ukupno' in df.columns else 0.0,
+            'broj_računa': int(df['Fiskalni broj računa'].nunique()) if 'Fiskalni broj računa' in df.columns else 0,
+            'učitano': datetime.now().isoformat(timespec='seconds'),
+        })
+        if 'Datum i vrijeme' in df.columns and df['Datum i vrijeme'].notna().any():
+            entry['datum_od'] = df['Datum i vrijeme'].min().isoformat()
+            entry['datum_do'] = df['Datum i vrijeme'].max().isoformat()
+        self.files[file.name] = entry
+
+    def forget(self, name: str):
+        """Briše fajl iz manifesta (i njegov spremljeni DataFrame)."""
+        entry = self.files.pop(name, None)
+        if entry and entry.get('frame'):
+            self._remove(entry['frame'])
+
+    def file_info(self, name: str) -> Dict:
+        """Zapisane informacije o fajlu (datumi kao Timestamp)."""
+        entry = dict(self.files[name])
+        for key in ('datum_od', 'datum_do'):
+            entry[key] = pd.Timestamp(entry[key]) if entry.get(key) else pd.NaT
+        return entry
+
+    # --- Objedinjeni dataset ---
+
+    def load_dataset(self) -> Optional[pd.DataFrame]:
+        """Učitava spremljeni objedinjeni dataset (None ako ne postoji)."""
+        if not self.dataset_file:
+            return None
+        try:
+            df = load_frame(self.manifest_dir / self.dataset_file)
+        except Exception:
+            df = None
+        if df is None:
+            self.dataset_file = None
+        return df
+
+    def save_dataset(self, df: pd.DataFrame):
+        """Sprema objedinjeni dataset."""
+        old_file = self.dataset_file
+        path = save_frame(df, self.manifest_dir / f"{self.name}_dataset_v{self.version}")
+        self.dataset_file = path.name if path is not None else None
+        if old_file and old_file != self.dataset_file:
+            self._remove(old_file)
+
+    # --- Obrađeni DataFrame po fajlu ---
+
+    def load_file_frame(self, name: str) -> Optional[pd.DataFrame]:
+        """Učitava spremljeni obrađeni DataFrame fajla (None ako ne postoji)."""
+        frame = self.files.get(name, {}).get('frame')
+        if not frame:
+            return None
+        try:
+            return load_frame(self.manifest_dir / frame)
+        except Exception:
+            return None
+
+    def save_file_frame(self, name: str, df: pd.DataFrame):
+        """Sprema obrađeni DataFrame fajla."""
+        entry = self.files.setdefault(name, {})
+        sha = entry.get('sha256', 'x')[:20]
+        old_frame = entry.get('frame')
+        path = save_frame(df, self.manifest_dir / f"{self.name}_{sha}_v{self.version}")
+        entry['frame'] = path.name if path is not None else None
+        if old_frame and old_frame != entry['frame']:
+            self._remove(old_frame)
+
+    def _remove(self, file_name: str):
+        try:
+            (self.manifest_dir / file_name).unlink()
+        except OSError:
+            pass
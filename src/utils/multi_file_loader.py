@@ -6,22 +6,34 @@ from pathlib import Path
 from typing import List, Dict, Optional
 import glob
 from .data_loader import DataLoader
+from .ingest_manifest import IngestManifest
+
+# Verzija obrade - povećati kad se promijeni DataLoader.process_data kako bi se manifest poništio
+PROCESSING_VERSION = '1'
 
 
 class MultiFileLoader:
     """Klasa za učitavanje i objedinjeavanje podataka iz više Excel fajlova."""
     
-    def __init__(self, data_folder: str = "data"):
+    def __init__(self, data_folder: str = "data", use_cache: bool = True,
+                 cache_dir: Optional[str] = None):
         """
         Inicijalizacija MultiFileLoader-a.
         
         Args:
             data_folder: Putanja do foldera sa Excel fajlovima
+            use_cache: Vodi manifest i spremaj obrađene fajlove - nepromijenjeni
+                fajlovi se ne parsiraju ponovo
+            cache_dir: Folder za cache (default: <data_folder>/.cache)
         """
         self.data_folder = Path(data_folder)
         self.loaded_files: Dict[str, pd.DataFrame] = {}
         self.combined_df: Optional[pd.DataFrame] = None
         self.file_info: List[Dict] = []
+        self.manifest: Optional[IngestManifest] = None
+        if use_cache:
+            cache_path = Path(cache_dir) if cache_dir else self.data_folder / '.cache'
+            self.manifest = IngestManifest(str(cache_path), name='multi', version=PROCESSING_VERSION)
         
     def discover_excel_files(self) -> List[Path]:
         """Pronalazi sve Excel fajlove u data folderu."""
@@ -51,9 +63,38 @@ class MultiFileLoader:
         
         self.loaded_files = {}
         self.file_info = []
+        manifest_changed = False
+        
+        # Fajlovi obrisani iz data foldera se brišu iz manifesta (i njihovi spremljeni podaci)
+        if self.manifest is not None and file_paths is None:
+            for name in self.manifest.diff(files).removed:
+                self.manifest.forget(name)
+                manifest_changed = True
         
         for file_path in files:
             try:
+                # Nepromijenjeni fajl - obrađeni podaci i info dolaze iz manifesta
+                df = None
+                if self.manifest is not None and self.manifest.is_current(file_path):
+                    df = self.manifest.load_file_frame(file_path.name)
+                
+                if df is not None:
+                    print(f"Učitavam: {file_path.name} (⚡ nepromijenjen, iz manifesta)")
+                    
+                    entry = self.manifest.file_info(file_path.name)
+                    self.loaded_files[file_path.name] = df
+                    self.file_info.append({
+                        'naziv': file_path.name,
+                        'putanja': str(file_path),
+                        'redova': entry['redova'],
+                        'kolona': entry['kolona'],
+                        'datum_od': entry['datum_od'],
+                        'datum_do': entry['datum_do'],
+                        'ukupan_promet': entry['ukupan_promet'],
+                        'broj_računa': entry['broj_računa']
+                    })
+                    continue
+                
                 print(f"Učitavam: {file_path.name}")
                 
                 # Koristi postojeći DataLoader za konzistentnost
@@ -77,12 +118,23 @@ class MultiFileLoader:
                     'broj_računa': df['Fiskalni broj računa'].nunique() if 'Fiskalni broj računa' in df.columns else 0
                 })
                 
+                if self.manifest is not None:
+                    self.manifest.record(file_path, df)
+                    self.manifest.save_file_frame(file_path.name, df)
+                    manifest_changed = True
+                
                 print(f"  ✓ Učitano {len(df)} redova")
                 
             except Exception as e:
                 print(f"  ✗ Greška pri učitavanju {file_path.name}: {str(e)}")
                 continue
         
+        if manifest_changed:
+            try:
+                self.manifest.save()
+            except OSError as e:
+                print(f"  ⚠️ Manifest nije spremljen: {str(e)}")
+        
         return self.loaded_files
     
     def load_uploaded_files(self, uploaded_files: List) -> Dict[str, pd.DataFrame]:
@@ -0,0 +1,95 @@
+"""
+Shared Dataset - Zajednički read-only dataset za sve sesije dashboarda
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from .filter_index import FilterIndex
+
+
+@dataclass(frozen=True)
+class SharedDataset:
+    """
+    Objedinjeni dataset koji dijele sve sesije (bez kopiranja po rerunu).
+
+    Drži se jedan po procesu (npr. u st.cache_resource). Frame se ne smije
+    mijenjati - sesije rade samo nad filtriranim pogledima iz select(). Uz
+    pandas Copy-on-Write (default od pandas 3) izmjena u sesiji ionako ne
+    mijenja zajednički frame.
+    """
+    df: pd.DataFrame
+    summary: Mapping[str, Any] = field(default_factory=dict)
+    version: Optional[str] = None
+    derived: Mapping[str, Any] = field(default_factory=dict)
+    index: Optional[FilterIndex] = None
+
+    def __post_init__(self):
+        object.__setattr__(self, 'summary', MappingProxyType(dict(self.summary)))
+        object.__setattr__(self, 'derived', MappingProxyType(dict(self.derived)))
+
+    @classmethod
+    def from_loader(cls, loader, **derived) -> 'SharedDataset':
+        """
+        Kreira dataset iz AutoDataLoader-a nakon load_all_racuni() (sa indeksom filtera).
+
+        Args:
+            loader: AutoDataLoader sa učitanim podacima
+            **derived: Strukture izvedene iz frame-a (npr. invoices=..., cube=...)
+        """
+        df = loader.racuni_df
+        return cls(df, loader.get_summary(), loader.dataset_version, derived, FilterIndex(df))
+
+    def __len__(self) -> int:
+        return len(self.df)
+
+    @property
+    def nbytes(self) -> int:
+        """Zauzeće memorije frame-a."""
+        return int(self.df.memory_usage(deep=True).sum())
+
+    def mask(self, conditions: Dict[str, Optional[Iterable]]) -> Optional[np.ndarray]:
+        """
+        Maska redova za uvjete {kolona: dozvoljene vrijednosti} (None = bez filtera).
+
+        Returns:
+            Bool niz ili None ako nijedan uvjet ne filtrira
+        """
+        if self.index is not None and self.index.covers(conditions):
+            return self.index.mask(conditions)
+
+        mask = None
+        for column, values in conditions.items():
+            if values is None:
+                continue
+            column_mask = self.df[column].isin(list(values)).to_numpy()
+            mask = column_mask if mask is None else mask & column_mask
+        return mask
+
+    def select(self, conditions: Dict[str, Optional[Iterable]]) -> pd.DataFrame:
+        """
+        Filtrirani pogled za sesiju - jedna kopija za sve uvjete zajedno.
+
+        Ako uvjeti propuštaju sve redove vraća se zajednički frame (bez kopije), a
+        uz indeks i kontinuirani odabir redova isječak bez kopiranja.
+        """
+        if self.index is not None and self.index.covers(conditions):
+            return self.index.select(self.df, conditions)
+
+        mask = self.mask(conditions)
+        if mask is None or mask.all():
+            return self.df
+        return self.df[mask]
+
+    def unique(self, column: str, conditions: Optional[Dict[str, Optional[Iterable]]] = None) -> np.ndarray:
+        """Jedinstvene vrijednosti kolone među redovima koji zadovoljavaju uvjete."""
+        conditions = conditions or {}
+        if self.index is not None and column in self.index.bitmaps and self.index.covers(conditions):
+            return np.array(self.index.values(column, conditions), dtype=object)
+
+        mask = self.mask(conditions)
+        values = self.df[column] if mask is None else self.df.loc[mask, column]
+        return values.dropna().unique()
@@ -0,0 +1,87 @@
+"""
+Testovi kalendarskih kolona - isto kao izvođenje preko .dt accessora i _get_period_dana
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.calendar_features import add_calendar_features
+
+COLUMNS = ['Godina', 'Mjesec', 'Mjesec_naziv', 'Dan', 'Dan_u_tjednu', 'Dan_u_tjednu_broj',
+           'Tjedan', 'Sat', 'Minuta', 'Kvartal', 'Datum', 'Period_dana']
+
+
+def legacy_period(sat, unknown):
+    """Nekadašnji AutoDataLoader._get_period_dana (DataLoader je NaN davao kao 'Noć')."""
+    if pd.isna(sat):
+        return unknown
+    if 6 <= sat < 12:
+        return 'Jutro'
+    elif 12 <= sat < 18:
+        return 'Popodne'
+    elif 18 <= sat < 22:
+        return 'Večer'
+    return 'Noć'
+
+
+def legacy(df: pd.DataFrame, unknown: str) -> pd.DataFrame:
+    dt = df['Datum i vrijeme'].dt
+    result = pd.DataFrame({
+        'Godina': dt.year, 'Mjesec': dt.month, 'Mjesec_naziv': dt.month_name(), 'Dan': dt.day,
+        'Dan_u_tjednu': dt.day_name(), 'Dan_u_tjednu_broj': dt.dayofweek,
+        'Tjedan': dt.isocalendar().week, 'Sat': dt.hour, 'Minuta': dt.minute,
+        'Kvartal': dt.quarter, 'Datum': dt.date,
+    })
+    result['Period_dana'] = result['Sat'].apply(legacy_period, unknown=unknown)
+    return result
+
+
+def timestamps(with_nat: bool) -> pd.Series:
+    rng = np.random.default_rng(11)
+    # Prijelazi godina (ISO tjedan 53/1), prijestupni dan i sve sate dana
+    start = pd.Timestamp('2019-12-25').value
+    end = pd.Timestamp('2026-01-05').value
+    values = pd.to_datetime(np.sort(rng.integers(start, end, 5000)))
+    values = values.append(pd.DatetimeIndex(['2020-02-29 23:59:59', '2020-12-31 00:00', '2021-01-03 21:59']))
+    series = pd.Series(values, name='Datum i vrijeme')
+    if with_nat:
+        series[rng.random(len(series)) < 0.03] = pd.NaT
+    return series
+
+
+@pytest.mark.parametrize('with_nat', [False, True])
+def test_matches_dt_accessors(with_nat):
+    df = timestamps(with_nat).to_frame()
+    actual = add_calendar_features(df.copy())
+    expected = legacy(df, 'Nepoznato')
+    for column in COLUMNS:
+        pd.testing.assert_series_equal(actual[column], expected[column], check_dtype=False,
+                                       check_names=False, obj=column)
+    # Brojčane kolone: int32 kao .dt, a float64 sa NaN kad postoje nepoznati datumi
+    for column in ['Godina', 'Mjesec', 'Dan', 'Dan_u_tjednu_broj', 'Sat', 'Minuta', 'Kvartal']:
+        assert actual[column].dtype == (np.float64 if with_nat else np.int32)
+    assert actual['Tjedan'].dtype == expected['Tjedan'].dtype
+
+
+def test_unknown_period_argument():
+    df = timestamps(with_nat=True).to_frame()
+    missing = df['Datum i vrijeme'].isna()
+    assert missing.any()
+
+    nepoznato = add_calendar_features(df.copy())
+    assert (nepoznato.loc[missing, 'Period_dana'] == 'Nepoznato').all()
+    # DataLoader: nepoznati sat je 'Noć' (else grana stare funkcije)
+    noc = add_calendar_features(df.copy(), unknown_period='Noć')
+    assert (noc.loc[missing, 'Period_dana'] == 'Noć').all()
+    assert (noc.loc[~missing, 'Period_dana'] == nepoznato.loc[~missing, 'Period_dana']).all()
+
+
+def test_all_missing_and_empty():
+    df = pd.DataFrame({'Datum i vrijeme': pd.to_datetime(pd.Series([pd.NaT, pd.NaT]))})
+    result = add_calendar_features(df, include_date=False)
+    assert 'Datum' not in result.columns
+    assert result['Godina'].isna().all() and result['Tjedan'].isna().all()
+    assert (result['Period_dana'] == 'Nepoznato').all()
+
+    empty = add_calendar_features(pd.DataFrame({'Datum i vrijeme': pd.to_datetime(pd.Series([], dtype='datetime64[ns]'))}))
+    assert len(empty) == 0 and set(COLUMNS) <= set(empty.columns)
@@ -0,0 +1,101 @@
+"""
+Testovi kompaktiranja - kategorije kroz dijelove i fajlove, mali int tipovi
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_raw_lines, process_lines
+from src.utils.compaction import compact_frame, concat_frames, encode_strings
+
+
+def plain(df: pd.DataFrame) -> pd.DataFrame:
+    """Vrijednosti bez tipova (kategorije kao object)."""
+    return df.astype({col: object for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+
+
+def test_encode_strings_matches_astype_strip():
+    values = pd.Series([' Kava', 'Kava ', 'Hrana', None, 'Pića', 'Hrana'], dtype=object)
+    encoded = encode_strings(values)
+    assert list(encoded.categories) == sorted(set(encoded.categories))
+    assert list(encoded.astype(object)) == values.astype(str).str.strip().tolist()
+
+    kept = encode_strings(values, strip=False)
+    assert pd.isna(kept[3]) and list(kept.categories) == sorted(values.dropna().unique())
+
+
+def test_concat_unions_chunk_categories():
+    chunks = [
+        compact_frame(pd.DataFrame({'Lokal': ['B', 'A'], 'Artikl': ['x', 'y'], 'Ukupno': [1.0, 2.0]})),
+        compact_frame(pd.DataFrame({'Lokal': ['C', 'A'], 'Artikl': ['x', 'y'], 'Ukupno': [3.0, 4.0]})),
+        # Dio bez ijedne vrijednosti u koloni
+        compact_frame(pd.DataFrame({'Lokal': [None, None], 'Artikl': ['z', 'x'], 'Ukupno': [5.0, 6.0]})),
+    ]
+    combined = concat_frames(chunks)
+    assert isinstance(combined['Lokal'].dtype, pd.CategoricalDtype)
+    assert list(combined['Lokal'].cat.categories) == ['A', 'B', 'C']
+    assert list(combined['Artikl'].cat.categories) == ['x', 'y', 'z']
+    expected = pd.concat([plain(chunk) for chunk in chunks], ignore_index=True)
+    pd.testing.assert_frame_equal(plain(combined), expected)
+    assert concat_frames(chunks[:1]) is chunks[0]
+
+
+def test_concat_unions_file_categories():
+    first = make_raw_lines(years=(2024,), invoices_per_year=100, seed=1)
+    second = make_raw_lines(years=(2025,), invoices_per_year=100, seed=2)
+    # Artikli i lokali koji postoje samo u jednom fajlu
+    first = first[first['Artikl'] != 'LEMONADE']
+    second = second.assign(Lokal=second['Lokal'].replace('Quahwa Centar', 'Quahwa Novi'))
+
+    combined = concat_frames([process_lines(first, 'a.xlsx'), process_lines(second, 'b.xlsx')])
+    whole = process_lines(pd.concat([first, second], ignore_index=True))
+    for col in ['Lokal', 'Artikl', 'Prodajna grupa', 'Blagajna', 'Izdao']:
+        assert isinstance(combined[col].dtype, pd.CategoricalDtype)
+        assert list(combined[col].cat.categories) == sorted(whole[col].cat.categories)
+        assert combined[col].astype(object).tolist() == whole[col].astype(object).tolist()
+    assert list(combined['_source_file'].cat.categories) == ['a.xlsx', 'b.xlsx']
+
+
+def test_compact_frame_keeps_values():
+    df = pd.DataFrame({
+        'Lokal': ['A', 'B', 'A', 'A'],
+        'Napomena': ['x', 'x', 'x', 'y'],
+        'Artikl': pd.Categorical(['p', 'q', 'p', 'p'], categories=['p', 'q', 'r']),
+        'Kupac': [np.nan] * 4,
+        'Ukupno': [1.0, 2.0, 3.0, 4.0],
+    })
+    before = df.copy()
+    compact_frame(df)
+    assert isinstance(df['Lokal'].dtype, pd.CategoricalDtype)
+    assert df['Napomena'].dtype == before['Napomena'].dtype   # nije u CATEGORICAL_COLUMNS
+    assert list(df['Artikl'].cat.categories) == ['p', 'q']     # nekorištene kategorije se brišu
+    assert isinstance(df['Kupac'].dtype, pd.CategoricalDtype) and df['Kupac'].isna().all()
+    pd.testing.assert_frame_equal(plain(df), plain(before), check_dtype=False)
+
+    ratio = compact_frame(before.copy(), max_unique_ratio=0.5)
+    assert isinstance(ratio['Napomena'].dtype, pd.CategoricalDtype)
+
+
+@pytest.mark.parametrize('column, dtype, values', [
+    ('Godina', np.int16, [1, 2024, 32767]),
+    ('Mjesec', np.int8, [1, 12, 127]),
+    ('Sat', np.int8, [-128, 0, 23]),
+    ('Minuta', np.int8, [0, 59]),
+    ('Tjedan', 'UInt8', [1, 53, 255]),
+])
+def test_calendar_ints_downcast_at_bounds(column, dtype, values):
+    df = compact_frame(pd.DataFrame({column: np.array(values, dtype=np.int64)}))
+    assert df[column].dtype == pd.api.types.pandas_dtype(dtype)
+    assert df[column].tolist() == values
+
+
+@pytest.mark.parametrize('column, values', [
+    ('Godina', [2024, 40000]),
+    ('Mjesec', [1, 128]),
+    ('Sat', [-129, 0]),
+    ('Tjedan', [-1, 53]),
+])
+def test_out_of_range_ints_are_not_wrapped(column, values):
+    df = compact_frame(pd.DataFrame({column: np.array(values, dtype=np.int64)}))
+    assert df[column].dtype == np.int64
+    assert df[column].tolist() == values
@@ -0,0 +1,44 @@
+"""
+Testovi dnevnog indeksa i usporedbe perioda - sume raspona i KPI po godini protiv direktnog groupby
+"""
+import numpy as np
+import pandas as pd
+
+from src.analysis.advanced_analytics import FinancialAnalytics
+from src.analysis.daily_index import DailyIndex
+from src.analysis.invoice_table import build_invoice_table
+
+
+def test_compare_periods_counts_invoices_per_year(lines):
+    comparison = FinancialAnalytics(lines, build_invoice_table(lines)).compare_periods([2024, 2025])
+
+    for year, year_lines in lines.groupby('Godina'):
+        row = comparison.loc[str(year)]
+        invoices = year_lines.groupby('Fiskalni broj računa', observed=True)['Ukupno'].sum()
+        assert row['broj_računa'] == len(invoices)
+        assert np.isclose(row['prosječan_račun'], invoices.mean())
+        assert np.isclose(row['stavki_po_računu'], len(year_lines) / len(invoices))
+        assert np.isclose(row['ukupan_promet'], year_lines['Ukupno'].sum())
+
+
+def test_kpi_index_matches_single_year_kpis(lines):
+    year = lines[lines['Godina'] == 2025]
+    fin = FinancialAnalytics(year)
+    kpis = fin.get_kpi_metrics()
+    row = fin.compare_periods([2025]).iloc[0]
+    assert row['broj_računa'] == kpis['broj_računa']
+    assert np.isclose(row['prosječan_račun'], kpis['prosječan_račun'])
+
+
+def test_range_totals_match_groupby(lines):
+    index = DailyIndex.from_frame(lines)
+    ranges = [('2024-01-01', '2024-12-31'), ('2024-03-15', '2024-04-02'),
+              ('2024-12-20', '2025-01-10'), ('2025-06-01', '2025-06-01'), ('2023-01-01', '2023-12-31')]
+    totals = index.totals(ranges)
+
+    for (start, end), (_, row) in zip(ranges, totals.iterrows()):
+        day = lines['Datum i vrijeme'].dt.normalize()
+        selected = lines[(day >= start) & (day <= end)]
+        assert np.isclose(row['Ukupno'], selected['Ukupno'].sum())
+        assert row['Količina'] == selected['Količina'].sum()
+        assert row['Racuni'] == len(selected.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
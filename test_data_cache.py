@@ -0,0 +1,121 @@
+"""
+Testovi cachea obrađenih fajlova - pogodak, promašaj i poništavanje po otisku i verziji
+"""
+import os
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from conftest import make_raw_lines
+from src.utils import auto_data_loader, data_cache
+from src.utils.auto_data_loader import AutoDataLoader
+from src.utils.data_cache import DataCache, load_frame, save_frame
+
+FRAME = pd.DataFrame({'Artikl': ['ESPRESSO', 'VODA 0.5'], 'Ukupno': [2.5, 1.8]})
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'Racuni.xlsx'
+    path.write_bytes(b'prvi sadrzaj')
+    return path
+
+
+def touch(path, mtime_ns):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_hit_and_miss(tmp_path, source):
+    cache = DataCache(str(tmp_path / 'cache'), version='1')
+    assert cache.get(source) is None
+    cache.put(source, FRAME)
+    assert_frame_equal(cache.get(source), FRAME)
+    # Indeks se čita s diska
+    assert_frame_equal(DataCache(str(tmp_path / 'cache'), version='1').get(source), FRAME)
+
+
+def test_touched_file_with_same_content_is_a_hit(tmp_path, source):
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(source, FRAME)
+    touch(source, source.stat().st_mtime_ns + 5_000_000_000)
+    assert_frame_equal(cache.get(source), FRAME)
+    assert cache._index[cache._key(source)]['mtime_ns'] == source.stat().st_mtime_ns
+
+
+def test_size_change_invalidates(tmp_path, source):
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(source, FRAME)
+    source.write_bytes(b'prvi sadrzaj i jos redova')
+    assert cache.get(source) is None
+    assert list((tmp_path / 'cache').glob('*.parquet')) == []
+
+
+def test_sha_change_invalidates(tmp_path, source):
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(source, FRAME)
+    mtime = source.stat().st_mtime_ns
+    # Ista veličina, drugi sadržaj
+    source.write_bytes(b'drug sadrzaj')
+    touch(source, mtime + 1_000_000_000)
+    assert cache.get(source) is None
+
+
+def test_version_bump_invalidates(tmp_path, source):
+    DataCache(str(tmp_path / 'cache'), version='1').put(source, FRAME)
+    cache = DataCache(str(tmp_path / 'cache'), version='2')
+    assert cache.get(source) is None
+    assert cache._index == {}
+
+
+def test_pickle_files_are_never_loaded(tmp_path, source):
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(source, FRAME)
+    entry = cache._index[cache._key(source)]
+    (tmp_path / 'cache' / 'stari.pkl').write_bytes(b'nije parquet')
+    entry['file'] = 'stari.pkl'
+    assert load_frame(tmp_path / 'cache' / 'stari.pkl') is None
+    assert cache.get(source) is None
+
+
+def test_unwritable_frame_is_skipped(tmp_path, source, capsys):
+    mixed = pd.DataFrame({'Napomena': ['tekst', 5]})
+    assert save_frame(mixed, tmp_path / 'mixed') is None
+    assert list(tmp_path.glob('mixed*')) == []
+
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(source, FRAME)
+    assert cache.put(source, mixed) is None
+    assert cache.get(source) is None and list((tmp_path / 'cache').glob('*.parquet')) == []
+    assert 'Cache nije spremljen' in capsys.readouterr().out
+
+
+def test_without_pyarrow_nothing_is_cached(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(data_cache, 'HAS_PYARROW', False)
+    cache = DataCache(str(tmp_path / 'cache'))
+    assert cache.put(source, FRAME) is None
+    assert cache.get(source) is None
+
+
+def test_loader_processing_version_bump(tmp_path, monkeypatch):
+    data, cache_dir = tmp_path / 'data', tmp_path / 'cache'
+    data.mkdir()
+    make_raw_lines(years=(2025,), invoices_per_year=50).to_excel(data / 'Racuni_2025.xlsx', index=False)
+    first = AutoDataLoader(str(data), cache_dir=str(cache_dir), incremental=False)
+    first.load_all_racuni()
+
+    parsed = []
+    original = AutoDataLoader._parse_file
+
+    def counting(self, file):
+        parsed.append(file.name)
+        return original(self, file)
+
+    monkeypatch.setattr(AutoDataLoader, '_parse_file', counting)
+    AutoDataLoader(str(data), cache_dir=str(cache_dir), incremental=False).load_all_racuni()
+    assert parsed == []
+
+    monkeypatch.setattr(auto_data_loader, 'PROCESSING_VERSION', '999')
+    AutoDataLoader(str(data), cache_dir=str(cache_dir), incremental=False).load_all_racuni()
+    assert parsed == ['Racuni_2025.xlsx']
+    assert [path.name.endswith('_v999.parquet') for path in cache_dir.glob('*.parquet')] == [True]
@@ -0,0 +1,37 @@
+"""
+Testovi streaming čitanja - isti podaci kao pd.read_excel i standardno učitavanje
+"""
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from conftest import make_raw_lines
+from src.utils.auto_data_loader import AutoDataLoader
+from src.utils.excel_stream import iter_excel_chunks
+
+
+def write_file(folder):
+    raw = make_raw_lines(years=(2025,), invoices_per_year=300)
+    # Prazna kolona (npr. napomena koja se ne koristi) i kolona prazna u prvom dijelu
+    raw['Napomena'] = None
+    raw['Popust'] = np.where(np.arange(len(raw)) >= len(raw) - 5, 0.1, np.nan)
+    path = folder / 'Racuni_2025.xlsx'
+    raw.to_excel(path, index=False)
+    return path
+
+
+def test_chunks_match_read_excel(tmp_path):
+    path = write_file(tmp_path)
+    expected = pd.read_excel(path)
+    chunks = list(iter_excel_chunks(path, chunk_size=100))
+    assert len(chunks) > 1
+    assert (chunks[0].dtypes == expected.dtypes).all()
+    assert_frame_equal(pd.concat(chunks, ignore_index=True), expected)
+
+
+def test_streaming_load_matches_default(tmp_path):
+    write_file(tmp_path)
+    default = AutoDataLoader(str(tmp_path), use_cache=False).load_all_racuni()
+    streamed = AutoDataLoader(str(tmp_path), use_cache=False, streaming=True,
+                              chunk_size=100).load_all_racuni()
+    assert_frame_equal(streamed, default)
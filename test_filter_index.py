@@ -0,0 +1,79 @@
+"""
+Testovi indeksa filtera - bitmape protiv isin maski
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.filter_index import FilterIndex
+
+
+@pytest.fixture
+def indexed(lines):
+    # Prazne vrijednosti u kategoriji i int koloni (kao redovi bez blagajne/mjeseca)
+    df = lines.copy()
+    rng = np.random.default_rng(5)
+    df.loc[rng.random(len(df)) < 0.05, 'Blagajna'] = np.nan
+    df['Mjesec'] = df['Mjesec'].astype(float).where(rng.random(len(df)) >= 0.05)
+    return df, FilterIndex(df)
+
+
+def isin_mask(df, conditions):
+    mask = np.ones(len(df), dtype=bool)
+    for column, values in conditions.items():
+        if values is not None:
+            mask &= df[column].isin(list(values)).to_numpy()
+    return mask
+
+
+CONDITIONS = [
+    {'Godina': [2025]},
+    {'Godina': [2024, 2025], 'Lokal': ['Quahwa Centar']},
+    {'Blagajna': ['B1']},
+    {'Mjesec': [1, 2, 3], 'Blagajna': ['B2'], 'Način plaćanja': ['Kartica']},
+    {'Mjesec': [np.int8(12)], 'Prodajna grupa': ['Kava', 'Pića']},
+    {'Lokal': ['Nepostojeći lokal', 'Quahwa Tresnjevka']},
+    {'Lokal': None, 'Godina': [2024]},
+    {'Godina': []},
+]
+
+
+@pytest.mark.parametrize('conditions', CONDITIONS)
+def test_mask_and_select_match_isin(indexed, conditions):
+    df, index = indexed
+    expected = isin_mask(df, conditions)
+    assert (index.mask(conditions) == expected).all()
+    assert np.array_equal(np.unpackbits(index.bits(conditions), count=len(df)).view(bool), expected)
+    pd.testing.assert_frame_equal(index.select(df, conditions), df[expected])
+
+
+def test_no_filter_returns_frame(indexed):
+    df, index = indexed
+    assert index.bits({'Lokal': None}) is None and index.mask({}) is None
+    assert index.select(df, {'Godina': None}) is df
+    assert index.select(df, {'Godina': [2024, 2025]}) is df
+
+
+def test_contiguous_selection_is_a_slice(indexed):
+    df, index = indexed
+    year = index.select(df, {'Godina': [2025]})
+    assert np.shares_memory(year['Ukupno'].to_numpy(), df['Ukupno'].to_numpy())
+
+    # Isprekidani redovi - kopija samo odabranih redova
+    month = index.select(df, {'Mjesec': [1]})
+    assert not np.shares_memory(month['Ukupno'].to_numpy(), df['Ukupno'].to_numpy())
+    pd.testing.assert_frame_equal(month, df[df['Mjesec'] == 1])
+
+
+def test_values_under_conditions(indexed):
+    df, index = indexed
+    assert index.values('Blagajna') == df['Blagajna'].dropna().unique().tolist()
+    conditions = {'Godina': [2024], 'Lokal': ['Quahwa Centar']}
+    selected = df[isin_mask(df, conditions)]
+    # Redoslijed pojavljivanja u cijeloj koloni
+    present = set(selected['Mjesec'].dropna())
+    assert index.values('Mjesec', conditions) == [m for m in df['Mjesec'].dropna().unique() if m in present]
+    assert index.values('Godina', {'Godina': [2025], 'Lokal': ['Quahwa Centar']}) == [2025]
+    assert index.values('Lokal', {'Godina': []}) == []
+    assert index.covers({'Godina': [2024], 'Artikl': None})
+    assert not index.covers({'Artikl': ['ESPRESSO']})
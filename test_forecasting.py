@@ -0,0 +1,93 @@
+"""
+Testovi prognoza - Holt-Winters nad poznatim sezonskim serijama i dnevna matrica iz kocke
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.forecasting import ForecastAnalytics, daily_matrix, fit_series
+from src.analysis.sales_cube import SalesCube
+
+WEEKLY = np.array([0.0, -10.0, -5.0, 0.0, 5.0, 25.0, 15.0])
+
+
+def seasonal(n_days: int, level: float = 100.0, yearly: float = 0.0, noise: float = 0.0,
+             seed: int = 1) -> np.ndarray:
+    days = np.arange(n_days)
+    rng = np.random.default_rng(seed)
+    return (level + WEEKLY[days % 7] + yearly * np.sin(2 * np.pi * days / 365.25)
+            + rng.normal(0, noise, n_days))
+
+
+def test_weekly_season_is_recovered():
+    y = np.vstack([seasonal(140, noise=1.0), 2 * seasonal(140, noise=1.0, seed=2)])
+    model = fit_series(y, pd.Timestamp('2025-01-06'))
+    dates, forecast, spread = model.predict(14)
+
+    days = np.arange(140, 154)
+    truth = np.vstack([100 + WEEKLY[days % 7], 2 * (100 + WEEKLY[days % 7])])
+    assert np.abs(forecast - truth).max() < 3
+    assert dates[0] == pd.Timestamp('2025-01-06') + pd.Timedelta(days=140)
+
+
+def test_yearly_season_is_recovered():
+    y = seasonal(2 * 365, yearly=30.0, noise=1.0)[None, :]
+    model = fit_series(y, pd.Timestamp('2023-01-01'))
+    assert model.yearly is not None
+    _, forecast, _ = model.predict(60)
+
+    days = np.arange(2 * 365, 2 * 365 + 60)
+    truth = 100 + WEEKLY[days % 7] + 30 * np.sin(2 * np.pi * days / 365.25)
+    assert np.abs(forecast[0] - truth).max() < 3
+
+
+def test_prediction_shapes():
+    y = np.vstack([seasonal(60), seasonal(60, level=50), seasonal(60, level=10)])
+    model = fit_series(y, pd.Timestamp('2025-03-01'), keys=['A', 'B', 'C'], dimension='Artikl')
+    dates, forecast, spread = model.predict(30)
+    assert len(dates) == 30 and forecast.shape == spread.shape == (3, 30)
+    assert (np.diff(spread, axis=1) >= 0).all()
+
+    long = model.forecast(30)
+    assert list(long.columns) == ['Artikl', 'Datum', 'Prognoza', 'Donja_granica', 'Gornja_granica']
+    assert len(long) == 90
+    assert (long['Donja_granica'] <= long['Prognoza']).all()
+    assert (long['Prognoza'] <= long['Gornja_granica']).all()
+    assert model.summary(30)['Artikl'].tolist() == ['A', 'B', 'C']
+
+
+@pytest.mark.parametrize('n_days', [1, 3, 10])
+def test_zero_and_short_series(n_days):
+    y = np.vstack([np.zeros(n_days), np.full(n_days, 5.0)])
+    model = fit_series(y, pd.Timestamp('2025-01-01'))
+    _, forecast, spread = model.predict(7)
+    assert np.isfinite(forecast).all() and np.isfinite(spread).all()
+    assert np.allclose(forecast[0], 0) and np.allclose(spread[0], 0)
+    assert np.allclose(forecast[1], 5)
+
+
+def test_daily_matrix_matches_groupby(lines):
+    cube = SalesCube.from_frame(lines)
+    day = lines['Datum i vrijeme'].dt.normalize()
+    days = pd.date_range(day.min(), day.max(), freq='D')
+
+    matrix, first_day, keys = daily_matrix(cube, 'Artikl')
+    expected = (lines.groupby(['Artikl', day], observed=True)['Ukupno'].sum()
+                .unstack(fill_value=0.0).reindex(columns=days, fill_value=0.0))
+    assert first_day == days[0] and matrix.shape == (len(expected), len(days))
+    assert np.allclose(matrix, expected.loc[keys].to_numpy())
+
+    total, _, total_keys = daily_matrix(cube)
+    assert total_keys == ['Ukupno']
+    assert np.allclose(total[0], lines.groupby(day)['Ukupno'].sum().reindex(days, fill_value=0.0))
+
+    top, _, top_keys = daily_matrix(cube, 'Artikl', top_n=3)
+    assert top_keys == expected.sum(axis=1).sort_values(ascending=False).index[:3].tolist()
+    assert np.allclose(top, expected.loc[top_keys].to_numpy())
+
+
+def test_forecast_for_filtered_article(lines):
+    analytics = ForecastAnalytics(lines, SalesCube.from_frame(lines).filter({'Artikl': ['ESPRESSO']}))
+    forecast = analytics.get_forecast(horizon=14, dimension='Artikl')
+    assert forecast['Artikl'].unique().tolist() == ['ESPRESSO']
+    assert len(forecast) == 14
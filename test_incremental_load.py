@@ -0,0 +1,64 @@
+"""
+Testovi inkrementalnog učitavanja - cache/manifest protiv punog ponovnog učitavanja
+"""
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from conftest import make_raw_lines
+from src.utils.auto_data_loader import AutoDataLoader
+from src.utils.multi_file_loader import MultiFileLoader
+
+
+def write_years(folder, years):
+    for year in years:
+        make_raw_lines(years=(year,), invoices_per_year=150, seed=year).to_excel(
+            folder / f'Racuni_{year}.xlsx', index=False)
+
+
+def full_load(folder) -> pd.DataFrame:
+    return AutoDataLoader(str(folder), use_cache=False).load_all_racuni()
+
+
+def assert_same_data(left: pd.DataFrame, right: pd.DataFrame):
+    # Parquet vraća kategorije kao str, a spajanje dijelova ih ostavlja kao object
+    def plain(df):
+        return df.apply(lambda col: col.cat.rename_categories(col.cat.categories.astype(object))
+                        if isinstance(col.dtype, pd.CategoricalDtype) else col)
+    assert_frame_equal(plain(left), plain(right))
+
+
+def test_incremental_matches_full_rebuild(tmp_path):
+    data, cache = tmp_path / 'data', tmp_path / 'cache'
+    data.mkdir()
+    write_years(data, [2023, 2024])
+    AutoDataLoader(str(data), cache_dir=str(cache)).load_all_racuni()
+
+    # Novi fajl - stari se čitaju iz cachea
+    write_years(data, [2025])
+    incremental = AutoDataLoader(str(data), cache_dir=str(cache)).load_all_racuni()
+    assert_same_data(incremental, full_load(data))
+
+    # Obrisan fajl bez novih - indeks mora biti 0..n-1 kao kod punog učitavanja
+    (data / 'Racuni_2024.xlsx').unlink()
+    loader = AutoDataLoader(str(data), cache_dir=str(cache))
+    incremental, expected = loader.load_all_racuni(), full_load(data)
+    assert_same_data(incremental, expected)
+    assert incremental['Racun_id'].max() + 1 == len(expected.groupby(['Fiskalni broj računa', 'Godina'],
+                                                                     observed=True))
+
+    # Podaci su na disku jednom - samo objedinjeni dataset manifesta
+    assert [path.name for path in cache.glob('*.parquet')] == [loader.manifest.dataset_file]
+
+
+def test_multi_manifest_prunes_deleted_files(tmp_path):
+    data, cache = tmp_path / 'data', tmp_path / 'cache'
+    data.mkdir()
+    write_years(data, [2024, 2025])
+    MultiFileLoader(str(data), cache_dir=str(cache)).load_all_files()
+    frame = MultiFileLoader(str(data), cache_dir=str(cache)).manifest.files['Racuni_2024.xlsx']['frame']
+
+    (data / 'Racuni_2024.xlsx').unlink()
+    loader = MultiFileLoader(str(data), cache_dir=str(cache))
+    assert list(loader.load_all_files()) == ['Racuni_2025.xlsx']
+    assert list(MultiFileLoader(str(data), cache_dir=str(cache)).manifest.files) == ['Racuni_2025.xlsx']
+    assert not (cache / frame).exists()
@@ -0,0 +1,33 @@
+"""
+Testovi ključa računa - fiskalni brojevi se ponavljaju u različitim godinama
+"""
+import pandas as pd
+
+from src.analysis.distinct_counts import count_invoices, invoice_codes
+
+
+def true_invoice_count(df: pd.DataFrame) -> int:
+    return len(df.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
+
+
+def test_same_number_in_different_years_is_different_invoice(lines):
+    per_year = lines.groupby('Godina')['Fiskalni broj računa'].nunique()
+    assert per_year.sum() > lines['Fiskalni broj računa'].nunique()  # brojevi se ponavljaju
+
+    assert lines['Racun_id'].nunique() == true_invoice_count(lines)
+    assert count_invoices(lines) == true_invoice_count(lines)
+    ids_per_key = lines.groupby(['Fiskalni broj računa', 'Godina'], observed=True)['Racun_id'].nunique()
+    assert (ids_per_key == 1).all()
+
+
+def test_single_year_count_matches_string_nunique(lines):
+    for year, year_lines in lines.groupby('Godina'):
+        assert count_invoices(year_lines) == year_lines['Fiskalni broj računa'].nunique()
+
+
+def test_fallback_key_without_racun_id(lines):
+    without_ids = lines.drop(columns=['Racun_id'])
+    codes = invoice_codes(without_ids)
+    assert len(set(codes)) == true_invoice_count(lines)
+    assert (pd.Series(codes).groupby(lines['Racun_id'].to_numpy()).nunique() == 1).all()
+
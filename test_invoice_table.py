@@ -0,0 +1,41 @@
+"""
+Testovi tablice računa - filtrirani pogled mora dati iste račune kao gradnja iz filtriranih stavki
+"""
+import pandas as pd
+import pandas.testing as pdt
+
+from src.analysis.advanced_analytics import FinancialAnalytics
+from src.analysis.invoice_table import build_invoice_table, select_invoices
+
+
+def test_invoice_never_spans_years(lines):
+    invoices = build_invoice_table(lines)
+    assert len(invoices) == len(lines.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
+    assert invoices['Broj_stavki'].max() <= 3
+
+
+def test_year_view_matches_rebuild(lines):
+    invoices = build_invoice_table(lines)
+    year = lines[lines['Godina'] == 2025]
+    selected = select_invoices(invoices, year)
+    pdt.assert_frame_equal(selected, build_invoice_table(year))
+
+    expected_avg = year.groupby('Fiskalni broj računa', observed=True)['Ukupno'].sum().mean()
+    kpis = FinancialAnalytics(year, selected).get_kpi_metrics()
+    assert kpis['broj_računa'] == year['Fiskalni broj računa'].nunique()
+    assert abs(kpis['prosječan_račun'] - expected_avg) < 1e-9
+
+
+def test_filter_splitting_invoices_rebuilds_from_lines(lines):
+    invoices = build_invoice_table(lines)
+    coffee = lines[lines['Prodajna grupa'] == 'Kava']
+    selected = select_invoices(invoices, coffee)
+    pdt.assert_frame_equal(selected, build_invoice_table(coffee))
+
+
+def test_location_view_is_a_slice(lines):
+    invoices = build_invoice_table(lines)
+    centar = lines[(lines['Lokal'] == 'Quahwa Centar') & (lines['Mjesec'] <= 6)]
+    selected = select_invoices(invoices, centar)
+    pdt.assert_frame_equal(selected, build_invoice_table(centar))
+    assert pd.Index(selected.index).isin(invoices.index).all()
@@ -0,0 +1,83 @@
+"""
+Testovi analize korpe - parovi, pravila i FP-growth protiv prebrojavanja svih kombinacija
+"""
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.market_basket import BasketAnalytics
+
+
+def basket_lines(n_invoices: int = 300, seed: int = 3) -> pd.DataFrame:
+    """Računi sa 1-6 artikala (korelirani artikli A-C) - dovoljno za skupove od 4 artikla."""
+    rng = np.random.default_rng(seed)
+    items = list('ABCDEFGH')
+    records = []
+    for number in range(n_invoices):
+        basket = set(rng.choice(items, size=int(rng.integers(1, 7)), replace=False))
+        if 'A' in basket and rng.random() < 0.6:
+            basket |= {'B', 'C'}
+        for item in sorted(basket):
+            # Ponovljena stavka istog artikla se broji jednom
+            for _ in range(1 + int(rng.random() < 0.1)):
+                records.append({'Fiskalni broj računa': f'{number}/P1/1',
+                                'Datum i vrijeme': pd.Timestamp('2025-03-01 10:00'),
+                                'Artikl': item, 'Ukupno': 1.0})
+    return pd.DataFrame(records)
+
+
+def brute_force(df: pd.DataFrame, max_size: int) -> Counter:
+    baskets = df.groupby('Fiskalni broj računa')['Artikl'].agg(lambda items: tuple(sorted(set(items))))
+    counts = Counter()
+    for basket in baskets:
+        for size in range(1, max_size + 1):
+            counts.update(combinations(basket, size))
+    return counts
+
+
+@pytest.mark.parametrize('min_support', [0.02, 0.1])
+def test_frequent_itemsets_match_brute_force(min_support):
+    df = basket_lines()
+    n = df['Fiskalni broj računa'].nunique()
+    expected = {items: count for items, count in brute_force(df, 4).items()
+                if len(items) >= 2 and count >= np.ceil(min_support * n)}
+
+    result = BasketAnalytics(df).get_frequent_itemsets(min_support=min_support, max_size=4)
+    actual = {tuple(sorted(items.split(' + '))): count
+              for items, count in zip(result['Artikli'], result['Broj_računa'])}
+    assert actual == expected
+    assert (result['Broj_artikala'] == result['Artikli'].str.count(r' \+ ') + 1).all()
+    assert np.allclose(result['Podrška%'], result['Broj_računa'] / n * 100)
+    assert result['Broj_artikala'].max() == 4
+
+
+def test_pairs_and_rules_match_brute_force():
+    df = basket_lines()
+    n = df['Fiskalni broj računa'].nunique()
+    counts = brute_force(df, 2)
+    singles = {items[0]: count for items, count in counts.items() if len(items) == 1}
+    expected = {items: count for items, count in counts.items() if len(items) == 2 and count >= 20}
+
+    pairs = BasketAnalytics(df).get_pairs(min_support=0.0, min_count=20)
+    count_a, count_b = pairs['Artikl_A'].map(singles), pairs['Artikl_B'].map(singles)
+    both = pairs['Broj_računa']
+    assert {tuple(sorted(pair)): count for *pair, count
+            in zip(pairs['Artikl_A'], pairs['Artikl_B'], both)} == expected
+    assert np.allclose(pairs['Lift'], both * n / (count_a * count_b))
+    assert np.allclose(pairs['Pouzdanost_A→B%'], both / count_a * 100)
+    assert np.allclose(pairs['Pouzdanost_B→A%'], both / count_b * 100)
+    assert pairs['Lift'].is_monotonic_decreasing
+
+    rules = BasketAnalytics(df).get_rules(min_support=0.0, min_confidence=0.3, min_lift=1.1, min_count=20)
+    expected_rules = {(a, b) for (x, y), count in expected.items() for a, b in ((x, y), (y, x))
+                      if count / singles[a] >= 0.3 and count * n / (singles[a] * singles[b]) >= 1.1}
+    assert expected_rules and set(zip(rules['Ako'], rules['Onda'])) == expected_rules
+    assert np.allclose(rules['Pouzdanost%'], rules['Broj_računa'] / rules['Ako'].map(singles) * 100)
+
+
+def test_invoices_keyed_per_year(lines):
+    basket = BasketAnalytics(lines)
+    assert basket.n_invoices == len(lines.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
@@ -0,0 +1,44 @@
+"""
+Testovi paralelnog učitavanja - process pool daje isti dataset kao sekvencijalno
+"""
+import os
+
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from conftest import make_raw_lines
+from src.utils import auto_data_loader
+from src.utils.auto_data_loader import AutoDataLoader
+
+
+def crashing_worker(path, streaming=False, chunk_size=50_000):
+    """Radni proces koji pada kao kod nestanka memorije."""
+    os._exit(1)
+
+
+@pytest.fixture
+def data(tmp_path):
+    for year in (2023, 2024, 2025):
+        make_raw_lines(years=(year,), invoices_per_year=120, seed=year).to_excel(
+            tmp_path / f'Racuni_{year}.xlsx', index=False)
+    return tmp_path
+
+
+def load(folder, workers, **kwargs) -> pd.DataFrame:
+    return AutoDataLoader(str(folder), use_cache=False, **kwargs).load_all_racuni(workers=workers)
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_workers_match_sequential(data, streaming):
+    sequential = load(data, 1, streaming=streaming)
+    parallel = load(data, 2, streaming=streaming)
+    assert_frame_equal(parallel, sequential)
+    assert parallel['_source_file'].unique().tolist() == [f'Racuni_{y}.xlsx' for y in (2023, 2024, 2025)]
+
+
+def test_broken_pool_falls_back_to_sequential(data, monkeypatch, capsys):
+    expected = load(data, 1)
+    monkeypatch.setattr(auto_data_loader, '_parse_racuni_worker', crashing_worker)
+    assert_frame_equal(load(data, 2), expected)
+    assert capsys.readouterr().out.count('nastavljam sekvencijalno') == 1
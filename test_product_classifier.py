@@ -0,0 +1,176 @@
+"""
+Testovi klasifikatora proizvoda - taksonomija, prioritet pravila i tablica artikl → kategorija
+"""
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import ARTICLES
+from src.analysis.advanced_analytics import ProductComparisonAnalytics
+from src.analysis.product_classifier import (DEFAULT_TAXONOMY, ProductClassifier, load_taxonomy,
+                                             taxonomy_version)
+
+TAXONOMY = {
+    'version': 3,
+    'default': 'Ostalo',
+    'order': ['Kava', 'Ostalo', 'Hrana'],
+    'rules': [
+        {'category': 'Hrana', 'priority': 20, 'exact': ['LATTE TORTA'], 'keywords': ['TORTA', 'WRAP'],
+         'patterns': []},
+        {'category': 'Kava', 'priority': 10, 'exact': [], 'keywords': ['LATTE', 'ESPRESSO'],
+         'patterns': [r'^KAVA\b']},
+        {'category': 'Pića', 'priority': 30, 'exact': [], 'keywords': ['VODA'], 'patterns': []},
+    ],
+}
+
+
+def test_taxonomy_loading(tmp_path):
+    path = tmp_path / 'taxonomy.json'
+    path.write_text(json.dumps(TAXONOMY, ensure_ascii=False), encoding='utf-8')
+    assert load_taxonomy(path) == TAXONOMY
+
+    classifier = ProductClassifier.from_file(path)
+    # Redoslijed iz 'order', pa kategorije pravila koje nisu navedene
+    assert classifier.categories == ['Kava', 'Ostalo', 'Hrana', 'Pića']
+    assert classifier.default == 'Ostalo'
+    assert classifier.version == taxonomy_version(TAXONOMY)
+    assert classifier.version.startswith('3-')
+    assert taxonomy_version({**TAXONOMY, 'default': 'Drugo'}) != classifier.version
+
+    default = ProductClassifier()
+    assert default.version == taxonomy_version(load_taxonomy(DEFAULT_TAXONOMY))
+    assert default.category('CAPPUCCINO') == 'Kava - Espresso bazirana'
+    assert default.category('ICED LATTE') == 'Hladna kava'
+
+
+@pytest.mark.parametrize('name, category', [
+    ('LATTE', 'Kava'),
+    ('ledeni latte', 'Kava'),           # ključne riječi nad nazivom velikim slovima
+    ('LATTE TORTA', 'Hrana'),           # exact ima prednost pred prioritetom
+    ('latte torta', 'Kava'),            # exact je točan naziv
+    ('TORTA ESPRESSO', 'Kava'),         # manji prioritet prije, bez obzira na redoslijed u fajlu
+    ('WRAP', 'Hrana'),
+    ('KAVA S MLIJEKOM', 'Kava'),        # regularni izraz
+    ('MALA KAVA', 'Ostalo'),
+    ('VODA', 'Pića'),
+    ('', 'Ostalo'),
+])
+def test_rule_priority(name, category):
+    assert ProductClassifier(TAXONOMY).category(name) == category
+
+
+def test_categorize_rows_and_missing():
+    classifier = ProductClassifier(TAXONOMY)
+    articles = pd.Series(['WRAP', None, 'LATTE', 'WRAP', 'NEPOZNATO'], index=[5, 6, 7, 8, 9])
+    result = classifier.categorize(articles)
+    assert result.index.equals(articles.index)
+    assert result.tolist() == ['Hrana', 'Ostalo', 'Kava', 'Hrana', 'Ostalo']
+    assert list(result.cat.categories) == sorted(classifier.categories)
+    assert classifier.categorize(articles.astype('category')).tolist() == result.tolist()
+    assert classifier.group(['VODA', 'LATTE', 'WRAP', 'ESPRESSO']) == {
+        'Kava': ['LATTE', 'ESPRESSO'], 'Ostalo': [], 'Hrana': ['WRAP'], 'Pića': ['VODA']}
+
+
+def test_mapping_round_trip(tmp_path):
+    path = tmp_path / 'cache' / 'categories.json'
+    classifier = ProductClassifier(TAXONOMY, mapping_path=str(path))
+    assert not classifier.flush()
+
+    classifier.codes(['LATTE', 'WRAP', 'VODA'])
+    # Klasifikacija ne piše na disk - zapis je tek na flush()
+    assert not path.exists()
+    assert classifier.flush() and path.exists()
+    assert not classifier.flush()
+    assert json.loads(path.read_text(encoding='utf-8'))['articles'] == {
+        'LATTE': 'Kava', 'WRAP': 'Hrana', 'VODA': 'Pića'}
+
+    # Novi klasifikator čita tablicu - poznati artikli se ne klasificiraju ponovo
+    reloaded = ProductClassifier(TAXONOMY, mapping_path=str(path))
+    assert reloaded.mapping == classifier.mapping
+    reloaded._classify_new = None
+    assert reloaded.codes(['WRAP', 'LATTE']).tolist() == classifier.codes(['WRAP', 'LATTE']).tolist()
+    assert not reloaded.flush()
+
+    # Promjena taksonomije poništava tablicu
+    changed = ProductClassifier({**TAXONOMY, 'version': 4}, mapping_path=str(path))
+    assert changed.mapping == {}
+    assert changed.category('LATTE') == 'Kava'
+    assert changed.flush()
+    assert json.loads(path.read_text(encoding='utf-8'))['taxonomy'] == changed.version
+
+
+def test_broken_mapping_file_is_ignored(tmp_path):
+    path = tmp_path / 'categories.json'
+    path.write_text('{nije json', encoding='utf-8')
+    classifier = ProductClassifier(TAXONOMY, mapping_path=str(path))
+    assert classifier.mapping == {}
+    assert classifier.category('WRAP') == 'Hrana'
+
+
+LEGACY_RULES = [
+    ('Hladna kava', ['ICE', 'ICED']),
+    ('Kava - Espresso bazirana', ['CAPPUCCINO', 'ESPRESSO', 'LATTE', 'MACCHIATO', 'AMERICANO', 'CORTADO',
+                                  'BOMBON']),
+    ('Kava - Specijalna', ['TURKISH', 'MATCHA', 'HOT CHOCOLATE', 'BRUM']),
+    ('Čaj', ['TEA']),
+    ('Sokovi i limunade', ['LEMONADE', 'JUICE', 'VODA', 'WATER']),
+    ('Deserti i kolači', ['KOLAČ', 'CAKE', 'COKKIE', 'Kroasan']),
+    ('Sendviči i hrana', ['Toast', 'Ham', 'WRAP', 'SANDWICH']),
+]
+
+
+def legacy_category(product) -> str:
+    """Nekadašnja kategorizacija iz ProductComparisonAnalytics._create_product_categories."""
+    product_upper = str(product).upper()
+    for category, keywords in LEGACY_RULES:
+        if any(keyword in product_upper for keyword in keywords):
+            return category
+    return 'Ostalo'
+
+
+def legacy_categories(products) -> dict:
+    order = ['Kava - Espresso bazirana', 'Kava - Specijalna', 'Hladna kava', 'Čaj', 'Sokovi i limunade',
+             'Deserti i kolači', 'Sendviči i hrana', 'Ostalo']
+    categories = {category: [] for category in order}
+    for product in products:
+        categories[legacy_category(product)].append(product)
+    return categories
+
+
+NAMES = [name for name, _, _ in ARTICLES] + [
+    'ICED LATTE', 'Ice Tea', 'espresso tonic', 'LATTE MACCHIATO', 'HOT CHOCOLATE', 'hot chocolate',
+    'MATCHA LATTE', 'Green tea', 'STEAK', 'ORANGE JUICE', 'Kolač od sira', 'CHEESECAKE', 'COKKIE',
+    'KROASAN', 'Kroasan čokolada', 'Toast šunka', 'HAM & EGGS', 'CLUB SANDWICH', 'VODA (0.25)',
+    'SPARKLING WATER', 'Kava + mlijeko', 'BRUMEN', 'BOMBONIJERA', 'AMERICANO [XL]', 'a.b*c?',
+    '', ' ', 'ČAJ ŠIPAK', 'Pivo', 'nice', 'mice cream', 'CORTADO\tDOUBLE',
+]
+
+
+def test_compiled_classifier_matches_legacy_keywords():
+    classifier = ProductClassifier()
+    codes = classifier._classify_new(NAMES)
+    assert [classifier.categories[code] for code in codes] == [legacy_category(name) for name in NAMES]
+    # Ključne riječi mješovitih slova nikad ne pogađaju naziv velikim slovima - kao i prije
+    assert classifier.category('Kroasan') == 'Ostalo'
+    assert classifier.category('Toast šunka') == 'Ostalo'
+
+
+def test_non_string_names_match_legacy():
+    names = [None, 12345, 3.5, 'ICE']
+    classifier = ProductClassifier()
+    assert [classifier.categories[code] for code in classifier._classify_new(names)] == \
+        [legacy_category(name) for name in names]
+
+
+def test_product_categories_match_legacy(lines):
+    df = lines.copy()
+    extra = pd.Series(NAMES, dtype=object)
+    df['Artikl'] = df['Artikl'].astype(object)
+    df.loc[df.index[:len(extra)], 'Artikl'] = extra.to_numpy()
+    analytics = ProductComparisonAnalytics(df, classifier=ProductClassifier())
+
+    expected = legacy_categories(df['Artikl'].unique())
+    assert analytics.product_categories == expected
+    for name in df['Artikl'].unique():
+        assert analytics.get_product_category(name) == legacy_category(name)
@@ -0,0 +1,43 @@
+"""
+Testovi QueryEngine-a - broj računa po ključu računa i registar engina (ne drži
+DataFrame živim i ograničen je)
+"""
+import gc
+
+import pytest
+
+from src.analysis import query_engine as qe
+from src.analysis.query_engine import QueryEngine
+
+
+def test_query_engine_counts_invoices_per_year_key(lines):
+    result = QueryEngine(lines).query('Godina', ['broj_racuna'])
+    expected = lines.groupby('Godina')['Fiskalni broj računa'].nunique()
+    assert result['broj_racuna'].tolist() == expected.tolist()
+    invoices = len(lines.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
+    assert QueryEngine(lines).query('Lokal', ['broj_racuna'])['broj_racuna'].sum() == invoices
+
+
+def test_registry_releases_collected_frames(lines):
+    before = len(qe._engines)
+    frame = lines[lines['Godina'] == 2025]
+    engine = qe.query_engine(frame)
+    assert qe.query_engine(frame) is engine
+    assert len(qe._engines) == before + 1
+
+    del frame
+    gc.collect()
+    assert len(qe._engines) == before
+    with pytest.raises(ReferenceError):
+        engine.df
+
+
+def test_registry_is_bounded(lines):
+    frames = [lines[lines['Mjesec'] == month] for month in range(1, 13)]
+    engines = [qe.query_engine(frame) for frame in frames]
+    assert len(qe._engines) <= qe.MAX_ENGINES
+    # Izbačeni engine se gradi ponovo, zadržani se ponovo koristi
+    assert qe.query_engine(frames[0]) is not engines[0]
+    assert qe.query_engine(frames[-1]) is engines[-1]
+    result = qe.query_engine(frames[0]).query('Lokal', ['promet'])
+    assert result['promet'].sum() == pytest.approx(frames[0]['Ukupno'].sum())
@@ -0,0 +1,120 @@
+"""
+Testovi cachea rezultata - LRU, memorijski budžet i CachedAnalytics proxy
+"""
+import numpy as np
+import pandas as pd
+
+from src.analysis.result_cache import CachedAnalytics, ResultCache, filter_signature
+
+
+def block(n_bytes: int) -> np.ndarray:
+    return np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_lru_eviction_by_entries():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1          # 'a' postaje nedavno korišten
+    cache.put('c', 3)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache
+    assert cache.get('b', 'nema') == 'nema'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.stats()['pogodak%'] == 50
+
+
+def test_byte_budget():
+    cache = ResultCache(max_bytes=1000)
+    cache.put('a', block(400))
+    cache.put('b', block(400))
+    assert cache.nbytes == 800
+    cache.put('c', block(400))
+    assert list(cache._entries) == ['b', 'c'] and cache.nbytes == 800
+
+    # Zamjena istog ključa ne broji stari unos
+    cache.put('c', block(100))
+    assert cache.nbytes == 500 and len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0
+
+
+def test_oversized_result_is_not_stored():
+    cache = ResultCache(max_bytes=1000)
+    cache.put('a', block(300))
+    cache.put('b', block(300))
+    cache.put('b', block(5000))
+    assert 'b' not in cache and 'a' in cache
+    assert cache.nbytes == 300
+
+
+def test_filter_signature_is_normalized():
+    assert filter_signature([2025, np.int64(2024), 2025], None, ['B', 'A']) == \
+        filter_signature((2024, 2025), None, {'A', 'B'})
+    assert filter_signature([2025]) != filter_signature([2025], [])
+
+
+class Counting:
+    """Analitička klasa koja broji kreiranja i pozive."""
+    created = 0
+
+    def __init__(self, df):
+        Counting.created += 1
+        self.df = df
+        self.calls = 0
+
+    def totals(self, by='Lokal', top=None):
+        self.calls += 1
+        result = self.df.groupby(by, observed=True)['Ukupno'].sum().reset_index()
+        return result if top is None else result.head(top)
+
+    def summary(self, columns):
+        self.calls += 1
+        return {'redova': len(self.df), 'kolone': list(columns)}
+
+
+def test_cached_analytics_memoizes(lines):
+    Counting.created = 0
+    cache = ResultCache()
+    analytics = CachedAnalytics(Counting, cache, ('v1', filter_signature()), lines)
+    first = analytics.totals('Lokal')
+    assert Counting.created == 1
+    pd.testing.assert_frame_equal(analytics.totals('Lokal'), first)
+    assert analytics.instance.calls == 1
+
+    analytics.totals('Lokal', top=1)
+    analytics.summary(['Ukupno', 'Lokal'])
+    analytics.summary(['Ukupno', 'Lokal'])
+    assert analytics.instance.calls == 3
+
+    # Novi proxy nad istim ključem ne kreira objekt
+    again = CachedAnalytics(Counting, cache, ('v1', filter_signature()), lines)
+    again.totals('Lokal')
+    assert Counting.created == 1
+    # Drugi ključ (npr. nova verzija dataseta) računa ponovo
+    CachedAnalytics(Counting, cache, ('v2', filter_signature()), lines).totals('Lokal')
+    assert Counting.created == 2
+    # Atributi se ne spremaju
+    assert again.df is lines
+
+
+def test_unhashable_arguments_bypass_cache(lines):
+    cache = ResultCache()
+    analytics = CachedAnalytics(Counting, cache, 'v1', lines)
+    columns = pd.Index(['Ukupno'])
+    analytics.summary(columns)
+    analytics.summary(columns)
+    assert analytics.instance.calls == 2
+    assert len(cache) == 0
+
+
+def test_results_are_isolated_copies(lines):
+    analytics = CachedAnalytics(Counting, ResultCache(), 'v1', lines)
+    result = analytics.totals('Lokal')
+    expected = result.copy()
+    result.loc[0, 'Ukupno'] = -1.0
+    summary = analytics.summary(['Ukupno'])
+    summary['kolone'].append('Lokal')
+
+    pd.testing.assert_frame_equal(analytics.totals('Lokal'), expected)
+    assert analytics.summary(['Ukupno'])['kolone'] == ['Ukupno']
@@ -0,0 +1,59 @@
+"""
+Testovi kocke prodaje - rollup i filter protiv direktnog groupby nad stavkama
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.sales_cube import SalesCube
+
+
+def direct(lines: pd.DataFrame, dims) -> pd.DataFrame:
+    keys = [lines['Datum i vrijeme'].dt.normalize().rename('Datum') if dim == 'Datum' else lines[dim]
+            for dim in dims]
+    grouped = lines.groupby(keys, observed=True, sort=True)
+    return pd.DataFrame({
+        'Ukupno': grouped['Ukupno'].sum(),
+        'Količina': grouped['Količina'].sum(),
+        'Racuni': grouped['Racun_id'].nunique(),
+    }).reset_index()
+
+
+@pytest.mark.parametrize('dims', [['Datum'], ['Godina', 'Mjesec'], ['Lokal', 'Sat'],
+                                  ['Prodajna grupa'], ['Artikl'], ['Godina', 'Prodajna grupa']])
+def test_rollup_matches_groupby(lines, dims):
+    rollup = SalesCube.from_frame(lines).rollup(dims, ['Ukupno', 'Količina', 'Racuni'])
+    expected = direct(lines, dims)
+    assert np.allclose(rollup['Ukupno'], expected['Ukupno'])
+    assert (rollup['Količina'].to_numpy() == expected['Količina'].to_numpy()).all()
+    assert (rollup['Racuni'].to_numpy() == expected['Racuni'].to_numpy()).all()
+
+
+def test_total_invoices_across_years(lines):
+    cube = SalesCube.from_frame(lines)
+    assert cube.total('Racuni') == len(lines.groupby(['Fiskalni broj računa', 'Godina'], observed=True))
+    year = cube.filter({'Godina': [2025]})
+    assert year.total('Racuni') == lines.loc[lines['Godina'] == 2025, 'Fiskalni broj računa'].nunique()
+
+
+def test_filter_on_article_drops_levels_without_it(lines):
+    products = ['ESPRESSO', 'Kroasan']
+    cube = SalesCube.from_frame(lines).filter({'Artikl': products})
+    assert list(cube.levels) == ['artikli']
+
+    selected = lines[lines['Artikl'].isin(products)]
+    daily = cube.rollup('Datum', ['Ukupno', 'Količina'])
+    expected = direct(selected, ['Datum'])
+    assert np.allclose(daily['Ukupno'], expected['Ukupno'])
+    assert np.isclose(cube.total('Ukupno'), selected['Ukupno'].sum())
+
+    # Račun sa oba artikla bi se brojao dvaput
+    with pytest.raises(ValueError):
+        cube.rollup('Datum', ['Racuni'])
+
+
+def test_filter_on_single_article_counts_invoices(lines):
+    cube = SalesCube.from_frame(lines).filter({'Artikl': ['ESPRESSO']})
+    selected = lines[lines['Artikl'] == 'ESPRESSO']
+    monthly = cube.rollup(['Godina', 'Mjesec'], ['Racuni'])
+    assert (monthly['Racuni'].to_numpy() == direct(selected, ['Godina', 'Mjesec'])['Racuni'].to_numpy()).all()
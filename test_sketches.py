@@ -0,0 +1,24 @@
+"""
+Testovi sketcheva - iznos računa iz stavki računa unutar godine
+"""
+import numpy as np
+
+from src.analysis.sketches import QUANTILES, SketchIndex
+
+
+def test_invoice_amount_quantiles_per_year(lines):
+    sketches = SketchIndex.from_frame(lines)
+    for year, year_lines in lines.groupby('Godina'):
+        amounts = year_lines.groupby('Fiskalni broj računa', observed=True)['Ukupno'].sum()
+        approx = sketches.quantiles('iznos_računa', QUANTILES, {'Godina': [year]})
+        lower = amounts.quantile(list(QUANTILES), interpolation='lower').to_numpy()
+        upper = amounts.quantile(list(QUANTILES), interpolation='higher').to_numpy()
+        assert (approx.to_numpy() >= lower * 0.98).all()
+        assert (approx.to_numpy() <= upper * 1.02).all()
+
+
+def test_distinct_invoices_per_year(lines):
+    sketches = SketchIndex.from_frame(lines)
+    for year, year_lines in lines.groupby('Godina'):
+        exact = year_lines['Fiskalni broj računa'].nunique()
+        assert np.isclose(sketches.distinct('racuni', {'Godina': [year]}), exact, rtol=0.05)
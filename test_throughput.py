@@ -0,0 +1,26 @@
+"""
+Testovi protoka računa - slotovi iz stavki filtriranog pogleda
+"""
+import pytest
+
+from src.analysis.throughput import ThroughputAnalytics
+
+
+def test_slot_counts_match_lines_of_the_view(lines):
+    year = lines[lines['Godina'] == 2025]
+    counts = ThroughputAnalytics(year).get_slot_counts(15, 'Lokal')
+
+    first = year.groupby('Fiskalni broj računa', observed=True).agg(
+        Lokal=('Lokal', 'first'), Vrijeme=('Datum i vrijeme', 'first'))
+    expected = first.groupby(['Lokal', first['Vrijeme'].dt.floor('15min')], observed=True).size()
+    actual = counts.set_index(['Lokal', 'Početak'])['Računi']
+    assert actual.sum() == year['Fiskalni broj računa'].nunique()
+    assert actual.to_dict() == expected.to_dict()
+
+
+def test_peak_loads_window_bounds(lines):
+    throughput = ThroughputAnalytics(lines)
+    whole_day = throughput.get_peak_loads(minutes=60, window=1440)
+    assert (whole_day['Vršno_opterećenje'] == whole_day['Računi']).all()
+    with pytest.raises(ValueError):
+        throughput.get_peak_loads(minutes=60, window=1500)
@@ -0,0 +1,94 @@
+"""
+Testovi vremenskih obrazaca - gusti nizovi kernela protiv groupby nad stavkama
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analysis.advanced_analytics import TimeAnalytics
+from src.analysis.sales_cube import SalesCube
+from src.analysis.time_patterns import TimePatternKernel
+
+
+def direct(lines: pd.DataFrame, keys) -> pd.DataFrame:
+    grouped = lines.groupby(keys, observed=True, sort=True)
+    return pd.DataFrame({
+        'Ukupno': grouped['Ukupno'].sum(),
+        'Količina': grouped['Količina'].sum(),
+        'Stavke': grouped['Ukupno'].count(),
+        'Racuni': grouped['Racun_id'].nunique(),
+    })
+
+
+def assert_profile(profile: pd.DataFrame, expected: pd.DataFrame, key: str):
+    assert profile[key].tolist() == expected.index.tolist()
+    assert np.allclose(profile['Ukupno'], expected['Ukupno'])
+    for measure in ['Količina', 'Stavke', 'Racuni']:
+        assert profile[measure].tolist() == expected[measure].tolist(), measure
+
+
+def pivot(lines: pd.DataFrame, index: str, columns: str) -> pd.DataFrame:
+    """Nekadašnji get_heatmap_data - groupby, pivot i prazne ćelije 0."""
+    summed = lines.groupby([index, columns])['Ukupno'].sum().reset_index()
+    return summed.pivot(index=index, columns=columns, values='Ukupno').fillna(0)
+
+
+def assert_pivot(actual: pd.DataFrame, expected: pd.DataFrame):
+    assert actual.index.tolist() == expected.index.tolist()
+    assert actual.columns.tolist() == expected.columns.tolist()
+    assert np.allclose(actual.to_numpy(), expected.to_numpy())
+
+
+@pytest.fixture
+def sparse_lines(lines):
+    # Bez nedjelje i jutarnjih sati - prazni redovi/kolone se ne prikazuju
+    return lines[(lines['Dan_u_tjednu_broj'] != 6) & (lines['Sat'] >= 10)].reset_index(drop=True)
+
+
+@pytest.fixture(params=['lines', 'sparse_lines'])
+def frame(request):
+    return request.getfixturevalue(request.param)
+
+
+def test_grid_matches_groupby(frame):
+    kernel = TimePatternKernel.from_cube(SalesCube.from_frame(frame))
+    expected = direct(frame, ['Dan_u_tjednu_broj', 'Sat'])
+    for measure in ['Ukupno', 'Količina', 'Stavke', 'Racuni']:
+        grid = kernel.grid(measure)
+        assert grid.shape == (7, 24)
+        cells = np.zeros((7, 24))
+        dow, hour = (expected.index.get_level_values(i).to_numpy(dtype=int) for i in range(2))
+        cells[dow, hour] = expected[measure].to_numpy()
+        assert np.allclose(grid, cells), measure
+
+
+def test_hourly_and_weekly_match_groupby(frame):
+    kernel = TimePatternKernel.from_cube(SalesCube.from_frame(frame))
+    assert_profile(kernel.hourly(), direct(frame, 'Sat'), 'Sat')
+
+    weekly = kernel.weekly()
+    assert_profile(weekly, direct(frame, 'Dan_u_tjednu_broj'), 'Dan_u_tjednu_broj')
+    names = frame.groupby('Dan_u_tjednu_broj')['Dan_u_tjednu'].first()
+    assert weekly['Dan_u_tjednu'].astype(str).tolist() == names.astype(str).tolist()
+
+
+def test_heatmap_and_calendar_match_pivot(frame):
+    kernel = TimePatternKernel.from_cube(SalesCube.from_frame(frame))
+    assert_pivot(kernel.heatmap(), pivot(frame, 'Dan_u_tjednu_broj', 'Sat'))
+    assert_pivot(kernel.calendar(), pivot(frame, 'Mjesec', 'Dan'))
+    assert_pivot(TimeAnalytics(frame).get_heatmap_data(), pivot(frame, 'Dan_u_tjednu_broj', 'Sat'))
+
+
+@pytest.mark.parametrize('dimension', ['Lokal', 'Artikl'])
+def test_dimension_slices_match_groupby(lines, dimension):
+    kernel = TimePatternKernel.from_cube(SalesCube.from_frame(lines), dimension)
+    for value in lines[dimension].unique():
+        selected = lines[lines[dimension] == value]
+        assert_pivot(kernel.heatmap(value=value), pivot(selected, 'Dan_u_tjednu_broj', 'Sat'))
+        assert_profile(kernel.hourly(value), direct(selected, 'Sat'), 'Sat')
+        assert_profile(kernel.weekly(value), direct(selected, 'Dan_u_tjednu_broj'), 'Dan_u_tjednu_broj')
+
+    # Zbroj po svim vrijednostima je ukupna mreža, a nepoznata vrijednost je prazna
+    assert np.allclose(kernel.grid(), TimePatternKernel.from_cube(SalesCube.from_frame(lines)).grid())
+    assert not kernel.grid(value='Nepostojeće').any()
+    assert kernel.heatmap(value='Nepostojeće').empty